@@ -16,6 +16,35 @@ export interface NeighborhoodStatistic {
   avg_resolution_hours: number | null;
 }
 
+export interface HeatMapAggregateOptions {
+  agg: 'hex' | 'grid';
+  zoom: number;
+  bbox?: [number, number, number, number]; // minLng, minLat, maxLng, maxLat
+}
+
+export interface HeatMapCell {
+  type: string;
+  geometry: {
+    type: string;
+    coordinates: [number, number];
+  };
+  properties: {
+    cell: [number, number];
+    report_count: number;
+    intensity: number;
+    max_severity: number;
+  };
+}
+
+export interface HeatMapAggregates {
+  type: string;
+  agg: 'hex' | 'grid';
+  zoom: number;
+  cell_size_m: number;
+  bbox: [number, number, number, number];
+  features: HeatMapCell[];
+}
+
 export interface TimeTrend {
   month: string;
   report_count: number;
@@ -61,6 +90,29 @@ export function getHeatmapData(filters: HeatMapFilters = {}, token: string | nul
   return fetchWithAuth(`/api/v1/heatmap?${params}`, token);
 }
 
+/**
+ * Fetch per-cell report counts binned on the server for the current viewport
+ */
+export function getHeatmapAggregates(
+  options: HeatMapAggregateOptions,
+  filters: HeatMapFilters = {},
+  token: string | null
+) {
+  const { categoryId, startDate, endDate, status, councilDistrict } = filters;
+
+  const params = new URLSearchParams();
+  params.append('agg', options.agg);
+  params.append('zoom', options.zoom.toString());
+  if (options.bbox) params.append('bbox', options.bbox.join(','));
+  if (categoryId) params.append('category_id', categoryId);
+  if (startDate) params.append('start_date', startDate);
+  if (endDate) params.append('end_date', endDate);
+  if (status) params.append('status', status);
+  if (councilDistrict) params.append('council_district', councilDistrict.toString());
+
+  return fetchWithAuth(`/api/v1/heatmap?${params}`, token) as Promise<HeatMapAggregates>;
+}
+
 /**
  * Fetch heat map statistics
  */
@@ -1,8 +1,10 @@
-from flask import Flask, request, jsonify
-import psycopg2 as pg
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask import json as flask_json
 from flask_cors import CORS
 import os
 import json
+import math
+import base64
 from datetime import datetime
 import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -10,7 +12,24 @@ from flask_jwt_extended import (
     JWTManager, create_access_token, jwt_required, get_jwt_identity
 )
 
+from db import DatabasePool
+from boundary_index import BoundaryIndex
+from duplicate_index import ReportDuplicateIndex
+from feed_scheduler import FeedScheduler
+from incident_watch import IncidentWatcher
+import live_feed
+from subscription_matcher import SubscriptionMatcher
+from safe_places import INFRASTRUCTURE_FEATURES, SafePlacesCatalog
+from report_ingest import BatchIngestor, parse_batch
+from rollups import GRANULARITIES as TREND_GRANULARITIES, StatisticsRollup
+from tile_cache import TileCache, filter_hash
 from serp_api_service.news_fetcher import NewsFetcher
+from serp_api_service.async_serp_api_handler import CoalescedSerpApiService
+from serp_api_service.budget import CreditLedger, Priority, default_budget as serpapi_budget_manager
+from serp_api_service.http_client import breaker as serpapi_breaker
+from serp_api_service.search_cache import SerpResultStore, default_cache as serpapi_cache
+from serp_api_service.serp_api_handler import SerpApiService
+from serp_api_service.severity_classifier import ReloadingClassifier
 from serp_api_service.events_fetcher import EventsFetcher
 from serp_api_service.volunteer_events_fetcher import VolunteerEventsFetcher
 
@@ -19,6 +38,41 @@ news_fetcher = NewsFetcher()
 events_fetcher = EventsFetcher()
 volunteer_events_fetcher = VolunteerEventsFetcher()
 
+# Concurrent requests for the same search share one upstream SerpApi call
+serpapi_client = CoalescedSerpApiService()
+for fetcher in (news_fetcher, events_fetcher, volunteer_events_fetcher):
+  fetcher.service = serpapi_client
+
+# --------------------------
+# Default feeds are refreshed in the background so requests never wait on SerpApi
+# --------------------------
+DEFAULT_NEWS_QUERY = "Austin"
+feed_scheduler = FeedScheduler(jitter=float(os.environ.get("FEED_REFRESH_JITTER", 0.1)))
+# Scheduled refreshes spend SerpApi credits at background priority
+prefetch_news_fetcher = NewsFetcher()
+prefetch_events_fetcher = EventsFetcher()
+prefetch_volunteer_events_fetcher = VolunteerEventsFetcher()
+prefetch_serpapi = SerpApiService(priority=Priority.BACKGROUND)
+for fetcher in (prefetch_news_fetcher, prefetch_events_fetcher, prefetch_volunteer_events_fetcher):
+  fetcher.service = prefetch_serpapi
+feed_scheduler.register(
+  'news',
+  lambda max_age: prefetch_news_fetcher.fetch_general_news(DEFAULT_NEWS_QUERY, max_age=max_age),
+  interval=float(os.environ.get("FEED_NEWS_INTERVAL", 5 * 60))
+)
+feed_scheduler.register(
+  'events',
+  lambda max_age: prefetch_events_fetcher.fetch_events_for_location(query="Events in Austin, TX", max_age=max_age),
+  interval=float(os.environ.get("FEED_EVENTS_INTERVAL", 60 * 60))
+)
+feed_scheduler.register(
+  'volunteer_events',
+  lambda max_age: prefetch_volunteer_events_fetcher.fetch_volunteer_events(location="Austin, Texas", max_age=max_age),
+  interval=float(os.environ.get("FEED_VOLUNTEER_EVENTS_INTERVAL", 24 * 60 * 60))
+)
+if os.environ.get("FEED_PREFETCH_ENABLED", "1") == "1":
+  feed_scheduler.start()
+
 CORS(app)
 
 # --------------------------
@@ -33,39 +87,58 @@ jwt =  JWTManager(app)
 # --------------------------
 reports ={}
 
+# --------------------------
+# Database: credentials are read once and connections are pooled per worker
+# --------------------------
+db_pool = DatabasePool.from_env()
+tile_cache = TileCache.from_env()
+# Persist cached SerpApi responses so every worker (and restarts) share them
+serpapi_cache.store = SerpResultStore(db_pool)
+# Credit ceilings are counted in Postgres so they hold across workers and restarts
+serpapi_budget_manager.ledger = CreditLedger(db_pool)
+boundary_index = BoundaryIndex(db_pool)
+duplicate_index = ReportDuplicateIndex(db_pool)
+report_events = live_feed.ReportEventHub(db_pool)
+safe_places_catalog = SafePlacesCatalog(db_pool)
+subscription_matcher = SubscriptionMatcher(
+  db_pool, refresh_interval=float(os.environ.get("SUBSCRIPTIONS_REFRESH_INTERVAL", 60))
+)
+# Alert keywords are compiled on first use from the alert_keywords table and reloaded periodically
+severity_classifier = ReloadingClassifier(
+  db_pool, reload_interval=float(os.environ.get("ALERT_KEYWORDS_RELOAD_INTERVAL", 60))
+)
+# Rollups are warmed and kept fresh in the background so trend requests never rebuild them
+statistics_rollup = StatisticsRollup(
+    db_pool, max_staleness=float(os.environ.get("STATISTICS_ROLLUP_MAX_STALENESS", 60)),
+    enabled=os.environ.get("STATISTICS_ROLLUP_ENABLED", "1") == "1"
+)
+statistics_rollup.start()
+
+
+def get_severity_classifier():
+  return severity_classifier
+
+
+# --------------------------
+# Incident watch: polls for major incidents and writes community_alert notifications
+# --------------------------
+incident_watcher = IncidentWatcher(
+  db_pool,
+  classifier=severity_classifier,
+  min_interval=float(os.environ.get("INCIDENT_WATCH_MIN_INTERVAL", 2 * 60)),
+  max_interval=float(os.environ.get("INCIDENT_WATCH_MAX_INTERVAL", 30 * 60))
+)
+# Off by default: each poll spends SerpApi credits. Run one worker with it on, or `python incident_watch.py`.
+if os.environ.get("INCIDENT_WATCH_ENABLED", "0") == "1":
+  incident_watcher.start()
+
 
 def execute_sql_query(query, args=None, fetch=False):
-  """Run a SQL query against Postgres. If fetch=True, returns all rows."""
-  with open('database_credentials.json') as f:
-    creds = json.load(f)
-  
-  conn = None
-  cur = None
+  """Run a SQL query against Postgres on a pooled connection. If fetch=True, returns all rows."""
   try:
-    conn = pg.connect(
-       database=creds['DB_NAME'],
-       user=creds['DB_USER'],
-       password=creds['DB_PASS'],
-       host=creds['DB_HOST'],
-       port=creds['DB_PORT']
-    )
-    # Execute sql query
-    cur = conn.cursor()
-    cur.execute(query, args or ())
-    if fetch:
-       rows = cur.fetchall()
-       conn.commit()
-       return rows
-    conn.commit()
+    return db_pool.execute(query, args, fetch=fetch)
   except Exception as e:
     print(f"Error occurred while attempting to execute {query} query.\n\n Error: {e}")
-    if conn:
-      conn.rollback()
-  finally:
-    if cur is not None:
-      cur.close()
-    if conn is not None:
-      conn.close()
 
 @app.route('/')
 def index():
@@ -74,6 +147,11 @@ def index():
      "timestamp": datetime.utcnow().isoformat() + "Z"
   }), 200
 
+@app.route('/api/v1/health/db', methods=['GET'])
+def database_health():
+  """Expose connection pool usage so DB_POOL_* settings can be tuned."""
+  return jsonify(db_pool.stats()), 200
+
 # ───────────────────────────────────────────────────
 # AUTH: Signup
 # ───────────────────────────────────────────────────
@@ -162,6 +240,25 @@ def create_report():
   # Prepare WKT geography
   point_wkt = f"SRID=4326;POINT({data['longitude']} {data['latitude']})"
 
+  # Stamp neighborhood / council district from the in-memory boundary index
+  try:
+    area = boundary_index.lookup(data['longitude'], data['latitude'])
+  except Exception as e:
+    print(f"Error looking up boundaries for report {report_id}: {e}")
+    area = {"neighborhood": None, "council_district": None}
+
+  # Link near-duplicates (same incident, same place, same few hours) to the original report
+  try:
+    match = duplicate_index.find_duplicate(data['description'], float(data['longitude']), float(data['latitude']))
+  except Exception as e:
+    print(f"Error checking duplicates for report {report_id}: {e}")
+    match = None
+  original_report_id = match[0] if match else None
+
+  # Tag the description with any alert keywords so responders can triage by them
+  alert_severity, alert_keywords = get_severity_classifier().classify(data['description'])
+  metadata = {"alert_severity": alert_severity, "alert_keywords": alert_keywords} if alert_severity else None
+
   # Insert into reports
   insert_sql = """
   INSERT INTO reports (
@@ -172,12 +269,18 @@ def create_report():
     description,
     severity,
     location_point,
+    neighborhood,
+    council_district,
+    is_duplicate,
+    original_report_id,
+    metadata,
     status,
     created_at,
     updated_at
   ) VALUES (
     %s, %s, %s, %s, %s, %s,
     ST_GeogFromText(%s),
+    %s, %s, %s, %s, %s::jsonb,
     'submitted',
     CURRENT_TIMESTAMP,
     CURRENT_TIMESTAMP
@@ -191,7 +294,9 @@ def create_report():
     severity,
     ST_AsGeoJSON(location_point) AS location,
     status,
-    created_at;
+    created_at,
+    is_duplicate,
+    original_report_id;
   """
   try:
     row = execute_sql_query(
@@ -203,59 +308,289 @@ def create_report():
         data['category_id'],
         data['description'],
         data['severity'],
-        point_wkt
+        point_wkt,
+        area['neighborhood'],
+        area['council_district'],
+        original_report_id is not None,
+        original_report_id,
+        json.dumps(metadata) if metadata else None
       ),
       fetch=True
     )[0]
   except Exception as e:
     return jsonify({"error": "Failed to create report", "details": str(e)}), 500
 
-  keys = ['report_id','tracking_number','user_id','category_id','description','severity','location','status','created_at']
+  keys = ['report_id','tracking_number','user_id','category_id','description','severity','location','status','created_at',
+          'is_duplicate','original_report_id']
   report = dict(zip(keys, row))
+  try:
+    duplicate_index.add(str(report['report_id']), data['description'], float(data['longitude']),
+                        float(data['latitude']), report['created_at'], original_report_id)
+  except Exception as e:
+    print(f"Error indexing report {report_id} for duplicate detection: {e}")
+  try:
+    live_feed.publish(db_pool, {
+      "event": "report_created",
+      "report_id": str(report['report_id']),
+      "tracking_number": report['tracking_number'],
+      "category_id": report['category_id'],
+      "severity": report['severity'],
+      "status": report['status'],
+      "council_district": area['council_district'],
+      "is_duplicate": report['is_duplicate'],
+      "longitude": float(data['longitude']),
+      "latitude": float(data['latitude']),
+      "created_at": report['created_at']
+    })
+  except Exception as e:
+    print(f"Error publishing live event for report {report_id}: {e}")
+  try:
+    subscription_matcher.publish({
+      "report_id": str(report['report_id']),
+      "type": "new_report",
+      "message": f"New report {report['tracking_number']}: {report['description'][:140]}",
+      "category_id": report['category_id'],
+      "council_district": area['council_district'],
+      "longitude": data['longitude'],
+      "latitude": data['latitude'],
+      "actor_user_id": str(report['user_id'])
+    })
+  except Exception as e:
+    print(f"Error matching subscriptions for report {report_id}: {e}")
   return jsonify(report), 201
 
+REPORT_KEYS = ['report_id','tracking_number','user_id','category_id',
+               'description','severity','location','status','created_at']
+REPORTS_DEFAULT_PAGE_SIZE = int(os.environ.get("REPORTS_DEFAULT_PAGE_SIZE", 100))
+REPORTS_MAX_PAGE_SIZE = int(os.environ.get("REPORTS_MAX_PAGE_SIZE", 5000))
+# Pages larger than this are streamed from a server-side cursor instead of built in memory
+REPORTS_STREAM_THRESHOLD = int(os.environ.get("REPORTS_STREAM_THRESHOLD", 500))
+
+
+def encode_cursor(created_at, report_id):
+  """Opaque keyset token for the (created_at, report_id) of the last row on a page."""
+  raw = json.dumps([created_at.isoformat(), str(report_id)]).encode()
+  return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+  """Inverse of encode_cursor. Raises ValueError on a malformed token."""
+  try:
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    created_at, report_id = json.loads(raw)
+    return datetime.fromisoformat(created_at), str(uuid.UUID(report_id))
+  except Exception as e:
+    raise ValueError(f"Invalid cursor: {token}") from e
+
+
 @app.route('/api/v1/reports', methods=['GET'])
 def list_reports():
+  """
+  List reports newest first using keyset pagination on (created_at, report_id).
+  Query params:
+  - user_id: Only reports submitted by this user
+  - limit: Page size (default REPORTS_DEFAULT_PAGE_SIZE, max REPORTS_MAX_PAGE_SIZE)
+  - cursor: next_cursor value from the previous page
+  """
   user_filter = request.args.get('user_id')
+  try:
+    limit = int(request.args.get('limit', REPORTS_DEFAULT_PAGE_SIZE))
+  except ValueError:
+    return jsonify({"error": "limit must be an integer"}), 400
+  limit = max(1, min(limit, REPORTS_MAX_PAGE_SIZE))
+
+  sql = """
+  SELECT
+    report_id,
+    tracking_number,
+    user_id,
+    category_id,
+    description,
+    severity,
+    ST_AsGeoJSON(location_point) AS location,
+    status,
+    created_at
+  FROM reports
+  WHERE 1=1
+  """
+  args = []
   if user_filter:
-      sql = """
-      SELECT
-        report_id,
-        tracking_number,
-        user_id,
-        category_id,
-        description,
-        severity,
-        ST_AsGeoJSON(location_point) AS location,
-        status,
-        created_at
-      FROM reports
-      WHERE user_id = %s
-      ORDER BY created_at DESC;
-      """
-      rows = execute_sql_query(sql, args=(user_filter,), fetch=True)
+    sql += " AND user_id = %s"
+    args.append(user_filter)
+
+  cursor = request.args.get('cursor')
+  if cursor:
+    try:
+      cursor_created_at, cursor_report_id = decode_cursor(cursor)
+    except ValueError as e:
+      return jsonify({"error": str(e)}), 400
+    sql += " AND (created_at, report_id) < (%s, %s)"
+    args.extend([cursor_created_at, cursor_report_id])
+
+  # Fetch one extra row to learn whether another page exists
+  sql += " ORDER BY created_at DESC, report_id DESC LIMIT %s"
+  args.append(limit + 1)
+
+  if limit > REPORTS_STREAM_THRESHOLD:
+    return Response(
+      stream_with_context(stream_report_page(sql, args, limit)),
+      mimetype='application/json'
+    )
+
+  rows = execute_sql_query(sql, args=args, fetch=True)
+  if rows is None:
+    return jsonify({"error": "Failed to list reports"}), 500
+
+  page = rows[:limit]
+  next_cursor = None
+  if len(rows) > limit:
+    next_cursor = encode_cursor(page[-1][8], page[-1][0])
+  reports = [dict(zip(REPORT_KEYS, r)) for r in page]
+  return jsonify({"reports": reports, "next_cursor": next_cursor}), 200
+
+
+def stream_report_page(sql, args, limit):
+  """Yield a {"reports": [...], "next_cursor": ...} document one row at a time."""
+  yield '{"reports":['
+  last = None
+  next_cursor = None
+  for i, row in enumerate(db_pool.stream(sql, args)):
+    if i == limit:
+      next_cursor = encode_cursor(last[8], last[0])
+      break
+    yield (',' if i else '') + flask_json.dumps(dict(zip(REPORT_KEYS, row)))
+    last = row
+  yield '],"next_cursor":' + flask_json.dumps(next_cursor) + '}'
+
+
+REPORT_CHANGE_KEYS = REPORT_KEYS + ['council_district', 'updated_at']
+
+
+def encode_change_cursor(changed_at, report_id, sync_started=None):
+  """
+  Change-feed cursor. sync_started is set while an initial sync is still being
+  paged through, so later pages keep filtering instead of emitting deletes.
+  """
+  values = [changed_at.isoformat(), str(report_id)]
+  if sync_started is not None:
+    values.append(sync_started.isoformat())
+  raw = json.dumps(values).encode()
+  return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_change_cursor(token):
+  """Inverse of encode_change_cursor: (changed_at, report_id, sync_started or None)."""
+  try:
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    changed_at, report_id, *rest = json.loads(raw)
+    sync_started = datetime.fromisoformat(rest[0]) if rest else None
+    return datetime.fromisoformat(changed_at), str(uuid.UUID(report_id)), sync_started
+  except Exception as e:
+    raise ValueError(f"Invalid cursor: {token}") from e
+
+
+# Changes younger than this are held back so a slow commit can't land behind a cursor already handed out.
+# Writers must commit within this long of stamping a row: single-row writes do, and the batch merge in
+# report_ingest stamps rows with clock_timestamp() so only the merge statement, not its COPY, counts.
+REPORT_CHANGES_SETTLE_SECONDS = float(os.environ.get("REPORT_CHANGES_SETTLE_SECONDS", 5))
+
+
+@app.route('/api/v1/reports/changes', methods=['GET'])
+def list_report_changes():
+  """
+  Reports created, updated or deleted since a cursor, oldest change first.
+  Query params:
+  - since: next_cursor value from the previous call (omit for a full initial sync)
+  - limit: Page size (default REPORTS_DEFAULT_PAGE_SIZE, max REPORTS_MAX_PAGE_SIZE)
+  - category_id, start_date, end_date, status, council_district: same filters as the heatmap
+
+  Each change is {"op": "upsert", "report": {...}} or {"op": "delete", "report_id": ...}.
+  With filters, a report that changed but no longer matches them comes back as a delete,
+  so a filtered local copy stays correct. While an initial sync is paged through, only
+  matching reports are returned (plus anything changed since it began), so the client
+  is not sent deletes for reports it never had.
+  """
+  try:
+    limit = int(request.args.get('limit', REPORTS_DEFAULT_PAGE_SIZE))
+  except ValueError:
+    return jsonify({"error": "limit must be an integer"}), 400
+  limit = max(1, min(limit, REPORTS_MAX_PAGE_SIZE))
+
+  since = request.args.get('since')
+  if since:
+    try:
+      since_at, since_id, sync_started = decode_change_cursor(since)
+    except ValueError as e:
+      return jsonify({"error": str(e)}), 400
   else:
-      sql = """
-      SELECT
-        report_id,
-        tracking_number,
-        user_id,
-        category_id,
-        description,
-        severity,
-        ST_AsGeoJSON(location_point) AS location,
-        status,
-        created_at
-      FROM reports
-      ORDER BY created_at DESC
-      LIMIT 100;
-      """
-      rows = execute_sql_query(sql, fetch=True)
+    since_at, since_id, sync_started = datetime.min, str(uuid.UUID(int=0)), None
+  initial = not since or sync_started is not None
 
-  keys = ['report_id','tracking_number','user_id','category_id',
-          'description','severity','location','status','created_at']
-  reports = [dict(zip(keys, r)) for r in rows]
-  return jsonify(reports), 200
+  filters, filter_args = build_report_filters(request.args)
+  # A changed row is an upsert while it matches the filters and a delete once it doesn't
+  op_sql = f"CASE WHEN TRUE{filters} THEN 'upsert' ELSE 'delete' END"
+  if initial:
+    # Initial sync: only matching rows, plus rows changed after the sync began, which the
+    # client may already hold from an earlier page
+    where_sql = f" AND (TRUE{filters} OR updated_at > COALESCE(%s::timestamptz, CURRENT_TIMESTAMP))"
+    where_args = filter_args + [sync_started]
+    deletions_sql = " AND deleted_at > COALESCE(%s::timestamptz, CURRENT_TIMESTAMP)"
+    deletions_args = [sync_started]
+  else:
+    where_sql, where_args, deletions_sql, deletions_args = "", [], "", []
+
+  sql = f"""
+  WITH changes AS (
+    SELECT
+      {op_sql} AS op,
+      report_id,
+      tracking_number,
+      user_id,
+      category_id,
+      description,
+      severity,
+      ST_AsGeoJSON(location_point) AS location,
+      status,
+      created_at,
+      council_district,
+      updated_at AS changed_at
+    FROM reports
+    WHERE (updated_at, report_id) > (%s, %s)
+      AND updated_at <= CURRENT_TIMESTAMP - make_interval(secs => %s){where_sql}
+    UNION ALL
+    SELECT
+      'delete', report_id, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+      deleted_at
+    FROM report_deletions
+    WHERE (deleted_at, report_id) > (%s, %s)
+      AND deleted_at <= CURRENT_TIMESTAMP - make_interval(secs => %s){deletions_sql}
+  )
+  SELECT *, CURRENT_TIMESTAMP AS read_at FROM changes
+  ORDER BY changed_at, report_id
+  LIMIT %s
+  """
+  args = (filter_args + [since_at, since_id, REPORT_CHANGES_SETTLE_SECONDS] + where_args
+          + [since_at, since_id, REPORT_CHANGES_SETTLE_SECONDS] + deletions_args + [limit + 1])
+
+  rows = execute_sql_query(sql, args=args, fetch=True)
+  if rows is None:
+    return jsonify({"error": "Failed to list report changes"}), 500
+
+  page = rows[:limit]
+  has_more = len(rows) > limit
+  changes = []
+  for op, *fields, _ in page:
+    if op == 'upsert':
+      changes.append({"op": op, "report": dict(zip(REPORT_CHANGE_KEYS, fields))})
+    else:
+      changes.append({"op": op, "report_id": fields[0]})
+  if page:
+    # The cursor stays in initial mode until the initial sync has been read to the end
+    started = (sync_started or page[0][-1]) if initial and has_more else None
+    next_cursor = encode_change_cursor(page[-1][-2], page[-1][1], started)
+  else:
+    next_cursor = since
+  return jsonify({"changes": changes, "next_cursor": next_cursor, "has_more": has_more}), 200
 
 
 @app.route('/api/v1/reports/<report_id>', methods=['GET'])
@@ -278,11 +613,12 @@ def get_report(report_id):
   if not rows:
       return jsonify({"error": "Report not found"}), 404
 
-  keys = ['report_id','tracking_number','user_id','category_id',
-          'description','severity','location','status','created_at']
-  report = dict(zip(keys, rows[0]))
+  report = dict(zip(REPORT_KEYS, rows[0]))
   return jsonify(report), 200
 
+# Moving a report into one of these stamps resolved_at; moving it out clears it
+RESOLVED_STATUSES = ('resolved', 'closed')
+
 @app.route('/api/v1/reports/<report_id>/updates', methods=['POST'])
 def add_report_update(report_id):
   data = request.get_json() or {}
@@ -291,51 +627,136 @@ def add_report_update(report_id):
   if missing:
       return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
 
-  # Ensure report exists
-  exists = execute_sql_query(
-      "SELECT 1 FROM reports WHERE report_id = %s;",
-      args=(report_id,), fetch=True
-  )
-  if not exists:
-      return jsonify({"error": "Report not found"}), 404
+  try:
+    report_id = str(uuid.UUID(report_id))
+  except ValueError:
+    return jsonify({"error": "Report not found"}), 404
 
-  update_id = str(uuid.uuid4())
-  insert_sql = """
-  INSERT INTO report_updates (
-    update_id,
-    report_id,
-    user_id,
-    status_change,
-    comment,
-    created_at
-  ) VALUES (
-    %s, %s, %s, %s, %s, CURRENT_TIMESTAMP
+  # One round trip: lock the report, record the update, move its status (stamping
+  # resolved_at on resolution), write the audit row and notify live feeds, all in
+  # one transaction. No rows back means the report does not exist.
+  update_sql = """
+  WITH target AS (
+    SELECT report_id, status, resolved_at, tracking_number, category_id, council_district,
+           ST_X(location_point::geometry) AS longitude, ST_Y(location_point::geometry) AS latitude
+    FROM reports
+    WHERE report_id = %(report_id)s
+    FOR UPDATE
+  ),
+  inserted AS (
+    INSERT INTO report_updates (update_id, report_id, user_id, status_change, comment, created_at)
+    SELECT %(update_id)s, report_id, %(user_id)s, %(status)s, %(comment)s, CURRENT_TIMESTAMP
+    FROM target
+    RETURNING update_id, report_id, user_id, status_change, comment, created_at
+  ),
+  updated AS (
+    UPDATE reports AS r
+    SET status = %(status)s,
+        updated_at = CURRENT_TIMESTAMP,
+        resolved_at = CASE WHEN %(status)s = ANY(%(resolved_statuses)s)
+                           THEN COALESCE(t.resolved_at, CURRENT_TIMESTAMP) END
+    FROM target AS t
+    WHERE r.report_id = t.report_id
+    RETURNING r.report_id, r.status, r.resolved_at
+  ),
+  audited AS (
+    INSERT INTO audit_log (user_id, action, entity_type, entity_id, old_values, new_values, ip_address, user_agent)
+    SELECT %(user_id)s, 'report_status_change', 'report', t.report_id,
+           jsonb_build_object('status', t.status, 'resolved_at', t.resolved_at),
+           jsonb_build_object('status', u.status, 'resolved_at', u.resolved_at, 'update_id', i.update_id),
+           %(ip_address)s, %(user_agent)s
+    FROM target AS t
+    JOIN updated AS u USING (report_id)
+    JOIN inserted AS i USING (report_id)
   )
-  RETURNING update_id, report_id, user_id, status_change, comment, created_at;
+  SELECT i.update_id, i.report_id, i.user_id, i.status_change, i.comment, i.created_at,
+         t.tracking_number, t.category_id, t.council_district, t.longitude, t.latitude,
+         pg_notify(%(channel)s, jsonb_build_object(
+           'event', 'report_updated',
+           'report_id', t.report_id,
+           'tracking_number', t.tracking_number,
+           'category_id', t.category_id,
+           'status', i.status_change,
+           'council_district', t.council_district,
+           'longitude', t.longitude,
+           'latitude', t.latitude,
+           'updated_at', i.created_at
+         )::text)
+  FROM inserted AS i
+  JOIN target AS t USING (report_id);
   """
-
   try:
-      row = execute_sql_query(
-          insert_sql,
-          args=(update_id, report_id, data['user_id'], data['status_change'], data['comment']),
-          fetch=True
-      )[0]
-
-      # Also update the report's current status
-      execute_sql_query(
-          "UPDATE reports SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE report_id = %s;",
-          args=(data['status_change'], report_id)
-      )
+    with db_pool.unit_of_work() as uow:
+      row = uow.fetchone(update_sql, {
+        "report_id": report_id,
+        "update_id": str(uuid.uuid4()),
+        "user_id": data['user_id'],
+        "status": data['status_change'],
+        "comment": data['comment'],
+        "resolved_statuses": list(RESOLVED_STATUSES),
+        "ip_address": request.remote_addr,
+        "user_agent": request.headers.get('User-Agent'),
+        "channel": live_feed.CHANNEL,
+      })
   except Exception as e:
-      return jsonify({"error": "Failed to add update", "details": str(e)}), 500
+    return jsonify({"error": "Failed to add update", "details": str(e)}), 500
+  if row is None:
+    return jsonify({"error": "Report not found"}), 404
 
   keys = ['update_id','report_id','user_id','status_change','comment','created_at']
   update = dict(zip(keys, row))
+  tracking_number, category_id, council_district, longitude, latitude = row[6:11]
+  try:
+    subscription_matcher.publish({
+      "report_id": str(report_id),
+      "type": "status_change",
+      "message": f"Report {tracking_number} is now {data['status_change']}",
+      "category_id": category_id,
+      "council_district": council_district,
+      "longitude": longitude,
+      "latitude": latitude,
+      "actor_user_id": str(data['user_id'])
+    })
+  except Exception as e:
+    print(f"Error matching subscriptions for report {report_id}: {e}")
   return jsonify(update), 201
 
+@app.route('/api/v1/serpapi/cache/stats', methods=['GET'])
+def serpapi_cache_stats():
+  """Hit/miss and credits-saved counters for the SerpApi response cache, plus upstream circuit state."""
+  return jsonify({
+    **serpapi_cache.stats(),
+    "coalesced_requests": serpapi_client.async_service.coalesced,
+    "circuit_breaker": serpapi_breaker.stats()
+  }), 200
+
+@app.route('/api/v1/serpapi/budget', methods=['GET'])
+def serpapi_budget():
+  """Remaining SerpApi credits, rate-limit tokens and denials per priority."""
+  return jsonify(serpapi_budget_manager.stats()), 200
+
+@app.route('/api/v1/serpapi/feeds/status', methods=['GET'])
+def serpapi_feeds_status():
+  """Last refresh, failure and next-run times for the prefetched feeds."""
+  return jsonify(feed_scheduler.status()), 200
+
+@app.route('/api/v1/subscriptions/matcher/stats', methods=['GET'])
+def subscription_matcher_stats():
+  """Events matched, notifications queued/written and subscriptions indexed."""
+  return jsonify(subscription_matcher.stats()), 200
+
+@app.route('/api/v1/alerts/watch/status', methods=['GET'])
+def incident_watch_status():
+  """Poll interval, counters and last error of the incident watcher."""
+  return jsonify(incident_watcher.status()), 200
+
 @app.route('/api/v1/serpapi/news', methods=['GET'])
 def serpapi_news():
-  query = request.args.get('q', 'Austin')  # default to "Austin" if no query
+  query = request.args.get('q', DEFAULT_NEWS_QUERY)  # default to "Austin" if no query
+  if query == DEFAULT_NEWS_QUERY:
+      news = feed_scheduler.get('news')
+      if news:
+          return jsonify(news)
   try:
       news = news_fetcher.fetch_general_news(query)
       if not news:
@@ -347,6 +768,9 @@ def serpapi_news():
 
 @app.route('/api/v1/serpapi/events', methods=['GET'])
 def serpapi_events():
+  events = feed_scheduler.get('events')
+  if events:
+      return jsonify(events)
   try:
       events = events_fetcher.fetch_events_for_location(query="Events in Austin, TX")
       if not events:
@@ -358,6 +782,9 @@ def serpapi_events():
 
 @app.route('/api/v1/serpapi/volunteer-events', methods=['GET'])
 def serpapi_volunteer_events():
+  events = feed_scheduler.get('volunteer_events')
+  if events:
+      return jsonify(events)
   try:
       events = volunteer_events_fetcher.fetch_volunteer_events(location="Austin, Texas")
       if not events:
@@ -367,6 +794,113 @@ def serpapi_volunteer_events():
       print(e)
       return jsonify({"error": "Failed to fetch volunteer events", "details": str(e)}), 500
 
+def build_report_filters(params, alias=''):
+    """
+    Translate the heatmap filter query params into SQL clauses.
+    Returns a string of " AND ..." clauses and the matching argument list.
+    """
+    prefix = f"{alias}." if alias else ""
+    clauses = ""
+    args = []
+
+    if params.get('category_id'):
+        clauses += f" AND {prefix}category_id = %s"
+        args.append(params['category_id'])
+
+    if params.get('start_date'):
+        clauses += f" AND {prefix}created_at >= %s"
+        args.append(params['start_date'])
+
+    if params.get('end_date'):
+        clauses += f" AND {prefix}created_at <= %s"
+        args.append(params['end_date'])
+
+    if params.get('status'):
+        clauses += f" AND {prefix}status = %s"
+        args.append(params['status'])
+
+    if params.get('council_district'):
+        clauses += f" AND {prefix}council_district = %s"
+        args.append(params['council_district'])
+
+    return clauses, args
+
+REPORTS_BATCH_MAX = int(os.environ.get("REPORTS_BATCH_MAX", 50000))
+
+
+@app.route('/api/v1/reports:batch', methods=['POST'])
+def create_reports_batch():
+  """
+  Create many reports in one request
+  Body: a JSON array of report objects, or NDJSON (one object per line) with
+  Content-Type application/x-ndjson. Each object needs user_id, category_id,
+  description, severity, latitude and longitude.
+
+  Returns one result per input row, in order: {"index", "report_id",
+  "tracking_number"} when inserted, or {"index", "error"}.
+  """
+  try:
+    records = parse_batch(request.get_data(), request.content_type or '')
+  except ValueError as e:
+    return jsonify({"error": f"Invalid batch body: {e}"}), 400
+  if not records:
+    return jsonify({"error": "Batch is empty"}), 400
+  if len(records) > REPORTS_BATCH_MAX:
+    return jsonify({"error": f"Batch exceeds {REPORTS_BATCH_MAX} reports"}), 413
+
+  ingestor = BatchIngestor(
+    db_pool,
+    boundary_index=boundary_index,
+    duplicate_index=duplicate_index,
+    classifier=get_severity_classifier,
+    subscription_matcher=subscription_matcher,
+    channel=live_feed.CHANNEL
+  )
+  try:
+    results = ingestor.ingest(records)
+  except Exception as e:
+    return jsonify({"error": "Failed to create reports", "details": str(e)}), 500
+
+  inserted = sum(1 for r in results if 'report_id' in r)
+  body = {"inserted": inserted, "failed": len(results) - inserted, "results": results}
+  return jsonify(body), 201 if inserted else 400
+
+@app.route('/api/v1/reports/live', methods=['GET'])
+def live_reports():
+    """
+    Server-Sent Events stream of report inserts and status changes
+    Query params:
+    - bbox: minLng,minLat,maxLng,maxLat viewport (default: everywhere)
+    - category_id, status, council_district: same filters as the heatmap
+    - policy: "drop" (default) skips the oldest queued events for a slow client
+      and sends a `lagged` event; "disconnect" ends the stream with `resync`
+    """
+    try:
+        bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+        subscriber = live_feed.LiveSubscriber(
+            bbox=bbox,
+            filters={key: request.args.get(key) for key in live_feed.FILTER_KEYS},
+            policy=request.args.get('policy', 'drop')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    report_events.subscribe(subscriber)
+
+    def generate():
+        try:
+            yield from subscriber.stream()
+        finally:
+            report_events.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/v1/reports/live/stats', methods=['GET'])
+def live_reports_stats():
+    """Connected live streams, queued events and LISTEN reconnects for this worker."""
+    return jsonify(report_events.stats()), 200
+
 @app.route('/api/v1/heatmap', methods=['GET'])
 def get_heatmap_data():
     """
@@ -377,20 +911,24 @@ def get_heatmap_data():
     - end_date: Filter ending at date (YYYY-MM-DD)
     - status: Filter by report status
     - council_district: Filter by council district
+
+    - agg: "hex" or "grid" to return per-cell aggregates instead of raw points
+    - zoom: Map zoom level used to size aggregation cells (default 12)
+    - bbox: minLng,minLat,maxLng,maxLat viewport for aggregation (default: Austin)
+
+    The FeatureCollection is streamed from a server-side cursor, so memory use and
+    time to first byte do not grow with the number of matching reports.
     """
-    # Parse query parameters
-    category_id = request.args.get('category_id')
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    status = request.args.get('status')
-    council_district = request.args.get('council_district')
-    
-    # Build base query
+    if request.args.get('agg'):
+        return get_heatmap_aggregates()
+
+    # Coordinates come back as plain floats rather than a GeoJSON string to re-parse
     query = """
     SELECT
         report_id,
         category_id,
-        ST_AsGeoJSON(location_point) AS location,
+        ST_X(location_point::geometry) AS lng,
+        ST_Y(location_point::geometry) AS lat,
         severity,
         status,
         created_at,
@@ -399,71 +937,172 @@ def get_heatmap_data():
     FROM reports
     WHERE 1=1
     """
-    
-    args = []
-    
-    # Add filters
-    if category_id:
-        query += " AND category_id = %s"
-        args.append(category_id)
-    
-    if start_date:
-        query += " AND created_at >= %s"
-        args.append(start_date)
-    
-    if end_date:
-        query += " AND created_at <= %s"
-        args.append(end_date)
-    
-    if status:
-        query += " AND status = %s"
-        args.append(status)
-    
-    if council_district:
-        query += " AND council_district = %s"
-        args.append(council_district)
-    
-    # Execute query
+    filters, args = build_report_filters(request.args)
+    query += filters
+
+    rows = db_pool.stream(query, args)
     try:
-        rows = execute_sql_query(query, args=args, fetch=True)
-        
-        # Process results to GeoJSON format
-        features = []
-        for row in rows:
-            report_id, category_id, location_json, severity, status, created_at, resolved_at, council_district = row
-            
-            try:
-                location_data = json.loads(location_json)
-                
-                # Create feature
-                feature = {
-                    "type": "Feature",
-                    "geometry": location_data,
-                    "properties": {
-                        "report_id": report_id,
-                        "category_id": category_id,
-                        "severity": severity,
-                        "status": status,
-                        "created_at": created_at.isoformat() if created_at else None,
-                        "resolved_at": resolved_at.isoformat() if resolved_at else None,
-                        "council_district": council_district
-                    }
-                }
-                features.append(feature)
-            except Exception as e:
-                print(f"Error processing location data for report {report_id}: {e}")
-    
+        # Pull the first row eagerly so a failing query can still fall back to sample data
+        first = next(rows, None)
     except Exception as e:
         print(f"Error fetching heatmap data: {e}")
         # If the query fails, return sample data
-        features = generate_sample_heatmap_data()
-    
-    geojson = {
+        geojson = {
+            "type": "FeatureCollection",
+            "features": generate_sample_heatmap_data()
+        }
+        return jsonify(geojson), 200
+
+    return Response(
+        stream_with_context(stream_heatmap_features(first, rows)),
+        mimetype='application/json'
+    )
+
+# Roughly the Austin city limits, used when an aggregation request has no bbox
+AUSTIN_BBOX = (-98.0, 30.05, -97.5, 30.55)
+# Web Mercator metres per pixel at zoom 0
+METERS_PER_PIXEL_Z0 = 156543.03392
+# Aggregation cells are this many screen pixels wide
+HEATMAP_CELL_PIXELS = int(os.environ.get("HEATMAP_CELL_PIXELS", 32))
+HEATMAP_GRID_FUNCTIONS = {"hex": "ST_HexagonGrid", "grid": "ST_SquareGrid"}
+# Requests whose viewport would span more cells than this are served at a coarser zoom
+HEATMAP_MAX_CELLS = int(os.environ.get("HEATMAP_MAX_CELLS", 20000))
+WEB_MERCATOR_RADIUS = 6378137.0
+
+def mercator_area(bbox):
+  """Area of a lng/lat bbox in square Web Mercator metres."""
+  min_lng, min_lat, max_lng, max_lat = bbox
+  def y(lat):
+    lat = min(max(lat, -85.05), 85.05)
+    return WEB_MERCATOR_RADIUS * math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+  width = WEB_MERCATOR_RADIUS * math.radians(max_lng - min_lng)
+  return width * (y(max_lat) - y(min_lat))
+
+def heatmap_zoom(bbox, zoom):
+  """The highest zoom <= `zoom` whose cells over `bbox` stay within HEATMAP_MAX_CELLS."""
+  area = mercator_area(bbox)
+  while zoom > 0 and area / (METERS_PER_PIXEL_Z0 / (2 ** zoom) * HEATMAP_CELL_PIXELS) ** 2 > HEATMAP_MAX_CELLS:
+    zoom -= 1
+  return zoom
+
+def parse_bbox(value):
+    """Parse "minLng,minLat,maxLng,maxLat". Raises ValueError on bad input."""
+    parts = [float(p) for p in value.split(',')]
+    if len(parts) != 4 or parts[0] >= parts[2] or parts[1] >= parts[3]:
+        raise ValueError(f"Invalid bbox: {value}")
+    return tuple(parts)
+
+def get_heatmap_aggregates():
+    """
+    Bin matching reports into hexagon or square cells inside PostGIS.
+    Payload size depends on the viewport and zoom, not on the number of reports.
+    """
+    agg = request.args.get('agg')
+    grid_function = HEATMAP_GRID_FUNCTIONS.get(agg)
+    if not grid_function:
+        return jsonify({"error": f"agg must be one of: {', '.join(HEATMAP_GRID_FUNCTIONS)}"}), 400
+
+    try:
+        zoom = min(max(int(request.args.get('zoom', 12)), 0), 22)
+        bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else AUSTIN_BBOX
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    requested_zoom = zoom
+    zoom = heatmap_zoom(bbox, zoom)
+    cell_size = METERS_PER_PIXEL_Z0 / (2 ** zoom) * HEATMAP_CELL_PIXELS
+    filters, filter_args = build_report_filters(request.args, alias='r')
+
+    # Each point looks up only the cell it falls in, so the grid over the whole
+    # viewport is never materialized and there is no cell x point join
+    query = f"""
+    WITH bounds AS (
+        SELECT ST_MakeEnvelope(%s, %s, %s, %s, 4326) AS geom
+    ),
+    points AS (
+        SELECT
+            ST_Transform(r.location_point::geometry, 3857) AS geom,
+            COALESCE(r.severity, 3) AS severity
+        FROM reports r, bounds b
+        WHERE r.location_point && b.geom::geography
+        {filters}
+    ),
+    binned AS (
+        SELECT c.i, c.j, c.geom, p.severity
+        FROM points p
+        CROSS JOIN LATERAL (
+            SELECT g.i, g.j, g.geom FROM {grid_function}(%s, p.geom) AS g LIMIT 1
+        ) AS c
+    )
+    SELECT
+        i,
+        j,
+        ST_X(ST_Transform(ST_Centroid(geom), 4326)) AS lng,
+        ST_Y(ST_Transform(ST_Centroid(geom), 4326)) AS lat,
+        COUNT(*) AS report_count,
+        SUM(severity) AS intensity,
+        MAX(severity) AS max_severity
+    FROM binned
+    GROUP BY i, j, geom
+    """
+    args = list(bbox) + filter_args + [cell_size]
+
+    rows = execute_sql_query(query, args=args, fetch=True)
+    if rows is None:
+        return jsonify({"error": "Failed to aggregate heatmap data"}), 500
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [lng, lat]
+            },
+            "properties": {
+                "cell": [i, j],
+                "report_count": report_count,
+                "intensity": intensity,
+                "max_severity": max_severity
+            }
+        } for i, j, lng, lat, report_count, intensity, max_severity in rows
+    ]
+    return jsonify({
         "type": "FeatureCollection",
+        "agg": agg,
+        "zoom": zoom,
+        "requested_zoom": requested_zoom,
+        "cell_size_m": round(cell_size, 2),
+        "bbox": list(bbox),
         "features": features
-    }
-    
-    return jsonify(geojson), 200
+    }), 200
+
+def stream_heatmap_features(first, rows):
+    """Yield a GeoJSON FeatureCollection one feature at a time."""
+    yield '{"type":"FeatureCollection","features":['
+    if first is not None:
+        yield heatmap_feature_json(first)
+        for row in rows:
+            yield ',' + heatmap_feature_json(row)
+    yield ']}'
+
+def heatmap_feature_json(row):
+    report_id, category_id, lng, lat, severity, status, created_at, resolved_at, council_district = row
+    return flask_json.dumps({
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [lng, lat]
+        },
+        "properties": {
+            "report_id": report_id,
+            "category_id": category_id,
+            "severity": severity,
+            "status": status,
+            "created_at": created_at.isoformat() if created_at else None,
+            "resolved_at": resolved_at.isoformat() if resolved_at else None,
+            "council_district": council_district
+        }
+    })
 
 def generate_sample_heatmap_data():
     """Generate sample heatmap data points around Austin"""
@@ -526,49 +1165,127 @@ def generate_sample_heatmap_data():
     
     return features
 
+REPORT_STATUSES = ('submitted', 'in_progress', 'resolved', 'closed')
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+
+
+def normalize_tile_filters(args):
+    """
+    Canonical form of the tile filter params, so that each distinct filter maps to
+    one cache directory: ids as ints, dates as ISO timestamps and status from
+    REPORT_STATUSES. Raises ValueError for anything else.
+    """
+    filters = {}
+    for name in ('category_id', 'council_district'):
+        if args.get(name):
+            filters[name] = int(args[name])
+    for name in ('start_date', 'end_date'):
+        if args.get(name):
+            filters[name] = datetime.fromisoformat(args[name]).isoformat()
+    if args.get('status'):
+        if args['status'] not in REPORT_STATUSES:
+            raise ValueError(f"status must be one of {', '.join(REPORT_STATUSES)}")
+        filters['status'] = args['status']
+    return filters
+
+
+@app.route('/api/v1/tiles/reports/<int:z>/<int:x>/<int:y>.mvt', methods=['GET'])
+def get_report_tile(z, x, y):
+    """
+    Mapbox Vector Tile of reports for one z/x/y tile, accepting the same filters as
+    /api/v1/heatmap. Tiles are cached in memory and on disk keyed by filter hash.
+    """
+    if not (0 <= z <= 22 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({"error": "Tile coordinates out of range"}), 400
+
+    try:
+        filter_params = normalize_tile_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid tile filter: {e}"}), 400
+    key = ('reports', filter_hash(filter_params), z, x, y)
+    tile = tile_cache.get(key)
+
+    if tile is None:
+        filters, filter_args = build_report_filters(filter_params, alias='r')
+        query = f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(%s, %s, %s) AS geom
+        ),
+        mvtgeom AS (
+            SELECT
+                ST_AsMVTGeom(
+                    ST_Transform(r.location_point::geometry, 3857),
+                    b.geom, {TILE_EXTENT}, {TILE_BUFFER}, true
+                ) AS geom,
+                r.report_id::text AS report_id,
+                r.category_id,
+                r.severity,
+                r.status,
+                r.council_district
+            FROM reports r, bounds b
+            WHERE r.location_point && ST_Transform(b.geom, 4326)::geography
+            {filters}
+        )
+        SELECT ST_AsMVT(mvtgeom.*, 'reports', {TILE_EXTENT}, 'geom') FROM mvtgeom;
+        """
+        rows = execute_sql_query(query, args=[z, x, y] + filter_args, fetch=True)
+        if rows is None:
+            return jsonify({"error": "Failed to render tile"}), 500
+        tile = bytes(rows[0][0] or b'')
+        tile_cache.put(key, tile)
+
+    response = Response(tile, mimetype='application/vnd.mapbox-vector-tile')
+    response.headers['Cache-Control'] = f"public, max-age={int(tile_cache.ttl)}"
+    return response
+
 @app.route('/api/v1/heatmap/statistics', methods=['GET'])
 def get_heatmap_statistics():
-    """Get statistics for heat map visualization"""
+    """
+    Get statistics for heat map visualization
+    Query params:
+    - category_id, start_date, end_date, status, council_district: Same filters as /api/v1/heatmap
+    - granularity: Time trend bucket size, one of day, week, month (default month)
+    """
     # Parse query parameters
     category_id = request.args.get('category_id')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     status = request.args.get('status')
+    council_district = request.args.get('council_district')
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in TREND_GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of: {', '.join(TREND_GRANULARITIES)}"}), 400
     
-    # Build base query for neighborhood statistics
-    # Using ST_DWithin instead of ST_Contains for geography type
-    query = """
+    # Reports are stamped with their neighborhood at insert time (see BoundaryIndex),
+    # so this is an indexed GROUP BY rather than a polygon-vs-point join
+    filters, args = build_report_filters({
+        'category_id': category_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'status': status,
+        'council_district': council_district
+    })
+    query = f"""
     SELECT
         n.neighborhood_id,
         n.name AS neighborhood_name,
-        COUNT(r.report_id) AS report_count,
-        AVG(EXTRACT(EPOCH FROM (r.resolved_at - r.created_at))/3600)::float AS avg_resolution_hours
+        COALESCE(s.report_count, 0) AS report_count,
+        s.avg_resolution_hours
     FROM neighborhoods n
-    LEFT JOIN reports r ON ST_DWithin(n.boundary::geography, r.location_point, 0)
-    WHERE 1=1
+    LEFT JOIN (
+        SELECT
+            neighborhood,
+            COUNT(*) AS report_count,
+            AVG(EXTRACT(EPOCH FROM (resolved_at - created_at))/3600)::float AS avg_resolution_hours
+        FROM reports
+        WHERE neighborhood IS NOT NULL
+        {filters}
+        GROUP BY neighborhood
+    ) s ON s.neighborhood = n.name
+    ORDER BY report_count DESC
     """
     
-    args = []
-    
-    # Add filters
-    if category_id:
-        query += " AND r.category_id = %s"
-        args.append(category_id)
-    
-    if start_date:
-        query += " AND r.created_at >= %s"
-        args.append(start_date)
-    
-    if end_date:
-        query += " AND r.created_at <= %s"
-        args.append(end_date)
-    
-    if status:
-        query += " AND r.status = %s"
-        args.append(status)
-    
-    query += " GROUP BY n.neighborhood_id, n.name ORDER BY report_count DESC"
-    
     # Execute query
     try:
         neighborhood_stats = execute_sql_query(query, args=args, fetch=True)
@@ -616,42 +1333,25 @@ def get_heatmap_statistics():
             ]
         }), 200
     
-    # Query for time-based trends (monthly)
-    trend_query = """
-    SELECT
-        TO_CHAR(DATE_TRUNC('month', created_at), 'YYYY-MM') AS month,
-        COUNT(*) AS report_count
-    FROM reports
-    WHERE 1=1
-    """
-    
-    # Add the same filters
-    trend_args = []
-    if category_id:
-        trend_query += " AND category_id = %s"
-        trend_args.append(category_id)
-    
-    if start_date:
-        trend_query += " AND created_at >= %s"
-        trend_args.append(start_date)
-    
-    if end_date:
-        trend_query += " AND created_at <= %s"
-        trend_args.append(end_date)
-    
-    if status:
-        trend_query += " AND status = %s"
-        trend_args.append(status)
-    
-    trend_query += " GROUP BY month ORDER BY month"
-    
+    # Time-based trends come from the incremental daily rollups in `statistics`
+    statistics_rollup.refresh_if_stale()
     try:
-        trend_data = execute_sql_query(trend_query, args=trend_args, fetch=True)
+        trend_data = statistics_rollup.time_trends(
+            granularity=granularity,
+            category_id=category_id,
+            council_district=council_district,
+            start_date=start_date,
+            end_date=end_date,
+            status=status
+        )
     except Exception as e:
         print(f"Error in trend query: {e}")
         # If this query fails, provide empty trend data
         trend_data = []
     
+    # Bucket labels: "2025-03" for months, the bucket's first day otherwise
+    date_format = '%Y-%m' if granularity == 'month' else '%Y-%m-%d'
+    
     # Format the results
     result = {
         "neighborhood_statistics": [
@@ -662,9 +1362,10 @@ def get_heatmap_statistics():
                 "avg_resolution_hours": row[3]
             } for row in (neighborhood_stats or [])
         ],
+        "granularity": granularity,
         "time_trends": [
             {
-                "month": row[0],
+                granularity: row[0].strftime(date_format),
                 "report_count": row[1]
             } for row in (trend_data or [])
         ]
@@ -672,114 +1373,48 @@ def get_heatmap_statistics():
     
     return jsonify(result), 200
 
+SAFE_PLACES_MAX_RESULTS = 50
+
+
+@app.route('/api/v1/safe-places/nearest', methods=['GET'])
+def nearest_safe_places():
+    """
+    Nearest catalogued safe places, answered from PostGIS without calling SerpApi
+    Query params:
+    - lat, lng: Caller's position (required)
+    - type: Comma-separated place types, e.g. shelter,police,fire,hospital,relief
+    - radius_m: Only places within this many meters
+    - limit: Number of places (default 10, max SAFE_PLACES_MAX_RESULTS)
+    """
+    try:
+        lat = float(request.args['lat'])
+        lng = float(request.args['lng'])
+        radius = float(request.args['radius_m']) if request.args.get('radius_m') else None
+        limit = max(1, min(int(request.args.get('limit', 10)), SAFE_PLACES_MAX_RESULTS))
+    except KeyError:
+        return jsonify({"error": "lat and lng are required"}), 400
+    except ValueError:
+        return jsonify({"error": "lat, lng, radius_m and limit must be numbers"}), 400
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return jsonify({"error": "lat/lng out of range"}), 400
+
+    types = [t.strip() for t in request.args.get('type', '').split(',') if t.strip()]
+    try:
+        places = safe_places_catalog.nearest(lat, lng, place_types=types, radius_meters=radius, limit=limit)
+    except Exception as e:
+        print(f"Error querying safe places: {e}")
+        return jsonify({"error": "Failed to look up safe places"}), 500
+    return jsonify({"places": places}), 200
+
 @app.route('/api/v1/heatmap/infrastructure', methods=['GET'])
 def get_infrastructure_data():
     """Get public infrastructure data to overlay on the map"""
-    # In a real implementation, this would come from your database
-    # For now, we'll return sample data
-    
+    # The same list is loaded into the safe_places catalog by safe_places.py
     infrastructure = {
         "type": "FeatureCollection",
-        "features": [
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7431, 30.2672]  # Austin City Hall
-                },
-                "properties": {
-                    "name": "City Hall",
-                    "type": "government",
-                    "address": "301 W 2nd St, Austin, TX 78701"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7365, 30.2849]  # APD Headquarters
-                },
-                "properties": {
-                    "name": "Police Headquarters",
-                    "type": "police",
-                    "address": "715 E 8th St, Austin, TX 78701"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7377, 30.2759]  # Austin Fire Station 1
-                },
-                "properties": {
-                    "name": "Fire Station 1",
-                    "type": "fire",
-                    "address": "401 E 5th St, Austin, TX 78701"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7516, 30.2751]  # Austin Public Library
-                },
-                "properties": {
-                    "name": "Central Library",
-                    "type": "library",
-                    "address": "710 W César Chávez St, Austin, TX 78701"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7359, 30.2664]  # Austin Convention Center
-                },
-                "properties": {
-                    "name": "Convention Center",
-                    "type": "public",
-                    "address": "500 E Cesar Chavez St, Austin, TX 78701"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7387, 30.2742]  # Travis County Courthouse
-                },
-                "properties": {
-                    "name": "County Courthouse",
-                    "type": "government",
-                    "address": "1000 Guadalupe St, Austin, TX 78701"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [-97.7428, 30.2745]  # Austin EMS Station
-                },
-                "properties": {
-                    "name": "EMS Station 6",
-                    "type": "medical",
-                    "address": "517 S Pleasant Valley Rd, Austin, TX 78741"
-                }
-            },
-            {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point", 
-                    "coordinates": [-97.7265, 30.2913]  # UT Austin
-                },
-                "properties": {
-                    "name": "UT Austin Campus",
-                    "type": "education",
-                    "address": "110 Inner Campus Drive, Austin, TX 78705"
-                }
-            }
-        ]
+        "features": INFRASTRUCTURE_FEATURES
     }
-    
+
     return jsonify(infrastructure), 200
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+# In-memory point-in-polygon lookup for neighborhoods and council districts
+import argparse
+import threading
+
+from psycopg2.extras import execute_values
+from shapely import STRtree, Point, wkb
+from shapely.prepared import prep
+
+
+class BoundaryIndex:
+    """
+    Loads `neighborhoods` and `council_districts` boundaries once into STRtrees of
+    prepared geometries so a report's point can be stamped with both without a
+    spatial join in Postgres. Call `refresh()` after boundaries change.
+    """
+
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+        self._lock = threading.Lock()
+        self._layers = None
+
+    def _load_layer(self, query):
+        rows = self.db_pool.execute(query, fetch=True) or []
+        geoms = [wkb.loads(bytes(boundary)) for _, boundary in rows]
+        return {
+            "values": [value for value, _ in rows],
+            "tree": STRtree(geoms),
+            "prepared": [prep(g) for g in geoms],
+        }
+
+    def refresh(self):
+        """(Re)load boundaries from the database."""
+        layers = {
+            "neighborhood": self._load_layer(
+                "SELECT name, ST_AsBinary(boundary::geometry) FROM neighborhoods;"
+            ),
+            "council_district": self._load_layer(
+                "SELECT district_id, ST_AsBinary(boundary::geometry) FROM council_districts;"
+            ),
+        }
+        with self._lock:
+            self._layers = layers
+
+    def _ensure_loaded(self):
+        if self._layers is None:
+            with self._lock:
+                needs_load = self._layers is None
+            if needs_load:
+                self.refresh()
+        return self._layers
+
+    def lookup(self, longitude, latitude):
+        """
+        Return {"neighborhood": name, "council_district": district_id} for a point.
+        Either value is None when the point falls outside every boundary.
+        """
+        layers = self._ensure_loaded()
+        point = Point(float(longitude), float(latitude))
+        result = {}
+        for column, layer in layers.items():
+            result[column] = None
+            # The tree narrows candidates by bounding box; prepared geometries do the exact test
+            for i in sorted(layer["tree"].query(point)):
+                if layer["prepared"][i].covers(point):
+                    result[column] = layer["values"][i]
+                    break
+        return result
+
+    def backfill(self, batch_size=5000, only_missing=True):
+        """Stamp neighborhood/council_district on existing reports. Returns rows updated."""
+        query = """
+        SELECT report_id, ST_X(location_point::geometry), ST_Y(location_point::geometry)
+        FROM reports
+        """
+        if only_missing:
+            query += " WHERE neighborhood IS NULL OR council_district IS NULL"
+
+        updated = 0
+        batch = []
+        for report_id, lng, lat in self.db_pool.stream(query, itersize=batch_size):
+            area = self.lookup(lng, lat)
+            batch.append((report_id, area["neighborhood"], area["council_district"]))
+            if len(batch) >= batch_size:
+                updated += self._write_batch(batch)
+                batch = []
+        if batch:
+            updated += self._write_batch(batch)
+        return updated
+
+    def _write_batch(self, batch):
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                UPDATE reports AS r
+                SET neighborhood = v.neighborhood,
+                    council_district = v.council_district
+                FROM (VALUES %s) AS v (report_id, neighborhood, council_district)
+                WHERE r.report_id = v.report_id::uuid
+                """, batch, template="(%s, %s, %s::integer)", page_size=len(batch))
+                return cur.rowcount
+
+
+if __name__ == "__main__":
+    from db import DatabasePool
+
+    parser = argparse.ArgumentParser(description="Backfill reports.neighborhood and reports.council_district")
+    parser.add_argument("--all", action="store_true", help="Recompute every report, not just unstamped ones")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    cli_args = parser.parse_args()
+
+    index = BoundaryIndex(DatabasePool.from_env())
+    count = index.backfill(batch_size=cli_args.batch_size, only_missing=not cli_args.all)
+    print(f"Backfilled {count} reports")
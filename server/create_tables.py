@@ -83,7 +83,7 @@ CREATE TABLE issue_subcategories (
 """
 CREATE TABLE reports (
     report_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    tracking_number VARCHAR(20) UNIQUE NOT NULL,
+    tracking_number VARCHAR(32) UNIQUE NOT NULL,
     user_id UUID REFERENCES users(user_id) ON DELETE SET NULL,
     category_id INTEGER REFERENCES issue_categories(category_id),
     subcategory_id INTEGER REFERENCES issue_subcategories(subcategory_id),
@@ -195,6 +195,93 @@ CREATE TABLE statistics (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 """,
+"""CREATE TABLE serpapi_credit_usage (
+    usage_date DATE PRIMARY KEY, -- UTC
+    credits INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+""",
+"""CREATE TABLE rollup_watermarks (
+    job_name VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+""",
+"""CREATE TABLE report_deletions (
+    report_id UUID PRIMARY KEY,
+    created_at TIMESTAMP WITH TIME ZONE, -- of the deleted report, so its rollup day can be rebuilt
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT clock_timestamp()
+);
+""",
+"""CREATE OR REPLACE FUNCTION touch_report_updated_at() RETURNS trigger AS $$
+BEGIN
+    -- Every change moves the row forward in /api/v1/reports/changes, whoever made it
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+""",
+"""CREATE TRIGGER reports_touch_updated_at
+    BEFORE UPDATE ON reports
+    FOR EACH ROW EXECUTE FUNCTION touch_report_updated_at();
+""",
+"""CREATE OR REPLACE FUNCTION record_report_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO report_deletions (report_id, created_at) VALUES (OLD.report_id, OLD.created_at)
+    ON CONFLICT (report_id) DO UPDATE
+    SET created_at = EXCLUDED.created_at, deleted_at = clock_timestamp();
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+""",
+"""CREATE TRIGGER reports_record_deletion
+    AFTER DELETE ON reports
+    FOR EACH ROW EXECUTE FUNCTION record_report_deletion();
+""",
+"""CREATE TABLE safe_places (
+    place_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    source VARCHAR(20) NOT NULL, -- serpapi, static
+    source_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    place_type VARCHAR(50) NOT NULL, -- shelter, police, fire, hospital, relief, ...
+    address TEXT,
+    rating FLOAT,
+    link TEXT,
+    location GEOGRAPHY(POINT, 4326) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (source, source_id)
+);
+""",
+"""CREATE TABLE open_data_records (
+    dataset VARCHAR(50) NOT NULL, -- crime_reports, service_requests, street_segments, traffic_incidents
+    source_id TEXT NOT NULL,
+    title TEXT,
+    category TEXT,
+    status TEXT,
+    occurred_at TIMESTAMP WITH TIME ZONE,
+    source_updated_at TIMESTAMP WITH TIME ZONE,
+    council_district INTEGER,
+    address TEXT,
+    location GEOGRAPHY(GEOMETRY, 4326), -- points, or lines for street segments
+    properties JSONB NOT NULL, -- the portal row as published
+    imported_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (dataset, source_id)
+);
+""",
+"""CREATE TABLE alert_keywords (
+    keyword VARCHAR(100) PRIMARY KEY,
+    severity VARCHAR(10) NOT NULL CHECK (severity IN ('Red', 'Yellow', 'Green')),
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+""",
+"""CREATE TABLE alert_seen (
+    key TEXT PRIMARY KEY,
+    seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+""",
 """CREATE TABLE subscriptions (
     subscription_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id UUID REFERENCES users(user_id) ON DELETE CASCADE,
@@ -276,23 +363,33 @@ CREATE TABLE statistics (
 """CREATE INDEX idx_reports_location ON reports USING GIST(location_point);""",
 """CREATE INDEX idx_reports_created_at ON reports(created_at);""",
 """CREATE INDEX idx_reports_council_district ON reports(council_district);""",
+"""CREATE INDEX idx_reports_neighborhood ON reports(neighborhood);""",
+"""CREATE INDEX idx_reports_updated_at ON reports(updated_at, report_id);""",
+"""CREATE INDEX idx_report_deletions_deleted_at ON report_deletions(deleted_at, report_id);""",
 """CREATE INDEX idx_report_media_report ON report_media(report_id);""",
 """CREATE INDEX idx_report_updates_report ON report_updates(report_id);""",
 """CREATE INDEX idx_report_updates_created_at ON report_updates(created_at);""",
 """CREATE INDEX idx_department_assignments_report ON department_assignments(report_id);""",
 """CREATE INDEX idx_department_assignments_department ON department_assignments(department_id);""",
 """CREATE INDEX idx_notifications_user ON notifications(user_id);""",
+"""CREATE INDEX idx_alert_seen_seen_at ON alert_seen(seen_at DESC);""",
 """CREATE INDEX idx_notifications_unread ON notifications(user_id, is_read) WHERE is_read = FALSE;""",
 """CREATE INDEX idx_report_votes_report ON report_votes(report_id);""",
 """CREATE INDEX idx_serpapi_results_report ON serpapi_results(report_id);""",
+"""CREATE INDEX idx_serpapi_results_query ON serpapi_results(md5(query_text), created_at DESC);""",
 """CREATE INDEX idx_statistics_date ON statistics(stat_date);""",
 """CREATE INDEX idx_statistics_category ON statistics(category_id);""",
 """CREATE INDEX idx_statistics_district ON statistics(council_district);""",
 """CREATE INDEX idx_subscriptions_user ON subscriptions(user_id);""",
+"""CREATE INDEX idx_subscriptions_active ON subscriptions(is_active) WHERE is_active;""",
 """CREATE INDEX idx_subscriptions_geographic ON subscriptions USING GIST(geographic_area);""",
 """CREATE INDEX idx_feedback_report ON feedback(report_id);""",
 """CREATE INDEX idx_audit_log_entity ON audit_log(entity_type, entity_id);""",
 """CREATE INDEX idx_audit_log_created_at ON audit_log(created_at);""",
+"""CREATE INDEX idx_safe_places_location ON safe_places USING GIST(location) WHERE is_active;""",
+"""CREATE INDEX idx_safe_places_type ON safe_places(place_type);""",
+"""CREATE INDEX idx_open_data_records_location ON open_data_records USING GIST(location);""",
+"""CREATE INDEX idx_open_data_records_occurred ON open_data_records(dataset, occurred_at);""",
 """CREATE INDEX idx_council_districts_boundary ON council_districts USING GIST(boundary);""",
 """CREATE INDEX idx_neighborhoods_boundary ON neighborhoods USING GIST(boundary);""",
 """CREATE INDEX idx_report_tags_report ON report_tags(report_id);""",
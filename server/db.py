@@ -0,0 +1,298 @@
+# Pooled Postgres access layer shared by every route in app.py
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import psycopg2 as pg
+from psycopg2 import pool as pg_pool
+
+CREDENTIALS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database_credentials.json')
+
+
+def load_credentials(path=None):
+    """Read database_credentials.json once. Env vars (DB_NAME, DB_USER, ...) override file values."""
+    path = path or os.environ.get("DB_CREDENTIALS_FILE", CREDENTIALS_FILE)
+    creds = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            creds = json.load(f)
+    for key in ("DB_NAME", "DB_USER", "DB_PASS", "DB_HOST", "DB_PORT"):
+        if os.environ.get(key):
+            creds[key] = os.environ[key]
+    return creds
+
+
+class UnitOfWork:
+    """Statements issued inside DatabasePool.unit_of_work(); they share one transaction."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, query, args=None, fetch=False):
+        self.cursor.execute(query, args or ())
+        if fetch:
+            return self.cursor.fetchall()
+
+    def fetchone(self, query, args=None):
+        self.cursor.execute(query, args or ())
+        return self.cursor.fetchone()
+
+
+class DatabasePool:
+    """
+    Thread-safe psycopg2 connection pool sized per worker process.
+
+    Connections are validated with a cheap `SELECT 1` when they have been idle for
+    longer than `health_check_after` seconds, and recycled once they exceed
+    `max_idle` seconds of idleness or `max_lifetime` seconds of age. The pool is
+    created lazily and re-created after a fork, so pre-forking servers (gunicorn)
+    never share sockets between workers.
+    """
+
+    def __init__(self, credentials, minconn=1, maxconn=10, max_idle=300,
+                 max_lifetime=1800, health_check_after=30, acquire_timeout=10):
+        self.credentials = credentials
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._slots = None
+        self._born = {}
+        self._last_used = {}
+        self._stats = {}
+        self._reset_stats()
+
+    @classmethod
+    def from_env(cls, credentials=None):
+        """Build a pool using DB_POOL_* environment variables for sizing."""
+        return cls(
+            credentials if credentials is not None else load_credentials(),
+            minconn=int(os.environ.get("DB_POOL_MIN", 1)),
+            maxconn=int(os.environ.get("DB_POOL_MAX", 10)),
+            max_idle=float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+            max_lifetime=float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+            health_check_after=float(os.environ.get("DB_POOL_HEALTH_CHECK_AFTER", 30)),
+            acquire_timeout=float(os.environ.get("DB_POOL_ACQUIRE_TIMEOUT", 10)),
+        )
+
+    def _reset_stats(self):
+        self._stats = {
+            "connections_opened": 0,
+            "connections_recycled": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+            "total_wait_ms": 0.0,
+        }
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pool is not None and self._pid == pid:
+            return self._pool
+        with self._lock:
+            if self._pool is None or self._pid != pid:
+                # After a fork the inherited sockets belong to the parent; drop them without closing.
+                self._born.clear()
+                self._last_used.clear()
+                self._reset_stats()
+                self._slots = threading.BoundedSemaphore(self.maxconn)
+                self._pool = pg_pool.ThreadedConnectionPool(
+                    self.minconn,
+                    self.maxconn,
+                    database=self.credentials['DB_NAME'],
+                    user=self.credentials['DB_USER'],
+                    password=self.credentials['DB_PASS'],
+                    host=self.credentials['DB_HOST'],
+                    port=self.credentials['DB_PORT']
+                )
+                self._pid = pid
+        return self._pool
+
+    def _check_age(self, conn, now):
+        """
+        Lifetime/idle bookkeeping, called with self._lock held. Returns "recycle",
+        "ping" when the connection has idled long enough to need a round trip, or "ok".
+        """
+        if conn.closed:
+            return "recycle"
+        born = self._born.get(id(conn))
+        if born is None:
+            self._born[id(conn)] = now
+            self._stats["connections_opened"] += 1
+        elif now - born > self.max_lifetime:
+            return "recycle"
+        idle = now - self._last_used.get(id(conn), now)
+        if idle > self.max_idle:
+            return "recycle"
+        if idle > self.health_check_after:
+            self._stats["health_checks"] += 1
+            return "ping"
+        return "ok"
+
+    @staticmethod
+    def _ping(conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except pg.Error:
+            return False
+
+    def getconn(self):
+        """Check a healthy connection out of the pool, blocking up to acquire_timeout seconds."""
+        pool = self._get_pool()
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._stats["checkout_timeouts"] += 1
+            raise pg_pool.PoolError("Timed out waiting for a database connection")
+        try:
+            while True:
+                conn = pool.getconn()
+                now = time.monotonic()
+                with self._lock:
+                    verdict = self._check_age(conn, now)
+                # The round trip happens outside the pool lock so a hung socket only stalls this caller
+                healthy = verdict == "ok" or (verdict == "ping" and self._ping(conn))
+                if healthy:
+                    break
+                with self._lock:
+                    if verdict == "ping":
+                        self._stats["health_check_failures"] += 1
+                    self._forget(conn)
+                    self._stats["connections_recycled"] += 1
+                pool.putconn(conn, close=True)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+            self._stats["total_wait_ms"] += (time.monotonic() - started) * 1000
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool. Broken or discarded connections are closed."""
+        pool = self._get_pool()
+        close = discard or conn.closed != 0
+        with self._lock:
+            self._stats["in_use"] -= 1
+            if close:
+                self._forget(conn)
+                self._stats["connections_recycled"] += 1
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+        try:
+            pool.putconn(conn, close=close)
+        finally:
+            self._slots.release()
+
+    def _forget(self, conn):
+        self._born.pop(id(conn), None)
+        self._last_used.pop(id(conn), None)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error."""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except pg.Error:
+                    discard = True
+            else:
+                discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Run several statements atomically on one pooled connection:
+
+            with db_pool.unit_of_work() as uow:
+                uow.execute(...)
+                row = uow.fetchone(...)
+
+        Everything commits when the block exits, or rolls back if it raises.
+        """
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                yield UnitOfWork(cur)
+
+    def execute(self, query, args=None, fetch=False):
+        """Run a single statement in its own transaction. If fetch=True, returns all rows."""
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, args or ())
+                if fetch:
+                    return cur.fetchall()
+
+    def stream(self, query, args=None, itersize=2000):
+        """
+        Yield rows from a server-side named cursor so large results never sit in memory.
+        The connection stays checked out until the generator is exhausted or closed.
+        """
+        with self.connection() as conn:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                cur.itersize = itersize
+                cur.execute(query, args or ())
+                for row in cur:
+                    yield row
+
+    def dedicated_connection(self, autocommit=True):
+        """
+        Open a connection outside the pool for long-lived work such as LISTEN.
+        The caller owns it and must close it.
+        """
+        conn = pg.connect(
+            database=self.credentials['DB_NAME'],
+            user=self.credentials['DB_USER'],
+            password=self.credentials['DB_PASS'],
+            host=self.credentials['DB_HOST'],
+            port=self.credentials['DB_PORT']
+        )
+        conn.autocommit = autocommit
+        return conn
+
+    def stats(self):
+        """Snapshot of pool usage counters for tuning DB_POOL_* settings."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["idle"] = len(self._pool._pool) if self._pool is not None else 0
+        snapshot.update({
+            "pid": os.getpid(),
+            "minconn": self.minconn,
+            "maxconn": self.maxconn,
+            "avg_wait_ms": round(snapshot["total_wait_ms"] / snapshot["checkouts"], 3) if snapshot["checkouts"] else 0.0,
+        })
+        snapshot["total_wait_ms"] = round(snapshot["total_wait_ms"], 3)
+        return snapshot
+
+    def close_all(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.closeall()
+            self._pool = None
+            self._born.clear()
+            self._last_used.clear()
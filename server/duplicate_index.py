@@ -0,0 +1,193 @@
+# In-memory near-duplicate detection for incoming reports (MinHash + LSH)
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from math import cos, radians
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# ~550 m cells; a report is compared against its own cell and the eight around it
+CELL_DEGREES = 0.005
+MATCH_RADIUS_METERS = 400
+TIME_WINDOW = timedelta(hours=6)
+SIMILARITY_THRESHOLD = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_rng = np.random.default_rng(20250426)
+# Odd multipliers make (a * x + b) mod 2**64 a usable permutation family for MinHash
+_PERM_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """Word unigrams plus bigrams of a normalized description."""
+    words = _TOKEN_RE.findall((text or "").lower())
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return grams
+
+
+def minhash(text):
+    """NUM_PERM-wide MinHash signature of a description, or None if it has no words."""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashed = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+    with np.errstate(over='ignore'):
+        permuted = _PERM_A[:, None] * hashed[None, :] + _PERM_B[:, None]
+    return permuted.min(axis=1)
+
+
+def _distance_meters(lng1, lat1, lng2, lat2):
+    # Equirectangular approximation; plenty accurate at city-block distances
+    x = radians(lng2 - lng1) * cos(radians((lat1 + lat2) / 2))
+    y = radians(lat2 - lat1)
+    return 6371000 * (x * x + y * y) ** 0.5
+
+
+class ReportEntry:
+    __slots__ = ("report_id", "original_report_id", "longitude", "latitude", "created_at", "signature", "keys")
+
+    def __init__(self, report_id, original_report_id, longitude, latitude, created_at, signature, keys):
+        self.report_id = report_id
+        self.original_report_id = original_report_id
+        self.longitude = longitude
+        self.latitude = latitude
+        self.created_at = created_at
+        self.signature = signature
+        self.keys = keys
+
+
+class ReportDuplicateIndex:
+    """
+    Finds earlier reports that describe the same incident near the same place and time.
+
+    Descriptions are MinHashed and split into LSH bands. Each band is bucketed with
+    its spatial grid cell and time window, so a lookup only touches the few reports
+    filed close by recently. The index is maintained incrementally: new reports are
+    added as they are created, other workers' inserts are pulled in by `sync()`, and
+    entries older than two time windows are evicted.
+    """
+
+    def __init__(self, db_pool=None, sync_interval=5):
+        self.db_pool = db_pool
+        self.sync_interval = sync_interval
+        self._buckets = {}
+        self._entries = {}
+        self._by_age = deque()
+        self._lock = threading.Lock()
+        self._synced_until = None
+        self._last_sync = None
+
+    @staticmethod
+    def _cell(longitude, latitude):
+        return int(longitude // CELL_DEGREES), int(latitude // CELL_DEGREES)
+
+    @staticmethod
+    def _window(created_at):
+        return int(created_at.timestamp() // TIME_WINDOW.total_seconds())
+
+    @staticmethod
+    def _bands(signature):
+        return [hash(signature[i * ROWS:(i + 1) * ROWS].tobytes()) for i in range(BANDS)]
+
+    def add(self, report_id, description, longitude, latitude, created_at, original_report_id=None):
+        signature = minhash(description)
+        if signature is None:
+            return
+        cell = self._cell(longitude, latitude)
+        window = self._window(created_at)
+        keys = [(cell, window, band, h) for band, h in enumerate(self._bands(signature))]
+        entry = ReportEntry(report_id, original_report_id, longitude, latitude, created_at, signature, keys)
+        with self._lock:
+            if report_id in self._entries:
+                return
+            self._entries[report_id] = entry
+            self._by_age.append(entry)
+            for key in keys:
+                self._buckets.setdefault(key, []).append(entry)
+            self._evict(created_at)
+
+    def _evict(self, now):
+        cutoff = now - 2 * TIME_WINDOW
+        while self._by_age and self._by_age[0].created_at < cutoff:
+            entry = self._by_age.popleft()
+            self._entries.pop(entry.report_id, None)
+            for key in entry.keys:
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.remove(entry)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def find_duplicate(self, description, longitude, latitude, created_at=None):
+        """
+        Return (original_report_id, similarity) for the best earlier match, or None.
+        The original is always the root report, never another duplicate.
+        """
+        created_at = created_at or datetime.now(timezone.utc)
+        self.sync()
+        signature = minhash(description)
+        if signature is None:
+            return None
+
+        cx, cy = self._cell(longitude, latitude)
+        window = self._window(created_at)
+        bands = self._bands(signature)
+        candidates = {}
+        with self._lock:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for w in (window - 1, window):
+                        for band, h in enumerate(bands):
+                            for entry in self._buckets.get(((cx + dx, cy + dy), w, band, h), ()):
+                                candidates[entry.report_id] = entry
+
+        best = None
+        for entry in candidates.values():
+            if abs(created_at - entry.created_at) > TIME_WINDOW:
+                continue
+            if _distance_meters(longitude, latitude, entry.longitude, entry.latitude) > MATCH_RADIUS_METERS:
+                continue
+            similarity = float(np.count_nonzero(entry.signature == signature)) / NUM_PERM
+            if similarity < SIMILARITY_THRESHOLD:
+                continue
+            if best is None or (similarity, -entry.created_at.timestamp()) > (best[1], -best[0].created_at.timestamp()):
+                best = (entry, similarity)
+
+        if best is None:
+            return None
+        entry, similarity = best
+        return entry.original_report_id or entry.report_id, similarity
+
+    def sync(self, force=False):
+        """Pull in reports created since the last sync (e.g. by other workers)."""
+        if self.db_pool is None:
+            return
+        now = time.monotonic()
+        if not force and self._last_sync is not None and now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+
+        since = self._synced_until or datetime.now(timezone.utc) - 2 * TIME_WINDOW
+        try:
+            rows = self.db_pool.execute("""
+            SELECT report_id, description, ST_X(location_point::geometry), ST_Y(location_point::geometry),
+                   created_at, original_report_id
+            FROM reports
+            WHERE created_at >= %s
+            ORDER BY created_at;
+            """, (since,), fetch=True) or []
+        except Exception as e:
+            print(f"Error syncing duplicate index: {e}")
+            return
+        for report_id, description, lng, lat, created_at, original_report_id in rows:
+            self.add(str(report_id), description, lng, lat, created_at,
+                     str(original_report_id) if original_report_id else None)
+            self._synced_until = created_at
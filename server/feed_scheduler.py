@@ -0,0 +1,133 @@
+# Background refresh of the default SerpApi-backed feeds
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class ScheduledFeed:
+    def __init__(self, name, fetch, interval, jitter, retry_base, max_backoff):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.max_backoff = max_backoff
+        self.payload = None
+        self.last_refresh = None
+        self.last_attempt = None
+        self.last_error = None
+        self.failures = 0
+        self.next_run = time.time()
+
+    def _jittered(self, seconds):
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def status(self):
+        def iso(ts):
+            return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+        return {
+            "interval_seconds": self.interval,
+            "has_payload": self.payload is not None,
+            "last_refresh": iso(self.last_refresh),
+            "last_attempt": iso(self.last_attempt),
+            "last_error": self.last_error,
+            "consecutive_failures": self.failures,
+            "next_run": iso(self.next_run),
+        }
+
+
+class FeedScheduler:
+    """
+    Refreshes registered feeds on their own intervals in one daemon thread and keeps
+    the latest normalized payload of each in memory, so endpoints can answer the
+    default queries without waiting on SerpApi.
+
+    Refresh times are jittered so workers do not fire in lockstep. After a failure
+    the feed retries with exponential backoff, capped at its interval, and keeps
+    serving the last good payload meanwhile.
+    """
+
+    def __init__(self, jitter=0.1, retry_base=30, max_backoff=None):
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.max_backoff = max_backoff
+        self._feeds = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def register(self, name, fetch, interval):
+        """
+        fetch(max_age) returns the payload to serve; an empty result or an exception counts
+        as a failure. max_age is half the interval, so a search cached for longer than the
+        feed's own cadence (or by an earlier tick) is refetched rather than re-served.
+        """
+        feed = ScheduledFeed(
+            name, fetch, interval,
+            jitter=self.jitter,
+            retry_base=self.retry_base,
+            max_backoff=self.max_backoff or interval,
+        )
+        with self._lock:
+            self._feeds[name] = feed
+        self._wake.set()
+        return feed
+
+    def get(self, name):
+        """Latest payload for a feed, or None if it has never refreshed successfully."""
+        feed = self._feeds.get(name)
+        return feed.payload if feed else None
+
+    def refresh(self, name):
+        feed = self._feeds[name]
+        feed.last_attempt = time.time()
+        try:
+            payload = feed.fetch(max_age=feed.interval / 2)
+            if not payload:
+                raise ValueError("feed returned no results")
+        except Exception as e:
+            feed.failures += 1
+            feed.last_error = str(e)
+            backoff = min(feed.max_backoff, feed.retry_base * 2 ** (feed.failures - 1))
+            feed.next_run = time.time() + feed._jittered(backoff)
+            print(f"[FeedScheduler] Refresh of '{name}' failed ({feed.failures} in a row): {e}")
+            return False
+
+        feed.payload = payload
+        feed.last_refresh = time.time()
+        feed.last_error = None
+        feed.failures = 0
+        feed.next_run = feed.last_refresh + feed._jittered(feed.interval)
+        return True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            now = time.time()
+            with self._lock:
+                feeds = list(self._feeds.values())
+            for feed in feeds:
+                if feed.next_run <= now and not self._stopped.is_set():
+                    self.refresh(feed.name)
+            with self._lock:
+                next_run = min((f.next_run for f in self._feeds.values()), default=now + 60)
+            self._wake.wait(max(0.0, next_run - time.time()))
+            self._wake.clear()
+
+    def start(self):
+        """Start the background thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="feed-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def status(self):
+        with self._lock:
+            return {name: feed.status() for name, feed in self._feeds.items()}
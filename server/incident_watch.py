@@ -0,0 +1,224 @@
+# Long-running watcher that turns CommunityAlertSystem hits into notification rows
+import argparse
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from psycopg2.extras import execute_values
+
+from serp_api_service.alert_system import CommunityAlertSystem
+from serp_api_service.budget import Priority
+from serp_api_service.serp_api_handler import SerpApiService
+from serp_api_service.severity_classifier import ReloadingClassifier
+
+NOTIFICATION_TYPE = "community_alert"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def incident_keys(incident):
+    """Seen-set keys for an incident: its link and a hash of its normalized title."""
+    keys = []
+    if incident.get("link"):
+        keys.append("link:" + incident["link"].strip())
+    words = _WORD_RE.findall(incident.get("title", "").lower())
+    if words:
+        keys.append("title:" + hashlib.md5(" ".join(words).encode()).hexdigest())
+    return keys
+
+
+class SeenSet:
+    """
+    Bounded LRU of already-alerted keys, mirrored to the `alert_seen` table so a
+    restarted watcher does not re-alert. Only the newest `capacity` keys are kept
+    in memory and in the table.
+    """
+
+    def __init__(self, db_pool=None, capacity=10000):
+        self.db_pool = db_pool
+        self.capacity = capacity
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = db_pool is None
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def load(self):
+        rows = self.db_pool.execute("""
+        SELECT key FROM alert_seen ORDER BY seen_at DESC LIMIT %s;
+        """, (self.capacity,), fetch=True) or []
+        with self._lock:
+            for (key,) in reversed(rows):
+                self._keys[key] = True
+                self._keys.move_to_end(key)
+            self._trim()
+            self._loaded = True
+
+    def _trim(self):
+        while len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._keys[key] = True
+                self._keys.move_to_end(key)
+            self._trim()
+
+    def persist(self, cur, keys):
+        """Write keys to `alert_seen` in the caller's transaction and trim it to capacity."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        execute_values(cur, """
+        INSERT INTO alert_seen (key) VALUES %s
+        ON CONFLICT (key) DO UPDATE SET seen_at = CURRENT_TIMESTAMP
+        """, [(key,) for key in keys], page_size=len(keys))
+        cur.execute("""
+        DELETE FROM alert_seen
+        WHERE key NOT IN (SELECT key FROM alert_seen ORDER BY seen_at DESC LIMIT %s);
+        """, (self.capacity,))
+
+
+class IncidentWatcher:
+    """
+    Polls CommunityAlertSystem from a daemon thread and writes each new incident
+    to `notifications` as a broadcast row (no user_id).
+
+    The poll interval drops to `min_interval` whenever a new Red incident shows
+    up, and otherwise stretches by `backoff_factor` per quiet poll up to
+    `max_interval`. Incidents whose link or title was already alerted are skipped.
+    Incidents are classified with the `alert_keywords` table unless a classifier
+    is given.
+    """
+
+    def __init__(self, db_pool, alert_system=None, seen=None,
+                 min_interval=120, max_interval=1800, backoff_factor=1.5, classifier=None):
+        self.db_pool = db_pool
+        self.alert_system = alert_system or CommunityAlertSystem(
+            classifier=classifier or ReloadingClassifier(db_pool),
+            service=SerpApiService(priority=Priority.BACKGROUND),
+        )
+        self.seen = seen if seen is not None else SeenSet(db_pool)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval
+        self.last_poll = None
+        self.last_error = None
+        self.counters = {"polls": 0, "incidents": 0, "notified": 0, "suppressed": 0}
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def poll_once(self):
+        """Run one detection pass. Returns the number of notifications written."""
+        self.last_poll = time.time()
+        self.counters["polls"] += 1
+        self.seen.ensure_loaded()
+
+        # A cached search older than half the interval would hide new incidents
+        incidents = self.alert_system.detect_incidents(max_age=self.interval / 2)
+        self.counters["incidents"] += len(incidents)
+
+        fresh = []
+        batch_keys = set()
+        for incident in incidents:
+            keys = incident_keys(incident)
+            if any(key in self.seen or key in batch_keys for key in keys):
+                self.counters["suppressed"] += 1
+                continue
+            batch_keys.update(keys)
+            fresh.append((incident, keys))
+
+        if fresh:
+            self._write_batch(fresh)
+            self.seen.add_many(batch_keys)
+            self.counters["notified"] += len(fresh)
+
+        if any(incident["severity"] == "Red" for incident, _ in fresh):
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+        return len(fresh)
+
+    def _write_batch(self, fresh):
+        rows = [
+            (NOTIFICATION_TYPE, f"[{incident['severity']}] {incident['title']} {incident['link']}".strip())
+            for incident, _ in fresh
+        ]
+        # Notifications and seen keys commit together, so a failed write is retried next poll
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                INSERT INTO notifications (type, message) VALUES %s
+                """, rows, page_size=len(rows))
+                self.seen.persist(cur, [key for _, keys in fresh for key in keys])
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+                print(f"[IncidentWatcher] Poll failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="incident-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def status(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_seconds": round(self.interval, 1),
+            "last_poll": datetime.fromtimestamp(self.last_poll, timezone.utc).isoformat() if self.last_poll else None,
+            "last_error": self.last_error,
+            "seen_keys": len(self.seen),
+            **self.counters,
+        }
+
+
+if __name__ == "__main__":
+    from db import DatabasePool
+
+    parser = argparse.ArgumentParser(description="Watch for major Austin incidents and write community alerts")
+    parser.add_argument("--min-interval", type=float, default=120)
+    parser.add_argument("--max-interval", type=float, default=1800)
+    parser.add_argument("--once", action="store_true", help="Poll a single time and exit")
+    cli_args = parser.parse_args()
+
+    watcher = IncidentWatcher(DatabasePool.from_env(),
+                              min_interval=cli_args.min_interval, max_interval=cli_args.max_interval)
+    if cli_args.once:
+        print(f"Wrote {watcher.poll_once()} notifications")
+    else:
+        watcher.start()
+        try:
+            while True:
+                time.sleep(60)
+                print(watcher.status())
+        except KeyboardInterrupt:
+            watcher.stop()
@@ -0,0 +1,180 @@
+# Live report deltas: Postgres LISTEN/NOTIFY fanned out to per-viewport Server-Sent Event streams
+import json
+import queue
+import select
+import threading
+import time
+
+CHANNEL = "report_events"
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 256
+# What a stream does when its client reads slower than events arrive
+POLICIES = ("drop", "disconnect")
+FILTER_KEYS = ("category_id", "status", "council_district")
+
+
+def publish(db_pool, event):
+    """NOTIFY every worker's listener about a report insert or status change."""
+    db_pool.execute("SELECT pg_notify(%s, %s);", (CHANNEL, json.dumps(event, default=str)))
+
+
+def sse(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class LiveSubscriber:
+    """
+    One client stream: a viewport, equality filters and a bounded queue.
+
+    With the "drop" policy a full queue discards its oldest event and the client
+    is told how many it missed; with "disconnect" the stream ends with a
+    `resync` event so the client refetches and reconnects.
+    """
+
+    def __init__(self, bbox=None, filters=None, policy="drop", maxsize=QUEUE_SIZE):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of: {', '.join(POLICIES)}")
+        self.bbox = bbox
+        self.filters = {k: str(v) for k, v in (filters or {}).items() if v not in (None, "")}
+        self.policy = policy
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.overflowed = False
+        self._lock = threading.Lock()
+
+    def wants(self, event):
+        if self.bbox is not None:
+            lng, lat = event.get("longitude"), event.get("latitude")
+            if lng is None or lat is None:
+                return False
+            min_lng, min_lat, max_lng, max_lat = self.bbox
+            if not (min_lng <= float(lng) <= max_lng and min_lat <= float(lat) <= max_lat):
+                return False
+        return all(str(event.get(key)) == value for key, value in self.filters.items())
+
+    def offer(self, item):
+        """Queue without ever blocking the listener thread."""
+        with self._lock:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            if self.policy == "disconnect":
+                self.overflowed = True
+                return
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(item)
+
+    def stream(self, heartbeat=HEARTBEAT_SECONDS):
+        """Yield SSE frames until the client goes away or overflows under "disconnect"."""
+        yield "retry: 5000\n\n"
+        while True:
+            if self.overflowed:
+                yield sse("resync", {"reason": "client too slow"})
+                return
+            try:
+                event_type, data = self.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                yield sse("lagged", {"dropped": dropped})
+            yield sse(event_type, data)
+            if event_type == "resync" and self.policy == "disconnect":
+                return
+
+
+class ReportEventHub:
+    """
+    One LISTEN connection per worker process, shared by every live stream in it.
+
+    Notifications are matched against each subscriber's viewport and filters and
+    queued per subscriber, so a slow client never holds up the others. If the
+    listen connection drops, every subscriber gets a `resync` once it is back,
+    since events may have been missed in between.
+    """
+
+    def __init__(self, db_pool, channel=CHANNEL, reconnect_delay=5):
+        self.db_pool = db_pool
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.counters = {"received": 0, "delivered": 0, "reconnects": 0}
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self.db_pool is not None and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._listen, name="report-events", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def dispatch(self, event):
+        self.counters["received"] += 1
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(event):
+                subscriber.offer((event.get("event", "report_updated"), event))
+                self.counters["delivered"] += 1
+
+    def _broadcast(self, event_type, data):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer((event_type, data))
+
+    def _listen(self):
+        connected_before = False
+        while True:
+            try:
+                conn = self.db_pool.dedicated_connection()
+            except Exception as e:
+                print(f"[ReportEventHub] Could not connect for LISTEN: {e}")
+                time.sleep(self.reconnect_delay)
+                continue
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel};")
+                if connected_before:
+                    self.counters["reconnects"] += 1
+                    self._broadcast("resync", {"reason": "live feed reconnected"})
+                connected_before = True
+                while True:
+                    if select.select([conn], [], [], HEARTBEAT_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            self.dispatch(json.loads(notify.payload))
+                        except ValueError as e:
+                            print(f"[ReportEventHub] Ignoring malformed payload: {e}")
+            except Exception as e:
+                print(f"[ReportEventHub] LISTEN connection lost: {e}")
+            finally:
+                conn.close()
+            time.sleep(self.reconnect_delay)
+
+    def stats(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            **self.counters,
+            "subscribers": len(subscribers),
+            "queued": sum(s.queue.qsize() for s in subscribers),
+            "listening": self._thread is not None and self._thread.is_alive(),
+        }
@@ -0,0 +1,409 @@
+# Streaming import of Austin Open Data Portal datasets into `open_data_records`
+import argparse
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import shapely
+from shapely.errors import ShapelyError
+
+from serp_api_service.http_client import TIMEOUT, get_session
+
+OPEN_DATA_BASE_URL = os.environ.get('OPEN_DATA_BASE_URL', 'https://data.austintexas.gov')
+SOCRATA_APP_TOKEN = os.environ.get('SOCRATA_APP_TOKEN')
+PAGE_SIZE = int(os.environ.get('OPEN_DATA_PAGE_SIZE', 5000))
+BATCH_SIZE = int(os.environ.get('OPEN_DATA_BATCH_SIZE', 5000))
+# Portal timestamps are floating Austin local time
+SOURCE_TIMEZONE = ZoneInfo('America/Chicago')
+TIMESTAMP_FORMATS = ('%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%Y %b %d %I:%M:%S %p')
+READ_CHUNK = 1 << 16
+
+STAGING_COLUMNS = [
+    'source_id', 'title', 'category', 'status', 'occurred_at', 'source_updated_at',
+    'council_district', 'address', 'geometry', 'properties',
+]
+
+
+def parse_timestamp(value):
+    """Portal timestamp (ISO floating, ISO with offset or the CSV export formats) as an aware datetime."""
+    if not value:
+        return None
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = None
+        for fmt in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=SOURCE_TIMEZONE)
+
+
+def _district(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def point_geometry(longitude, latitude):
+    """GeoJSON point, or None when either coordinate is missing, unparsable or zero."""
+    try:
+        lng, lat = float(longitude), float(latitude)
+    except (TypeError, ValueError):
+        return None
+    if not lng or not lat or not (-180 <= lng <= 180 and -90 <= lat <= 90):
+        return None
+    return json.dumps({"type": "Point", "coordinates": [lng, lat]})
+
+
+def shape_geometry(value):
+    """
+    A Socrata geometry column, GeoJSON (API, JSON dumps) or WKT (CSV dumps), as WKT.
+    Parsed here so PostGIS never sees a shape it would reject; raises ValueError for those.
+    """
+    if not value:
+        return None
+    text = json.dumps(value) if isinstance(value, dict) else str(value).strip()
+    if not text:
+        return None
+    try:
+        shape = shapely.from_geojson(text) if text.startswith('{') else shapely.from_wkt(text)
+    except ShapelyError as e:
+        raise ValueError(f"Unparsable geometry: {e}") from e
+    if shape.is_empty:
+        return None
+    min_x, min_y, max_x, max_y = shape.bounds
+    if not (-180 <= min_x <= max_x <= 180 and -90 <= min_y <= max_y <= 90):
+        raise ValueError("Geometry coordinates out of range")
+    return shapely.to_wkt(shape, rounding_precision=-1)
+
+
+def _latest(*timestamps):
+    present = [t for t in timestamps if t is not None]
+    return max(present) if present else None
+
+
+def _crime_report(row):
+    occurred = parse_timestamp(row.get('occ_date_time'))
+    reported = parse_timestamp(row.get('rep_date_time'))
+    return {
+        'source_id': row.get('incident_report_number'),
+        'title': row.get('crime_type'),
+        'category': row.get('category_description') or row.get('ucr_category'),
+        'status': row.get('clearance_status'),
+        'occurred_at': occurred or reported,
+        # Reports change when they are cleared
+        'updated_at': _latest(reported, parse_timestamp(row.get('clearance_date'))),
+        'council_district': _district(row.get('council_district')),
+        'address': row.get('address'),
+        'geometry': point_geometry(row.get('longitude'), row.get('latitude')),
+    }
+
+
+def _service_request(row):
+    return {
+        'source_id': row.get('sr_number'),
+        'title': row.get('sr_type_desc'),
+        'category': row.get('sr_department_desc'),
+        'status': row.get('sr_status_desc'),
+        'occurred_at': parse_timestamp(row.get('sr_created_date')),
+        'updated_at': _latest(parse_timestamp(row.get('sr_updated_date')),
+                              parse_timestamp(row.get('sr_status_date')),
+                              parse_timestamp(row.get('sr_created_date'))),
+        'council_district': _district(row.get('sr_location_council_district')),
+        'address': row.get('sr_location'),
+        'geometry': point_geometry(row.get('sr_location_long'), row.get('sr_location_lat')),
+    }
+
+
+def _street_segment(row):
+    return {
+        'source_id': row.get('segment_id'),
+        'title': row.get('full_street_name'),
+        'category': row.get('road_class'),
+        'status': None,
+        'occurred_at': None,
+        # Only the API's system column says when a segment changed
+        'updated_at': None,
+        'council_district': None,
+        'address': row.get('full_street_name'),
+        'geometry': shape_geometry(row.get('the_geom')),
+    }
+
+
+def _traffic_incident(row):
+    published = parse_timestamp(row.get('published_date'))
+    return {
+        'source_id': row.get('traffic_report_id'),
+        'title': row.get('issue_reported'),
+        'category': row.get('agency'),
+        'status': row.get('traffic_report_status'),
+        'occurred_at': published,
+        'updated_at': _latest(published, parse_timestamp(row.get('traffic_report_status_date_time'))),
+        'council_district': None,
+        'address': row.get('address'),
+        'geometry': point_geometry(row.get('longitude'), row.get('latitude')),
+    }
+
+
+# Short name -> Socrata resource id and row mapper
+DATASETS = {
+    'crime_reports': {'resource': 'fdj4-gpfu', 'transform': _crime_report},
+    'service_requests': {'resource': 'i26j-ai4z', 'transform': _service_request},
+    'street_segments': {'resource': '6ab4-ej5v', 'transform': _street_segment},
+    'traffic_incidents': {'resource': 'dx9v-zd7x', 'transform': _traffic_incident},
+}
+
+
+def iter_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def iter_json(path):
+    """
+    Rows of a JSON array or NDJSON dump, decoded incrementally so memory stays
+    bounded by one row plus a read chunk, however large the file.
+    """
+    decoder = json.JSONDecoder()
+    separators = ' \t\r\n,'
+    with open(path, encoding='utf-8-sig') as f:
+        buffer = f.read(READ_CHUNK).lstrip()
+        in_array = buffer.startswith('[')
+        pos = 1 if in_array else 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in separators:
+                pos += 1
+            if in_array and buffer.startswith(']', pos):
+                return
+            try:
+                row, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    if buffer[pos:].strip():
+                        raise ValueError(f"Truncated JSON in {path}")
+                    return
+                # Drop what has been decoded only when reading on, not after every row
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield row
+
+
+def iter_socrata(resource, since=None, page_size=PAGE_SIZE, base_url=OPEN_DATA_BASE_URL, session=None):
+    """
+    Rows of a Socrata dataset changed at or after `since`, in (:updated_at, :id)
+    order. Pages are fetched with keyset conditions rather than offsets, so a
+    page boundary stays stable while the portal keeps publishing.
+    """
+    session = session or get_session()
+    headers = {'X-App-Token': SOCRATA_APP_TOKEN} if SOCRATA_APP_TOKEN else {}
+    url = f"{base_url.rstrip('/')}/resource/{resource}.json"
+    last_updated = since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] if since else None
+    last_id = None
+    while True:
+        params = {'$select': ':*, *', '$order': ':updated_at, :id', '$limit': page_size}
+        if last_id is not None:
+            params['$where'] = (f":updated_at > '{last_updated}' OR "
+                                f"(:updated_at = '{last_updated}' AND :id > '{last_id}')")
+        elif last_updated is not None:
+            params['$where'] = f":updated_at >= '{last_updated}'"
+        response = session.get(url, params=params, headers=headers, timeout=TIMEOUT)
+        response.raise_for_status()
+        page = response.json()
+        yield from page
+        if len(page) < page_size:
+            return
+        last_updated, last_id = page[-1][':updated_at'].rstrip('Z'), page[-1][':id']
+
+
+def normalize(dataset, row):
+    """Map a raw portal row to a staging record, or None if it has no id."""
+    record = DATASETS[dataset]['transform'](row)
+    if not record['source_id']:
+        return None
+    # :updated_at is only present in API rows; it is authoritative when it is
+    system_updated = parse_timestamp(row.get(':updated_at'))
+    if system_updated is not None:
+        record['updated_at'] = system_updated.astimezone(timezone.utc)
+    record['properties'] = json.dumps({k: v for k, v in row.items() if not k.startswith(':')}, default=str)
+    return record
+
+
+def batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class OpenDataImporter:
+    """
+    Loads a portal dataset into `open_data_records` in constant memory: rows are
+    streamed from a local dump or the Socrata API, mapped to one shape, and
+    written `batch_size` at a time with a COPY into a staging table plus one
+    upsert. Each dataset keeps a watermark in `rollup_watermarks`, so a rerun
+    only reads (API) or only writes (dumps) rows changed since the last run.
+    """
+
+    def __init__(self, db_pool, batch_size=BATCH_SIZE, page_size=PAGE_SIZE, base_url=OPEN_DATA_BASE_URL):
+        self.db_pool = db_pool
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.base_url = base_url
+
+    @staticmethod
+    def job_name(dataset):
+        return f"open_data:{dataset}"
+
+    def watermark(self, dataset):
+        rows = self.db_pool.execute("""
+        SELECT watermark FROM rollup_watermarks WHERE job_name = %s;
+        """, (self.job_name(dataset),), fetch=True)
+        return rows[0][0] if rows else None
+
+    def rows(self, dataset, path=None, since=None):
+        if path is None:
+            return iter_socrata(DATASETS[dataset]['resource'], since, self.page_size, self.base_url)
+        if path.lower().endswith('.csv'):
+            return iter_csv(path)
+        return iter_json(path)
+
+    def changed_records(self, dataset, rows, since=None, stats=None):
+        """
+        Normalized records, skipping rows whose update time is before the watermark.
+        Malformed rows are logged and counted in stats["skipped"] rather than loaded,
+        since one bad geometry would otherwise roll back its whole batch.
+        """
+        for row in rows:
+            try:
+                record = normalize(dataset, row)
+            except ValueError as e:
+                print(f"Skipping malformed {dataset} row: {e}")
+                if stats is not None:
+                    stats["skipped"] += 1
+                continue
+            if record is None:
+                continue
+            if since is not None and record['updated_at'] is not None and record['updated_at'] < since:
+                continue
+            yield record
+
+    def run(self, dataset, path=None, full=False):
+        """Import one dataset. Returns {"read", "written", "skipped", "watermark"}."""
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset {dataset!r}; expected one of: {', '.join(DATASETS)}")
+        since = None if full else self.watermark(dataset)
+        stats = {"read": 0, "written": 0, "skipped": 0, "watermark": since}
+        newest = since
+        records = self.changed_records(dataset, self.rows(dataset, path, since), since, stats)
+        for batch in batches(records, self.batch_size):
+            stats["read"] += len(batch)
+            stats["written"] += self.load_batch(dataset, batch)
+            newest = _latest(newest, *(record['updated_at'] for record in batch))
+        # Dumps are unordered, so the watermark only moves once every batch is in;
+        # an interrupted run re-upserts the same rows next time, which is harmless
+        if newest is not None and newest != since:
+            self.db_pool.execute("""
+            INSERT INTO rollup_watermarks (job_name, watermark)
+            VALUES (%s, %s)
+            ON CONFLICT (job_name) DO UPDATE
+            SET watermark = GREATEST(rollup_watermarks.watermark, EXCLUDED.watermark),
+                updated_at = CURRENT_TIMESTAMP;
+            """, (self.job_name(dataset), newest))
+            stats["watermark"] = newest
+        return stats
+
+    def load_batch(self, dataset, batch):
+        """COPY one batch into staging and upsert it. Returns the number of rows inserted or changed."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            ['' if value is None else value for value in (
+                record['source_id'], record['title'], record['category'], record['status'],
+                record['occurred_at'], record['updated_at'], record['council_district'],
+                record['address'], record['geometry'], record['properties'],
+            )] for record in batch
+        )
+        buffer.seek(0)
+        with self.db_pool.unit_of_work() as uow:
+            uow.execute("""
+            CREATE TEMP TABLE open_data_staging (
+                source_id TEXT,
+                title TEXT,
+                category TEXT,
+                status TEXT,
+                occurred_at TIMESTAMP WITH TIME ZONE,
+                source_updated_at TIMESTAMP WITH TIME ZONE,
+                council_district INTEGER,
+                address TEXT,
+                geometry TEXT,
+                properties JSONB
+            ) ON COMMIT DROP;
+            """)
+            uow.cursor.copy_expert(
+                f"COPY open_data_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+            # A dump can list the same id more than once; keep its latest version
+            uow.execute("""
+            INSERT INTO open_data_records (
+                dataset, source_id, title, category, status, occurred_at, source_updated_at,
+                council_district, address, location, properties
+            )
+            SELECT DISTINCT ON (source_id)
+                   %s, source_id, title, category, status, occurred_at, source_updated_at,
+                   council_district, address,
+                   CASE
+                       WHEN geometry IS NULL THEN NULL
+                       WHEN left(geometry, 1) = '{' THEN ST_SetSRID(ST_GeomFromGeoJSON(geometry), 4326)::geography
+                       ELSE ST_GeomFromText(geometry, 4326)::geography
+                   END,
+                   properties
+            FROM open_data_staging
+            ORDER BY source_id, source_updated_at DESC NULLS LAST
+            ON CONFLICT (dataset, source_id) DO UPDATE
+            SET title = EXCLUDED.title,
+                category = EXCLUDED.category,
+                status = EXCLUDED.status,
+                occurred_at = EXCLUDED.occurred_at,
+                source_updated_at = EXCLUDED.source_updated_at,
+                council_district = EXCLUDED.council_district,
+                address = EXCLUDED.address,
+                location = EXCLUDED.location,
+                properties = EXCLUDED.properties,
+                imported_at = CURRENT_TIMESTAMP
+            WHERE open_data_records.properties IS DISTINCT FROM EXCLUDED.properties;
+            """, (dataset,))
+            return uow.cursor.rowcount
+
+
+if __name__ == "__main__":
+    from db import DatabasePool
+
+    parser = argparse.ArgumentParser(description="Import Austin Open Data Portal datasets")
+    parser.add_argument("datasets", nargs="+", choices=sorted(DATASETS) + ["all"])
+    parser.add_argument("--file", help="Local CSV, JSON or NDJSON dump to read instead of the API (one dataset only)")
+    parser.add_argument("--base-url", default=OPEN_DATA_BASE_URL, help="Socrata-compatible portal to read from")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--full", action="store_true", help="Ignore the stored watermark and reload everything")
+    cli_args = parser.parse_args()
+
+    names = list(DATASETS) if "all" in cli_args.datasets else cli_args.datasets
+    if cli_args.file and len(names) != 1:
+        parser.error("--file needs exactly one dataset")
+    importer = OpenDataImporter(DatabasePool.from_env(), batch_size=cli_args.batch_size, base_url=cli_args.base_url)
+    for name in names:
+        result = importer.run(name, cli_args.file, full=cli_args.full)
+        print(f"{name}: read {result['read']}, wrote {result['written']}, skipped {result['skipped']}, watermark {result['watermark']}")
@@ -0,0 +1,303 @@
+# Bulk report ingestion: validate in one pass, COPY into a staging table, merge in one statement
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from duplicate_index import ReportDuplicateIndex
+
+BATCH_FIELDS = ['user_id', 'category_id', 'description', 'severity', 'latitude', 'longitude']
+STAGING_COLUMNS = [
+    'row_index', 'report_id', 'tracking_number', 'user_id', 'category_id', 'title', 'description', 'severity',
+    'longitude', 'latitude', 'neighborhood', 'council_district', 'is_duplicate', 'original_report_id', 'metadata',
+]
+
+
+def parse_batch(body, content_type=''):
+    """
+    Decode a JSON array or NDJSON body into a list of records.
+    A malformed NDJSON line becomes None so it is reported per row; a malformed array raises ValueError.
+    """
+    text = body.decode('utf-8') if isinstance(body, bytes) else body
+    if 'ndjson' not in content_type and text.lstrip().startswith('['):
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON array of reports")
+        return records
+    records = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            records.append(None)
+    return records
+
+
+def _number(value, cast):
+    try:
+        if isinstance(value, bool):
+            return np.nan
+        return cast(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _uuid(value):
+    try:
+        return str(uuid.UUID(str(value)))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def batch_tracking_number(stamp, report_id):
+    """
+    Every row of a batch shares one timestamp, so the suffix alone has to keep
+    tracking numbers unique: the last 16 hex digits (62 random bits) of the uuid.
+    """
+    return f"{stamp}-{uuid.UUID(report_id).hex[-16:]}"
+
+
+def validate_batch(records):
+    """
+    Check every record in one pass. Fields are coerced row by row into arrays, then
+    range-checked together. Returns (valid_indexes, {index: error}).
+    """
+    n = len(records)
+    errors = {}
+    shaped = np.array([isinstance(r, dict) for r in records], dtype=bool)
+    for i in np.flatnonzero(~shaped):
+        errors[int(i)] = "Not a JSON object"
+    rows = [r if isinstance(r, dict) else {} for r in records]
+
+    missing = [[f for f in BATCH_FIELDS if f not in row] for row in rows]
+    for i, fields in enumerate(missing):
+        if fields and i not in errors:
+            errors[i] = f"Missing fields: {', '.join(fields)}"
+
+    lat = np.array([_number(r.get('latitude'), float) for r in rows], dtype=float)
+    lng = np.array([_number(r.get('longitude'), float) for r in rows], dtype=float)
+    severity = np.array([_number(r.get('severity'), float) for r in rows], dtype=float)
+    category = np.array([_number(r.get('category_id'), float) for r in rows], dtype=float)
+    has_description = np.array([isinstance(r.get('description'), str) and bool(r['description'].strip())
+                                for r in rows], dtype=bool)
+    has_user = np.array([_uuid(r.get('user_id')) is not None for r in rows], dtype=bool)
+
+    checks = [
+        (~((lat >= -90) & (lat <= 90)), "latitude must be a number between -90 and 90"),
+        (~((lng >= -180) & (lng <= 180)), "longitude must be a number between -180 and 180"),
+        (~((severity >= 1) & (severity <= 5) & (severity == np.floor(severity))),
+         "severity must be an integer from 1 to 5"),
+        (~((category >= 1) & (category == np.floor(category))), "category_id must be a positive integer"),
+        (~has_description, "description must be a non-empty string"),
+        (~has_user, "user_id must be a UUID"),
+    ]
+    for failed, message in checks:
+        for i in np.flatnonzero(failed):
+            errors.setdefault(int(i), message)
+
+    valid = [i for i in range(n) if i not in errors]
+    return valid, errors
+
+
+class BatchIngestor:
+    """
+    Inserts many reports with one COPY into a temporary staging table and one
+    INSERT ... SELECT into `reports`, in a single transaction. Rows are stamped
+    like create_report does (boundaries, duplicate link, alert keywords) before
+    loading. Rows referencing an unknown user or category are reported, not loaded.
+    """
+
+    def __init__(self, db_pool, boundary_index=None, duplicate_index=None, classifier=None,
+                 subscription_matcher=None, channel=None):
+        self.db_pool = db_pool
+        self.boundary_index = boundary_index
+        self.duplicate_index = duplicate_index
+        # Called for the current SeverityClassifier, so keyword reloads are picked up
+        self.classifier = classifier
+        self.subscription_matcher = subscription_matcher
+        # pg_notify channel for live feeds, if any
+        self.channel = channel
+
+    def _stage_row(self, index, record, stamp, batch_duplicates=None):
+        report_id = str(uuid.uuid4())
+        lng, lat = float(record['longitude']), float(record['latitude'])
+        area = {"neighborhood": None, "council_district": None}
+        if self.boundary_index is not None:
+            try:
+                area = self.boundary_index.lookup(lng, lat)
+            except Exception as e:
+                print(f"Error looking up boundaries for batch row {index}: {e}")
+        original = None
+        if self.duplicate_index is not None:
+            now = datetime.now(timezone.utc)
+            try:
+                # Earlier reports first, then earlier rows of this batch
+                match = self.duplicate_index.find_duplicate(record['description'], lng, lat, now)
+                if match is None and batch_duplicates is not None:
+                    match = batch_duplicates.find_duplicate(record['description'], lng, lat, now)
+                original = match[0] if match else None
+                if batch_duplicates is not None:
+                    batch_duplicates.add(report_id, record['description'], lng, lat, now, original)
+            except Exception as e:
+                print(f"Error checking duplicates for batch row {index}: {e}")
+        metadata = None
+        if self.classifier is not None:
+            try:
+                alert_severity, alert_keywords = self.classifier().classify(record['description'])
+                if alert_severity:
+                    metadata = json.dumps({"alert_severity": alert_severity, "alert_keywords": alert_keywords})
+            except Exception as e:
+                print(f"Error classifying batch row {index}: {e}")
+        # An optional "title" defaults to the start of the description
+        title = str(record.get('title') or record['description'].strip())[:255]
+        return dict(zip(STAGING_COLUMNS, [
+            index, report_id, batch_tracking_number(stamp, report_id), _uuid(record['user_id']), int(float(record['category_id'])),
+            title, record['description'], int(float(record['severity'])), lng, lat,
+            area['neighborhood'], area['council_district'], original is not None, original, metadata,
+        ]))
+
+    def ingest(self, records):
+        """
+        Validate and load records. Returns a list with one entry per input record:
+        {"index", "report_id", "tracking_number"} or {"index", "error"}.
+        """
+        valid, errors = validate_batch(records)
+        stamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        # Rows are only added to the shared index once inserted; until then a batch-local
+        # index lets later rows in the batch link to earlier ones, as create_report would
+        batch_duplicates = ReportDuplicateIndex()
+        staged = [self._stage_row(i, records[i], stamp, batch_duplicates) for i in valid]
+
+        inserted = {}
+        if staged:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                ['' if row[column] is None else row[column] for column in STAGING_COLUMNS] for row in staged
+            )
+            buffer.seek(0)
+            # Live feeds hear about every merged row when the transaction commits
+            notify_sql = ""
+            if self.channel:
+                notify_sql = """,
+                       pg_notify(%(channel)s, jsonb_build_object(
+                           'event', 'report_created',
+                           'report_id', m.report_id,
+                           'tracking_number', m.tracking_number,
+                           'category_id', s.category_id,
+                           'severity', s.severity,
+                           'status', 'submitted',
+                           'council_district', s.council_district,
+                           'is_duplicate', s.is_duplicate,
+                           'longitude', s.longitude,
+                           'latitude', s.latitude,
+                           'created_at', m.created_at
+                       )::text)"""
+            with self.db_pool.unit_of_work() as uow:
+                uow.execute("""
+                CREATE TEMP TABLE report_staging (
+                    row_index INTEGER PRIMARY KEY,
+                    report_id UUID,
+                    tracking_number VARCHAR(50),
+                    user_id UUID,
+                    category_id INTEGER,
+                    title VARCHAR(255),
+                    description TEXT,
+                    severity INTEGER,
+                    longitude DOUBLE PRECISION,
+                    latitude DOUBLE PRECISION,
+                    neighborhood VARCHAR(100),
+                    council_district INTEGER,
+                    is_duplicate BOOLEAN,
+                    original_report_id UUID,
+                    metadata JSONB
+                ) ON COMMIT DROP;
+                """)
+                uow.cursor.copy_expert(
+                    f"COPY report_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+                for row_index, reason in uow.execute("""
+                SELECT s.row_index,
+                       CASE WHEN u.user_id IS NULL THEN 'Unknown user_id' ELSE 'Unknown category_id' END
+                FROM report_staging AS s
+                LEFT JOIN users AS u ON u.user_id = s.user_id
+                LEFT JOIN issue_categories AS c ON c.category_id = s.category_id
+                WHERE u.user_id IS NULL OR c.category_id IS NULL;
+                """, fetch=True):
+                    errors[row_index] = reason
+                # Rows linked to a batch row that will not be inserted become originals themselves
+                uow.execute("""
+                UPDATE report_staging AS s
+                SET original_report_id = NULL, is_duplicate = FALSE
+                FROM report_staging AS o
+                LEFT JOIN users AS u ON u.user_id = o.user_id
+                LEFT JOIN issue_categories AS c ON c.category_id = o.category_id
+                WHERE s.original_report_id = o.report_id
+                  AND (u.user_id IS NULL OR c.category_id IS NULL);
+                """)
+                # Stamped with clock_timestamp(), not the transaction start, so a long COPY
+                # can't commit rows dated behind change cursors already handed out; only the
+                # merge itself has to finish within REPORT_CHANGES_SETTLE_SECONDS (app.py)
+                rows = uow.execute(f"""
+                WITH merged AS (
+                    INSERT INTO reports (
+                        report_id, tracking_number, user_id, category_id, title, description, severity,
+                        location_point, neighborhood, council_district, is_duplicate, original_report_id,
+                        metadata, status, created_at, updated_at
+                    )
+                    SELECT s.report_id, s.tracking_number, s.user_id, s.category_id, s.title, s.description,
+                           s.severity,
+                           ST_SetSRID(ST_MakePoint(s.longitude, s.latitude), 4326)::geography,
+                           s.neighborhood, s.council_district, s.is_duplicate, s.original_report_id,
+                           s.metadata, 'submitted', clock_timestamp(), clock_timestamp()
+                    FROM report_staging AS s
+                    JOIN users AS u ON u.user_id = s.user_id
+                    JOIN issue_categories AS c ON c.category_id = s.category_id
+                    ORDER BY s.row_index
+                    RETURNING report_id, tracking_number, created_at
+                )
+                SELECT s.row_index, m.report_id, m.tracking_number, m.created_at{notify_sql}
+                FROM merged AS m
+                JOIN report_staging AS s USING (report_id);
+                """, {"channel": self.channel}, fetch=True)
+            for row_index, report_id, tracking_number, created_at, *_ in rows:
+                inserted[row_index] = (str(report_id), tracking_number, created_at)
+
+        for row in staged:
+            if row['row_index'] in inserted:
+                self._after_insert(row, inserted[row['row_index']][2])
+
+        results = []
+        for i in range(len(records)):
+            if i in inserted:
+                report_id, tracking_number, _ = inserted[i]
+                results.append({"index": i, "report_id": report_id, "tracking_number": tracking_number})
+            else:
+                results.append({"index": i, "error": errors.get(i, "Not inserted")})
+        return results
+
+    def _after_insert(self, row, created_at):
+        if self.duplicate_index is not None:
+            try:
+                self.duplicate_index.add(row['report_id'], row['description'], row['longitude'], row['latitude'],
+                                         created_at, row['original_report_id'])
+            except Exception as e:
+                print(f"Error indexing report {row['report_id']} for duplicate detection: {e}")
+        if self.subscription_matcher is not None:
+            try:
+                self.subscription_matcher.publish({
+                    "report_id": row['report_id'],
+                    "type": "new_report",
+                    "message": f"New report {row['tracking_number']}: {row['description'][:140]}",
+                    "category_id": row['category_id'],
+                    "council_district": row['council_district'],
+                    "longitude": row['longitude'],
+                    "latitude": row['latitude'],
+                    "actor_user_id": row['user_id'],
+                })
+            except Exception as e:
+                print(f"Error matching subscriptions for report {row['report_id']}: {e}")
@@ -0,0 +1,217 @@
+# Incremental daily rollups of reports into the `statistics` table
+import argparse
+import threading
+import time
+
+# Days are bucketed in Austin local time
+ROLLUP_TIMEZONE = 'America/Chicago'
+GRANULARITIES = ('day', 'week', 'month')
+# Re-scan a little before the watermark so rows committed late by slow transactions are not missed
+WATERMARK_OVERLAP = '5 minutes'
+ADVISORY_LOCK_ID = 72_001
+
+
+class StatisticsRollup:
+    """
+    Maintains per-day/category/department/district counts in `statistics`.
+
+    Each `refresh()` finds the days touched by reports updated or deleted since
+    the stored watermark and rebuilds only those days, so it stays cheap no matter
+    how large `reports` grows. Trend queries read from the rollups and are
+    O(buckets). Refreshes run on a background thread, never in a request.
+    """
+
+    JOB_NAME = 'statistics_daily'
+
+    def __init__(self, db_pool, max_staleness=60, enabled=True):
+        self.db_pool = db_pool
+        self.max_staleness = max_staleness
+        # When disabled nothing refreshes in this process; trends read whatever rollups exist
+        self.enabled = enabled
+        self._last_refresh = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Rebuild rollups for days touched since the last watermark. Returns the days rebuilt."""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                # Only one worker rebuilds at a time; the others just read the current rollups
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s);", (ADVISORY_LOCK_ID,))
+                if not cur.fetchone()[0]:
+                    return []
+
+                cur.execute("""
+                SELECT COALESCE(
+                    (SELECT watermark FROM rollup_watermarks WHERE job_name = %s),
+                    '-infinity'::timestamptz
+                ), CURRENT_TIMESTAMP;
+                """, (self.JOB_NAME,))
+                watermark, started_at = cur.fetchone()
+
+                # Days of deleted reports are rebuilt too, so their counts come back down
+                cur.execute(f"""
+                SELECT (created_at AT TIME ZONE %s)::date
+                FROM reports
+                WHERE updated_at > %s::timestamptz - INTERVAL '{WATERMARK_OVERLAP}'
+                UNION
+                SELECT (created_at AT TIME ZONE %s)::date
+                FROM report_deletions
+                WHERE deleted_at > %s::timestamptz - INTERVAL '{WATERMARK_OVERLAP}'
+                  AND created_at IS NOT NULL
+                """, (ROLLUP_TIMEZONE, watermark, ROLLUP_TIMEZONE, watermark))
+                days = [row[0] for row in cur.fetchall()]
+
+                if days:
+                    cur.execute("DELETE FROM statistics WHERE stat_date = ANY(%s);", (days,))
+                    cur.execute("""
+                    INSERT INTO statistics (
+                        stat_date,
+                        category_id,
+                        department_id,
+                        council_district,
+                        report_count,
+                        resolved_count,
+                        avg_resolution_time
+                    )
+                    SELECT
+                        (r.created_at AT TIME ZONE %s)::date,
+                        r.category_id,
+                        c.primary_department_id,
+                        r.council_district,
+                        COUNT(*),
+                        COUNT(r.resolved_at),
+                        AVG(r.resolved_at - r.created_at)
+                    FROM reports r
+                    LEFT JOIN issue_categories c ON c.category_id = r.category_id
+                    WHERE r.created_at >= (%s::date)::timestamp AT TIME ZONE %s
+                      AND (r.created_at AT TIME ZONE %s)::date = ANY(%s)
+                    GROUP BY 1, 2, 3, 4;
+                    """, (ROLLUP_TIMEZONE, min(days), ROLLUP_TIMEZONE, ROLLUP_TIMEZONE, days))
+
+                cur.execute("""
+                INSERT INTO rollup_watermarks (job_name, watermark)
+                VALUES (%s, %s)
+                ON CONFLICT (job_name) DO UPDATE
+                SET watermark = EXCLUDED.watermark, updated_at = CURRENT_TIMESTAMP;
+                """, (self.JOB_NAME, started_at))
+        return days
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing statistics rollups: {e}")
+            self._last_refresh = time.monotonic()
+            self._wake.wait(self.max_staleness)
+            self._wake.clear()
+
+    def start(self):
+        """Warm the rollups now and keep them within `max_staleness` seconds (idempotent)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="statistics-rollup", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def refresh_if_stale(self):
+        """
+        Called from requests: never rebuilds inline. Starts the background refresher
+        if it is not running, or wakes it early if the rollups are overdue. Does
+        nothing when the rollup is disabled.
+        """
+        if not self.enabled:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        elif self._last_refresh is not None and time.monotonic() - self._last_refresh >= self.max_staleness:
+            self._wake.set()
+
+    def time_trends(self, granularity='month', category_id=None, council_district=None,
+                    start_date=None, end_date=None, status=None):
+        """
+        Report counts per day/week/month with empty buckets zero-filled.
+        Returns a list of (bucket_start_date, report_count) tuples.
+
+        The rollups carry no status dimension, so a status filter is answered
+        straight from `reports` instead.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+        args = []
+        if status:
+            source = """
+            SELECT (created_at AT TIME ZONE %s)::date AS day, 1 AS report_count
+            FROM reports
+            WHERE status = %s
+            """
+            args.extend([ROLLUP_TIMEZONE, status])
+        else:
+            source = """
+            SELECT stat_date AS day, report_count
+            FROM statistics
+            WHERE 1=1
+            """
+        if category_id:
+            source += " AND category_id = %s"
+            args.append(category_id)
+        if council_district:
+            source += " AND council_district = %s"
+            args.append(council_district)
+
+        query = f"""
+        WITH source AS (
+            SELECT * FROM ({source}) s
+            WHERE (%s::date IS NULL OR day >= %s::date)
+              AND (%s::date IS NULL OR day <= %s::date)
+        ),
+        span AS (
+            SELECT
+                DATE_TRUNC('{granularity}', COALESCE(%s::date, MIN(day))) AS lo,
+                DATE_TRUNC('{granularity}', COALESCE(%s::date, MAX(day))) AS hi
+            FROM source
+        ),
+        buckets AS (
+            SELECT generate_series(lo, hi, INTERVAL '1 {granularity}')::date AS bucket
+            FROM span
+        ),
+        rolled AS (
+            SELECT DATE_TRUNC('{granularity}', day)::date AS bucket, SUM(report_count) AS report_count
+            FROM source
+            GROUP BY 1
+        )
+        SELECT b.bucket, COALESCE(r.report_count, 0)::integer
+        FROM buckets b
+        LEFT JOIN rolled r ON r.bucket = b.bucket
+        ORDER BY b.bucket
+        """
+        args.extend([start_date, start_date, end_date, end_date, start_date, end_date])
+        return self.db_pool.execute(query, args, fetch=True) or []
+
+
+if __name__ == "__main__":
+    from db import DatabasePool
+
+    parser = argparse.ArgumentParser(description="Incrementally roll reports up into the statistics table")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Keep running, refreshing every N seconds (default: run once)")
+    cli_args = parser.parse_args()
+
+    rollup = StatisticsRollup(DatabasePool.from_env())
+    while True:
+        rebuilt = rollup.refresh()
+        print(f"Rebuilt statistics for {len(rebuilt)} day(s)")
+        if not cli_args.interval:
+            break
+        time.sleep(cli_args.interval)
@@ -0,0 +1,285 @@
+# Offline catalog of safe places (shelters, police/fire stations, hospitals, ...) in PostGIS
+import argparse
+import hashlib
+import time
+
+from psycopg2.extras import execute_values
+
+from serp_api_service.budget import Priority
+from serp_api_service.async_serp_api_handler import CoalescedSerpApiService
+from serp_api_service.local_info_fetcher import LocalInfoFetcher, category_params, shape_places
+from serp_api_service.serp_api_handler import SerpApiService
+
+# Search term -> place_type: LocalInfoFetcher's SAFE_PLACE_CATEGORIES plus hospitals
+HARVEST_CATEGORIES = {
+    "Emergency shelters": "shelter",
+    "Police stations": "police",
+    "Fire stations": "fire",
+    "Disaster relief centers": "relief",
+    "Hospitals": "hospital",
+}
+# Searches are made from a grid of centres across Austin (rows x cols over this bbox)
+HARVEST_BBOX = (-98.0, 30.05, -97.5, 30.55)
+HARVEST_GRID = (3, 3)
+# Harvested places not seen again for this long are hidden from lookups
+STALE_AFTER_DAYS = 30
+METERS_PER_MILE = 1609.344
+
+# Public infrastructure shown on the map overlay; also loaded into the catalog
+INFRASTRUCTURE_FEATURES = [
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7431, 30.2672]  # Austin City Hall
+        },
+        "properties": {
+            "name": "City Hall",
+            "type": "government",
+            "address": "301 W 2nd St, Austin, TX 78701"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7365, 30.2849]  # APD Headquarters
+        },
+        "properties": {
+            "name": "Police Headquarters",
+            "type": "police",
+            "address": "715 E 8th St, Austin, TX 78701"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7377, 30.2759]  # Austin Fire Station 1
+        },
+        "properties": {
+            "name": "Fire Station 1",
+            "type": "fire",
+            "address": "401 E 5th St, Austin, TX 78701"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7516, 30.2751]  # Austin Public Library
+        },
+        "properties": {
+            "name": "Central Library",
+            "type": "library",
+            "address": "710 W César Chávez St, Austin, TX 78701"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7359, 30.2664]  # Austin Convention Center
+        },
+        "properties": {
+            "name": "Convention Center",
+            "type": "public",
+            "address": "500 E Cesar Chavez St, Austin, TX 78701"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7387, 30.2742]  # Travis County Courthouse
+        },
+        "properties": {
+            "name": "County Courthouse",
+            "type": "government",
+            "address": "1000 Guadalupe St, Austin, TX 78701"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [-97.7428, 30.2745]  # Austin EMS Station
+        },
+        "properties": {
+            "name": "EMS Station 6",
+            "type": "medical",
+            "address": "517 S Pleasant Valley Rd, Austin, TX 78741"
+        }
+    },
+    {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point", 
+            "coordinates": [-97.7265, 30.2913]  # UT Austin
+        },
+        "properties": {
+            "name": "UT Austin Campus",
+            "type": "education",
+            "address": "110 Inner Campus Drive, Austin, TX 78705"
+        }
+    }
+]
+
+
+def harvest_centers(bbox=HARVEST_BBOX, grid=HARVEST_GRID):
+    """(lat, lng) at the centre of each cell of a rows x cols grid over bbox."""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    rows, cols = grid
+    return [
+        (round(min_lat + (max_lat - min_lat) * (r + 0.5) / rows, 6),
+         round(min_lng + (max_lng - min_lng) * (c + 0.5) / cols, 6))
+        for r in range(rows) for c in range(cols)
+    ]
+
+
+def _rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SafePlacesCatalog:
+    """
+    The `safe_places` table: harvested from Google Maps category searches and the
+    static infrastructure list, and queried with PostGIS KNN so nearest-facility
+    lookups keep working when SerpApi is down or out of credits.
+    """
+
+    def __init__(self, db_pool, fetcher=None):
+        self.db_pool = db_pool
+        self.fetcher = fetcher
+
+    def harvest(self, centers=None):
+        """Search every category around every centre and upsert the results. Returns rows upserted."""
+        fetcher = self.fetcher or LocalInfoFetcher()
+        if self.fetcher is None:
+            # A scheduled bulk refresh must not eat into the credits kept for live emergencies
+            fetcher.service = CoalescedSerpApiService.wrapping(SerpApiService(priority=Priority.BACKGROUND))
+
+        rows = {}
+        for latitude, longitude in centers or harvest_centers():
+            # Every category around a centre goes out as one concurrent batch
+            try:
+                results = fetcher.service.search_many(
+                    [category_params(term, latitude, longitude) for term in HARVEST_CATEGORIES]
+                )
+            except Exception as e:
+                print(f"[SafePlacesCatalog] Searches near ({latitude}, {longitude}) failed: {e}")
+                continue
+            for (term, place_type), result in zip(HARVEST_CATEGORIES.items(), results):
+                for place in shape_places(term, result):
+                    if place["latitude"] is None or place["longitude"] is None:
+                        continue
+                    source_id = place["place_id"] or hashlib.md5(
+                        f"{place['name']}|{place['address']}".encode()).hexdigest()
+                    # A place returned by several category searches keeps the first category's type
+                    rows.setdefault(("serpapi", source_id), (
+                        "serpapi", source_id, place["name"], place_type, place["address"],
+                        _rating(place["rating"]), place["link"], place["longitude"], place["latitude"],
+                    ))
+
+        for feature in INFRASTRUCTURE_FEATURES:
+            props = feature["properties"]
+            longitude, latitude = feature["geometry"]["coordinates"]
+            rows[("static", props["name"])] = (
+                "static", props["name"], props["name"], props["type"], props["address"],
+                None, None, longitude, latitude,
+            )
+
+        upserted = self.upsert(list(rows.values()))
+        self.deactivate_stale()
+        return upserted
+
+    def upsert(self, rows):
+        if not rows:
+            return 0
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                upserted = execute_values(cur, """
+                INSERT INTO safe_places (source, source_id, name, place_type, address, rating, link, location)
+                VALUES %s
+                ON CONFLICT (source, source_id) DO UPDATE SET
+                    name = EXCLUDED.name,
+                    place_type = EXCLUDED.place_type,
+                    address = EXCLUDED.address,
+                    rating = EXCLUDED.rating,
+                    link = EXCLUDED.link,
+                    location = EXCLUDED.location,
+                    is_active = TRUE,
+                    last_seen_at = CURRENT_TIMESTAMP
+                RETURNING 1
+                """, rows,
+                    template="(%s, %s, %s, %s, %s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography)",
+                    page_size=1000, fetch=True)
+                # cur.rowcount only reflects the last page execute_values sent
+                return len(upserted)
+
+    def deactivate_stale(self, days=STALE_AFTER_DAYS):
+        self.db_pool.execute("""
+        UPDATE safe_places SET is_active = FALSE
+        WHERE is_active AND source <> 'static'
+          AND last_seen_at < CURRENT_TIMESTAMP - make_interval(days => %s);
+        """, (days,))
+
+    def nearest(self, latitude, longitude, place_types=None, radius_meters=None, limit=10):
+        """
+        Active places nearest to a point, via the GIST index (`<->` KNN ordering).
+        Optionally restricted to place_types and to within radius_meters.
+        """
+        filters = ""
+        args = [longitude, latitude]
+        if place_types:
+            filters += " AND place_type = ANY(%s)"
+            args.append(list(place_types))
+        if radius_meters:
+            filters += " AND ST_DWithin(location, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)"
+            args.extend([longitude, latitude, radius_meters])
+        args.extend([longitude, latitude, limit])
+
+        rows = self.db_pool.execute(f"""
+        SELECT name, place_type, address, rating, link,
+               ST_Y(location::geometry), ST_X(location::geometry),
+               ST_Distance(location, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography) AS meters
+        FROM safe_places
+        WHERE is_active{filters}
+        ORDER BY location <-> ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+        LIMIT %s;
+        """, args, fetch=True) or []
+
+        places = []
+        for name, place_type, address, rating, link, lat, lng, meters in rows:
+            places.append({
+                "name": name,
+                "type": place_type,
+                "address": address,
+                "rating": rating,
+                "link": link,
+                "directions_link": f"https://www.google.com/maps/dir/?api=1&destination={lat},{lng}",
+                "latitude": lat,
+                "longitude": lng,
+                "distance_meters": round(meters, 1),
+                "distance_miles": round(meters / METERS_PER_MILE, 2),
+            })
+        return places
+
+
+if __name__ == "__main__":
+    from db import DatabasePool
+
+    parser = argparse.ArgumentParser(description="Harvest safe places into the PostGIS catalog")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Repeat every this many hours (default: harvest once and exit)")
+    cli_args = parser.parse_args()
+
+    catalog = SafePlacesCatalog(DatabasePool.from_env())
+    while True:
+        print(f"Upserted {catalog.harvest()} safe places")
+        if not cli_args.interval:
+            break
+        time.sleep(cli_args.interval * 3600)
@@ -1,58 +1,54 @@
 from serp_api_service.serp_api_handler import SerpApiService
+from serp_api_service.severity_classifier import default_classifier
 
 class CommunityAlertSystem:
-    def __init__(self):
-        self.service = SerpApiService()
-        self.serious_keywords = {
-            "fatal": "Red",
-            "shutdown": "Red",
-            "evacuation": "Red",
-            "fire": "Red",
-            "shooting": "Red",
-            "explosion": "Red",
-            "major crash": "Red",
-            "power outage": "Yellow",
-            "highway closed": "Yellow",
-            "road closure": "Yellow",
-            "severe weather": "Red",
-            "flooding": "Red",
-            "water main break": "Yellow",
-            "missing person": "Red",
-            "emergency services": "Red",
-            "traffic jam": "Green",
-            "minor accident": "Green",
-        }
-
-    def search_and_detect_incidents(self):
-        """Search for major incidents in Austin and detect serious events."""
-        print("\n[Community Alert] Checking for major incidents...")
-
+    def __init__(self, classifier=None, service=None):
+        self.service = service or SerpApiService()
+        self.classifier = classifier or default_classifier
+
+    def detect_incidents(self, max_age=None):
+        """
+        Search for major incidents in Austin.
+
+        Returns a list of {"title", "link", "snippet", "severity", "keywords"} for
+        every result that matched an alert keyword. max_age (seconds) bounds how
+        old a cached search response may be.
+        """
         results = self.service.search(
             params={
                 "engine": "google",
                 "q": "Austin crash OR Austin flood OR Austin fire OR Austin shooting OR Austin accident OR Austin emergency",
                 "location": "Austin, Texas",
                 "num": 10
-            }
+            },
+            max_age=max_age
         )
 
         if not results or 'organic_results' not in results:
             print("No results found or error occurred.")
-            return
+            return []
 
+        incidents = []
         for item in results['organic_results']:
-            title = item.get('title', '').lower()
-            snippet = item.get('snippet', '').lower()
+            # Every keyword in title and snippet is found in one pass; the most severe one wins
+            severity, keywords = self.classifier.classify(item.get('title', ''), item.get('snippet', ''))
 
-            severity = None
+            if severity:
+                incidents.append({
+                    "title": item.get('title', ''),
+                    "link": item.get('link', ''),
+                    "snippet": item.get('snippet', ''),
+                    "severity": severity,
+                    "keywords": keywords,
+                })
+        return incidents
 
-            for keyword, level in self.serious_keywords.items():
-                if keyword in title or keyword in snippet:
-                    severity = level
-                    break  # Stop checking after the first match
+    def search_and_detect_incidents(self):
+        """Search for major incidents in Austin and detect serious events."""
+        print("\n[Community Alert] Checking for major incidents...")
 
-            if severity:
-                self.send_alert(item['title'], item['link'], severity)
+        for incident in self.detect_incidents():
+            self.send_alert(incident['title'], incident['link'], incident['severity'])
 
     def send_alert(self, title, link, severity):
         """Simulate sending a push notification."""
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+
+from serp_api_service.search_cache import normalize_params
+from serp_api_service.serp_api_handler import SerpApiService
+
+# Upper bound on live SerpApi requests in flight at once across the process
+MAX_CONCURRENCY = int(os.getenv("SERPAPI_MAX_CONCURRENCY", 8))
+
+
+class AsyncSerpApiService:
+    """
+    Asyncio front end to SerpApiService.
+
+    Identical parameter sets that are in flight at the same time share a single
+    upstream request and its result (single-flight), and a semaphore caps how many
+    distinct searches run concurrently. Each search still goes through the shared
+    cache, session and circuit breaker of SerpApiService.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, service=None):
+        self.service = service or SerpApiService()
+        self.max_concurrency = max_concurrency
+        self._semaphores = {}
+        self._inflight = {}
+        self.coalesced = 0
+
+    def _semaphore(self):
+        # asyncio primitives belong to one event loop; keep one per loop
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def search(self, query=None, params=None, max_age=None):
+        """Async equivalent of SerpApiService.search."""
+        if params is None:
+            if not query:
+                raise ValueError("Either 'query' or 'params' must be provided for a search.")
+            params = {"engine": "google", "q": query}
+
+        # A caller with max_age must not be handed an older cached answer fetched for another
+        key = (asyncio.get_running_loop(), normalize_params(params), max_age)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._run(params, max_age))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _run(self, params, max_age=None):
+        async with self._semaphore():
+            return await asyncio.to_thread(self.service.search, params=dict(params), max_age=max_age)
+
+    async def search_many(self, params_list, max_age=None, timeout=None):
+        """
+        Run several searches together. Results come back in the same order as params_list.
+        With a timeout, searches still running when it expires give None; they are left
+        to finish so their responses still land in the search cache.
+        """
+        tasks = [asyncio.ensure_future(self.search(params=params, max_age=max_age)) for params in params_list]
+        if not tasks:
+            return []
+        if timeout is None:
+            return await asyncio.gather(*tasks)
+        await asyncio.wait(tasks, timeout=timeout)
+        results = []
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception() is None:
+                results.append(task.result())
+            else:
+                if task.done() and not task.cancelled():
+                    print(f"SerpApi search in batch failed: {task.exception()}")
+                results.append(None)
+        return results
+
+
+class CoalescedSerpApiService:
+    """
+    Blocking facade over AsyncSerpApiService for synchronous code such as Flask views
+    and the fetchers. Every caller in the process submits to one background event
+    loop, so concurrent requests for the same search are coalesced across threads.
+    Drop-in replacement for a fetcher's `service` attribute.
+    """
+
+    _loop = None
+    _loop_pid = None
+    _loop_lock = threading.Lock()
+
+    def __init__(self, async_service=None, timeout=30):
+        self.async_service = async_service or AsyncSerpApiService()
+        self.timeout = timeout
+
+    @classmethod
+    def wrapping(cls, service, **kwargs):
+        """Coalesce searches made through an existing SerpApiService (e.g. one with its own priority)."""
+        return cls(AsyncSerpApiService(service=service), **kwargs)
+
+    @classmethod
+    def _get_loop(cls):
+        with cls._loop_lock:
+            # The loop thread does not survive a fork, so each worker process starts its own
+            if cls._loop is None or cls._loop.is_closed() or cls._loop_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="serpapi-loop", daemon=True).start()
+                cls._loop = loop
+                cls._loop_pid = os.getpid()
+        return cls._loop
+
+    def _run(self, coro):
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        return future.result(timeout=self.timeout)
+
+    def search(self, query=None, params=None, max_age=None):
+        return self._run(self.async_service.search(query=query, params=params, max_age=max_age))
+
+    def search_many(self, params_list, max_age=None, timeout=None):
+        return self._run(self.async_service.search_many(params_list, max_age=max_age, timeout=timeout))
@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class Priority:
+    """Who is asking for a paid search. Lower numbers win when credits run low."""
+    EMERGENCY = 0
+    INTERACTIVE = 1
+    BACKGROUND = 2
+
+    NAMES = {EMERGENCY: "emergency", INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+# Fraction of the daily and monthly allowance each priority must leave untouched for higher ones
+RESERVED_FRACTION = {
+    Priority.EMERGENCY: 0.0,
+    Priority.INTERACTIVE: 0.10,
+    Priority.BACKGROUND: 0.25,
+}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self, tokens=1):
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def give_back(self, tokens=1):
+        self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+
+class CreditLedger:
+    """
+    Credits spent per UTC day in the `serpapi_credit_usage` table, shared by
+    every worker and surviving restarts. The daily row's lock serializes
+    concurrent spends, so the ceilings hold across processes.
+    """
+
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+
+    def load(self, day, month_start):
+        """Return (spent_today, spent_this_month)."""
+        rows = self.db_pool.execute("""
+        SELECT COALESCE(SUM(credits) FILTER (WHERE usage_date = %s), 0),
+               COALESCE(SUM(credits), 0)
+        FROM serpapi_credit_usage
+        WHERE usage_date >= %s AND usage_date <= %s;
+        """, (day, month_start, day), fetch=True)
+        spent_today, spent_this_month = rows[0]
+        return int(spent_today), int(spent_this_month)
+
+    def spend(self, day, month_start, daily_cap, monthly_cap):
+        """
+        Take one credit if today stays within daily_cap and the month within monthly_cap.
+        Returns (spent_today, spent_this_month) after spending, or None if denied.
+        """
+        with self.db_pool.unit_of_work() as uow:
+            uow.execute("""
+            INSERT INTO serpapi_credit_usage (usage_date) VALUES (%s) ON CONFLICT (usage_date) DO NOTHING;
+            """, (day,))
+            # The caps are re-checked against the latest row version once its lock is held
+            rows = uow.execute("""
+            UPDATE serpapi_credit_usage AS u
+            SET credits = u.credits + 1, updated_at = CURRENT_TIMESTAMP
+            FROM (
+                SELECT COALESCE(SUM(credits), 0) AS spent
+                FROM serpapi_credit_usage
+                WHERE usage_date >= %(month_start)s AND usage_date < %(day)s
+            ) AS earlier
+            WHERE u.usage_date = %(day)s
+              AND u.credits + 1 <= %(daily_cap)s
+              AND earlier.spent + u.credits + 1 <= %(monthly_cap)s
+            RETURNING u.credits, earlier.spent + u.credits;
+            """, {"day": day, "month_start": month_start, "daily_cap": daily_cap, "monthly_cap": monthly_cap},
+                fetch=True)
+        return (int(rows[0][0]), int(rows[0][1])) if rows else None
+
+    def refund(self, day):
+        self.db_pool.execute("""
+        UPDATE serpapi_credit_usage
+        SET credits = GREATEST(credits - 1, 0), updated_at = CURRENT_TIMESTAMP
+        WHERE usage_date = %s;
+        """, (day,))
+
+
+class CreditBudget:
+    """
+    Gatekeeper for paid SerpApi searches, shared by every SerpApiService in the process.
+
+    Each engine has its own token bucket to smooth bursts. Daily and monthly
+    credit ceilings (UTC calendar) sit on top. Lower priorities stop spending
+    while a reserve is still left for higher ones, so emergency lookups keep
+    working after the news feed has been cut off.
+
+    With a `ledger` the ceilings are checked against the shared per-day counts
+    in Postgres; the local counters mirror them, reloaded every `sync_interval`
+    seconds for tight() and stats(). Without one, or while it is unreachable,
+    the counters are per process.
+    """
+
+    def __init__(self, daily_limit=1000, monthly_limit=5000, rate_per_minute=30, burst=10,
+                 ledger=None, sync_interval=30):
+        self.daily_limit = daily_limit
+        self.monthly_limit = monthly_limit
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.ledger = ledger
+        self.sync_interval = sync_interval
+        self._synced_at = None
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._day = None
+        self._month = None
+        self.spent_today = 0
+        self.spent_this_month = 0
+        self.denied = {name: 0 for name in Priority.NAMES.values()}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            daily_limit=int(os.getenv("SERPAPI_DAILY_CREDITS", 1000)),
+            monthly_limit=int(os.getenv("SERPAPI_MONTHLY_CREDITS", 5000)),
+            rate_per_minute=float(os.getenv("SERPAPI_RATE_PER_MINUTE", 30)),
+            burst=int(os.getenv("SERPAPI_RATE_BURST", 10)),
+        )
+
+    def _roll_periods(self):
+        now = datetime.now(timezone.utc)
+        day, month = now.date(), (now.year, now.month)
+        if day != self._day:
+            self._day = day
+            self.spent_today = 0
+        if month != self._month:
+            self._month = month
+            self.spent_this_month = 0
+
+    def _bucket(self, engine):
+        bucket = self._buckets.get(engine)
+        if bucket is None:
+            bucket = self._buckets[engine] = TokenBucket(self.rate_per_minute / 60.0, self.burst)
+        return bucket
+
+    def _period(self):
+        day = datetime.now(timezone.utc).date()
+        return day, day.replace(day=1)
+
+    def sync(self, force=False):
+        """Reload the shared counters from the ledger, at most every sync_interval seconds."""
+        if self.ledger is None:
+            return
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        try:
+            spent_today, spent_this_month = self.ledger.load(*self._period())
+        except Exception as e:
+            print(f"Error loading SerpApi credit ledger: {e}")
+            return
+        with self._lock:
+            self._roll_periods()
+            self.spent_today, self.spent_this_month = spent_today, spent_this_month
+
+    def try_acquire(self, engine, priority=Priority.INTERACTIVE):
+        """Spend one credit for `engine` if budget and rate allow. Returns True if granted."""
+        reserve = RESERVED_FRACTION.get(priority, RESERVED_FRACTION[Priority.BACKGROUND])
+        self.sync()
+        within_budget = False
+        with self._lock:
+            self._roll_periods()
+            # Emergency lookups are never rate limited, only capped by the hard ceilings
+            within_rate = priority == Priority.EMERGENCY or self._bucket(engine).try_take()
+            if within_rate and self.ledger is None:
+                within_budget = self._spend_locally(reserve)
+        if within_rate and self.ledger is not None:
+            within_budget = self._spend_shared(reserve)
+        if within_rate and within_budget:
+            return True
+        with self._lock:
+            if within_rate and priority != Priority.EMERGENCY:
+                self._bucket(engine).give_back()
+            self.denied[Priority.NAMES.get(priority, "background")] += 1
+        return False
+
+    def _spend_locally(self, reserve):
+        if (self.spent_today < self.daily_limit * (1 - reserve)
+                and self.spent_this_month < self.monthly_limit * (1 - reserve)):
+            self.spent_today += 1
+            self.spent_this_month += 1
+            return True
+        return False
+
+    def _spend_shared(self, reserve):
+        # The round trip happens outside the lock; the ledger row lock orders concurrent spends
+        try:
+            spent = self.ledger.spend(*self._period(), int(self.daily_limit * (1 - reserve)),
+                                      int(self.monthly_limit * (1 - reserve)))
+        except Exception as e:
+            print(f"Error updating SerpApi credit ledger: {e}")
+            with self._lock:
+                return self._spend_locally(reserve)
+        if spent is None:
+            return False
+        with self._lock:
+            self.spent_today, self.spent_this_month = spent
+        return True
+
+    def refund(self):
+        """Return a credit for a request that never produced a billable search."""
+        with self._lock:
+            self.spent_today = max(0, self.spent_today - 1)
+            self.spent_this_month = max(0, self.spent_this_month - 1)
+        if self.ledger is not None:
+            try:
+                self.ledger.refund(self._period()[0])
+            except Exception as e:
+                print(f"Error refunding SerpApi credit ledger: {e}")
+
+    def tight(self):
+        """True once background work should stop spending credits."""
+        self.sync()
+        with self._lock:
+            self._roll_periods()
+            reserve = RESERVED_FRACTION[Priority.BACKGROUND]
+            return (self.spent_today >= self.daily_limit * (1 - reserve)
+                    or self.spent_this_month >= self.monthly_limit * (1 - reserve))
+
+    def stats(self):
+        self.sync()
+        with self._lock:
+            self._roll_periods()
+            return {
+                "daily_limit": self.daily_limit,
+                "monthly_limit": self.monthly_limit,
+                "spent_today": self.spent_today,
+                "spent_this_month": self.spent_this_month,
+                "remaining_today": max(0, self.daily_limit - self.spent_today),
+                "remaining_this_month": max(0, self.monthly_limit - self.spent_this_month),
+                "rate_tokens": {engine: round(b.available(), 2) for engine, b in self._buckets.items()},
+                "denied": dict(self.denied),
+            }
+
+
+# Shared by every SerpApiService instance in the process
+default_budget = CreditBudget.from_env()
@@ -1,27 +1,30 @@
-from serp_api_service.serp_api_handler import SerpApiService
+from serp_api_service.async_serp_api_handler import CoalescedSerpApiService
 
 class ContextualVerificationService:
     def __init__(self):
-        self.service = SerpApiService()
+        self.service = CoalescedSerpApiService()
 
-    def fetch_context_for_report(self, incident_type, location="Austin, Texas"):
+    def fetch_context_for_report(self, incident_type, location="Austin, Texas", max_age=None):
         """Fetch relevant news, web results, and related concerns for a given incident type and location."""
-        query = f"{incident_type} {location} safety issue"
+        return self.fetch_context_for_reports([incident_type], location, max_age=max_age)[0]
 
-        results = self.service.search(
-            params={
-                "engine": "google",
-                "q": query,
-                "location": location,
-                "num": 10
-            }
-        )
+    def fetch_context_for_reports(self, incident_types, location="Austin, Texas", max_age=None):
+        """Context for several incident types at once; the searches run as one concurrent batch."""
+        params_list = [{
+            "engine": "google",
+            "q": f"{incident_type} {location} safety issue",
+            "location": location,
+            "num": 10
+        } for incident_type in incident_types]
 
-        if not results:
-            return None
-
-        return {
-            "news": results.get("news_results", [])[:3],  # Top 3 news articles
-            "web_results": results.get("organic_results", [])[:5],  # Top 5 web results
-            "related_concerns": results.get("related_questions", [])  # Related questions
-        }
+        contexts = []
+        for results in self.service.search_many(params_list, max_age=max_age):
+            if not results:
+                contexts.append(None)
+                continue
+            contexts.append({
+                "news": results.get("news_results", [])[:3],  # Top 3 news articles
+                "web_results": results.get("organic_results", [])[:5],  # Top 5 web results
+                "related_concerns": results.get("related_questions", [])  # Related questions
+            })
+        return contexts
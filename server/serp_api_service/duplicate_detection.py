@@ -7,6 +7,10 @@ class DuplicateDetectionService:
     def search_similar_reports(self, incident_description, location="Austin, Texas"):
         """
         Search SerpApi to find possible duplicates of the given incident description.
+
+        Incoming citizen reports are de-duplicated against our own `reports` table by
+        ReportDuplicateIndex (server/duplicate_index.py); this web search is only for
+        finding outside coverage of an incident.
         """
         print(f"\n[Duplicate Detection] Checking for similar reports to: '{incident_description}'...")
 
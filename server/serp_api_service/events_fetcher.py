@@ -4,7 +4,7 @@ class EventsFetcher:
     def __init__(self):
         self.service = SerpApiService()
 
-    def fetch_events_for_location(self, query="Events in Austin, TX", location="Austin, Texas"):
+    def fetch_events_for_location(self, query="Events in Austin, TX", location="Austin, Texas", max_age=None):
         """Fetch upcoming events based on location and query."""
         params = {
             "engine": "google_events",
@@ -14,7 +14,7 @@ class EventsFetcher:
             "gl": "us",
             "htichips": "date:week"  # ⬅️ New: Only pull events for this week ; can change date:? (today/tomorrow/weekend/month/next_week/week)
         }
-        results = self.service.search(params=params)
+        results = self.service.search(params=params, max_age=max_age)
         if not results or 'events_results' not in results:
             return []
         
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for every SerpApi request
+CONNECT_TIMEOUT = float(os.getenv("SERPAPI_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.getenv("SERPAPI_READ_TIMEOUT", 10))
+TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+RETRY_TOTAL = int(os.getenv("SERPAPI_RETRIES", 3))
+RETRY_BACKOFF = float(os.getenv("SERPAPI_RETRY_BACKOFF", 0.5))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Keep-alive session shared by every SerpApiService in this process, with bounded
+    exponential-backoff retries on 429/5xx. Re-created after a fork.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            retry = Retry(
+                total=RETRY_TOTAL,
+                connect=RETRY_TOTAL,
+                read=RETRY_TOTAL,
+                status=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            session = requests.Session()
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=32)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            _session_pid = pid
+    return _session
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive upstream failures. After
+    `reset_timeout` seconds one trial request is let through (half-open); its
+    outcome closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow_request(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def would_allow(self):
+        """
+        Whether allow_request() would let a call through right now, without taking
+        the half-open trial. A "no" counts as a rejection.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            if self._state == self.HALF_OPEN and self._trial_in_flight:
+                self.rejected += 1
+                return False
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+            }
+
+
+# Shared by every SerpApiService instance in the process
+breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("SERPAPI_BREAKER_THRESHOLD", 5)),
+    reset_timeout=float(os.getenv("SERPAPI_BREAKER_RESET", 30)),
+)
@@ -1,93 +1,204 @@
-from math import radians, cos, sin, sqrt, atan2
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from serp_api_service.async_serp_api_handler import CoalescedSerpApiService
+from serp_api_service.budget import Priority
+from serp_api_service.geo import geohash_center, geohash_encode, geohash_neighbors, haversine_miles
 from serp_api_service.serp_api_handler import SerpApiService
 
+SAFE_PLACE_CATEGORIES = [
+    "Emergency shelters",
+    "Police stations",
+    "Fire stations",
+    "Disaster relief centers"
+]
+# Seconds to wait for all category searches before returning what has arrived
+SAFE_PLACES_DEADLINE = float(os.getenv("SAFE_PLACES_DEADLINE", 4))
+
+# Searches are shared per geohash cell (precision 6 is roughly 1.2 x 0.6 km)
+SAFE_PLACES_GEOHASH_PRECISION = int(os.getenv("SAFE_PLACES_GEOHASH_PRECISION", 6))
+SAFE_PLACES_CELL_TTL = float(os.getenv("SAFE_PLACES_CELL_TTL", 60 * 60))
+
+class SafePlacesCellCache:
+    """Candidate safe places per geohash cell, with a TTL and an LRU bound on cells."""
+
+    def __init__(self, ttl=SAFE_PLACES_CELL_TTL, max_cells=4096):
+        self.ttl = ttl
+        self.max_cells = max_cells
+        self._cells = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cell):
+        """Fresh places cached for cell, or None."""
+        with self._lock:
+            entry = self._cells.get(cell)
+            if entry is None:
+                return None
+            places, stored_at = entry
+            if time.time() - stored_at > self.ttl:
+                del self._cells[cell]
+                return None
+            self._cells.move_to_end(cell)
+            return places
+
+    def put(self, cell, places):
+        with self._lock:
+            self._cells[cell] = (places, time.time())
+            self._cells.move_to_end(cell)
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+
+
+# Shared by every LocalInfoFetcher in the process
+default_cell_cache = SafePlacesCellCache()
+
+
+def place_key(place):
+    return place["place_id"] or (place["name"], place["address"])
+
+
+def rank_by_distance(places, latitude, longitude):
+    """
+    Copies of places with distance_miles from (latitude, longitude), nearest first.
+    One vectorized haversine covers every candidate; places without coordinates go last.
+    """
+    if not places:
+        return []
+    lats = np.array([p["latitude"] if p["latitude"] is not None else np.nan for p in places], dtype=float)
+    lngs = np.array([p["longitude"] if p["longitude"] is not None else np.nan for p in places], dtype=float)
+    distances = np.round(haversine_miles(latitude, longitude, lats, lngs), 2)
+    # NaN sorts last; stable so equally distant places keep category order
+    order = np.argsort(distances, kind="stable")
+    return [
+        dict(places[i], distance_miles=None if np.isnan(distances[i]) else float(distances[i]))
+        for i in order
+    ]
+
+
+def category_params(term, latitude, longitude):
+    """SerpApi parameters for a Google Maps category search around a point."""
+    return {
+        "engine": "google_maps",
+        "q": term,
+        "ll": f"@{latitude},{longitude},14z",
+        "hl": "en",
+        "gl": "us"
+    }
+
+
+def shape_places(term, results):
+    """Shape the local results of a category search into place dicts."""
+    places = []
+    if results and 'local_results' in results:
+        for item in results['local_results']:
+            name = item.get('title', 'Unknown')
+            address = item.get('address', 'Unknown Address')
+            rating = item.get('rating', 'No Rating')
+            place_id = item.get('place_id', '')
+
+            # GPS coordinates for this place
+            gps = item.get('gps_coordinates', {})
+            lat2 = gps.get('latitude')
+            lon2 = gps.get('longitude')
+
+            # Build place link
+            link = item.get('link')
+            if not link and place_id:
+                link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
+            elif not link:
+                link = "Link not available"
+
+            # Build directions link
+            directions_link = f"https://www.google.com/maps/dir/?api=1&destination={name.replace(' ', '+')}&destination_place_id={place_id}"
+
+            places.append({
+                "name": name,
+                "address": address,
+                "rating": rating,
+                "link": link,
+                "directions_link": directions_link,
+                "latitude": lat2,
+                "longitude": lon2,
+                "place_id": place_id,
+                "category": term
+            })
+    return places
+
+
 class LocalInfoFetcher:
-    def __init__(self):
-        self.service = SerpApiService()
+    def __init__(self, cell_cache=None):
+        # Emergency lookups outrank every other use of the SerpApi credit budget
+        # and the category searches of a cell go out as one coalesced batch
+        self.service = CoalescedSerpApiService.wrapping(SerpApiService(priority=Priority.EMERGENCY))
+        self.cell_cache = cell_cache or default_cell_cache
 
     def fetch_places(self, search_term, location="Austin, Texas"):
         # (same fetch_places method you already have)
         ...
 
-    def calculate_distance_miles(self, lat1, lon1, lat2, lon2):
-        """
-        Calculate distance between two GPS coordinates in miles.
-        """
-        R = 3958.8  # Radius of Earth in miles
-        lat1_rad, lon1_rad = radians(lat1), radians(lon1)
-        lat2_rad, lon2_rad = radians(lat2), radians(lon2)
-
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
-        a = sin(dlat/2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1 - a))
-        distance = R * c
-
-        return round(distance, 2)
-
-    def find_nearest_safe_places(self, user_latitude, user_longitude):
+    def find_nearest_safe_places(self, user_latitude, user_longitude, deadline=SAFE_PLACES_DEADLINE):
         """
         Find nearest safe places during emergencies based on user's geolocation (latitude, longitude).
         Includes distance calculation to each safe place.
-        """
-        print(f"\n[LocalInfoFetcher] Finding nearest safe places near ({user_latitude}, {user_longitude})...")
 
-        search_categories = [
-            "Emergency shelters",
-            "Police stations",
-            "Fire stations",
-            "Disaster relief centers"
+        Searches are made once per geohash cell, from the cell's center, and cached
+        for SAFE_PLACES_CELL_TTL. Candidates from the user's cell and any cached
+        neighbouring cells are merged and ranked by distance from the user's exact
+        position. The category searches run concurrently; any category that has not
+        answered within `deadline` seconds is left out so the caller still gets
+        partial results.
+        """
+        cell = geohash_encode(user_latitude, user_longitude, SAFE_PLACES_GEOHASH_PRECISION)
+        candidates = self.cell_cache.get(cell)
+        if candidates is None:
+            print(f"\n[LocalInfoFetcher] Finding nearest safe places in cell {cell}...")
+            candidates, complete = self._search_cell(cell, deadline)
+            if complete:
+                self.cell_cache.put(cell, candidates)
+
+        # Neighbouring cells other users already searched cover places just across the cell edge
+        merged = list(candidates)
+        seen = {place_key(place) for place in merged}
+        for neighbor in geohash_neighbors(cell):
+            for place in self.cell_cache.get(neighbor) or ():
+                key = place_key(place)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(place)
+
+        return rank_by_distance(merged, user_latitude, user_longitude)
+
+    def _search_cell(self, cell, deadline):
+        """Run every category search from the cell center. Returns (places, all_categories_answered)."""
+        center_latitude, center_longitude = geohash_center(cell)
+        params_list = [
+            category_params(term, round(center_latitude, 6), round(center_longitude, 6))
+            for term in SAFE_PLACE_CATEGORIES
         ]
+        # Searches that miss the deadline come back as None but keep running, so their
+        # responses still land in the search cache for the next caller
+        results = self.service.search_many(params_list, timeout=deadline)
+        complete = all(result is not None for result in results)
 
+        # Merge categories in their listed order, de-duplicating places found by more than one search
         all_safe_places = []
-
-        for term in search_categories:
-            params = {
-                "engine": "google_maps",
-                "q": term,
-                "ll": f"@{user_latitude},{user_longitude},14z",
-                "hl": "en",
-                "gl": "us"
-            }
-
-            results = self.service.search(params=params)
-            if results and 'local_results' in results:
-                for item in results['local_results']:
-                    name = item.get('title', 'Unknown')
-                    address = item.get('address', 'Unknown Address')
-                    rating = item.get('rating', 'No Rating')
-                    place_id = item.get('place_id', '')
-
-                    # GPS coordinates for this place
-                    gps = item.get('gps_coordinates', {})
-                    lat2 = gps.get('latitude')
-                    lon2 = gps.get('longitude')
-
-                    # Calculate distance if GPS available
-                    distance = None
-                    if lat2 and lon2:
-                        distance = self.calculate_distance_miles(user_latitude, user_longitude, lat2, lon2)
-
-                    # Build place link
-                    link = item.get('link')
-                    if not link and place_id:
-                        link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-                    elif not link:
-                        link = "Link not available"
-
-                    # Build directions link
-                    directions_link = f"https://www.google.com/maps/dir/?api=1&destination={name.replace(' ', '+')}&destination_place_id={place_id}"
-
-                    all_safe_places.append({
-                        "name": name,
-                        "address": address,
-                        "rating": rating,
-                        "link": link,
-                        "directions_link": directions_link,
-                        "distance_miles": distance
-                    })
-
-        # Sort by distance first (closer first)
-        sorted_safe_places = sorted(all_safe_places, key=lambda x: (x['distance_miles'] if x['distance_miles'] else 9999))
-
-        return sorted_safe_places
+        seen = set()
+        for term, result in zip(SAFE_PLACE_CATEGORIES, results):
+            if result is None:
+                print(f"[LocalInfoFetcher] '{term}' search failed or missed the {deadline}s deadline.")
+                continue
+            for place in shape_places(term, result):
+                key = place_key(place)
+                if key in seen:
+                    continue
+                seen.add(key)
+                all_safe_places.append(place)
+        return all_safe_places, complete
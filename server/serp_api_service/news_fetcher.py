@@ -4,7 +4,7 @@ class NewsFetcher:
     def __init__(self):
         self.service = SerpApiService()
 
-    def fetch_general_news(self, query, location="Austin, Texas"):
+    def fetch_general_news(self, query, location="Austin, Texas", max_age=None):
         """
         Fetch general news articles related to a search query and location using Google News API.
         """
@@ -15,7 +15,8 @@ class NewsFetcher:
                 "q": query,
                 "location": location,
                 "num": 10
-            }
+            },
+            max_age=max_age
         )
 
         if not results or 'news_results' not in results:
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# How long a cached response is considered fresh, per SerpApi engine (seconds)
+ENGINE_TTLS = {
+    "google": 15 * 60,
+    "google_news": 10 * 60,
+    "google_events": 60 * 60,
+    "google_maps": 24 * 60 * 60,
+}
+DEFAULT_TTL = 15 * 60
+# After expiring, an entry may still be served for this multiple of its TTL while it is refreshed
+STALE_FACTOR = 1.0
+
+
+def normalize_params(params):
+    """Canonical JSON for a SerpApi params dict. `api_key` is never part of the key."""
+    normalized = {}
+    for key, value in params.items():
+        key = str(key).strip().lower()
+        if key == "api_key" or value is None:
+            continue
+        normalized[key] = value.strip() if isinstance(value, str) else value
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def ttl_for(params):
+    return ENGINE_TTLS.get(params.get("engine", "google"), DEFAULT_TTL)
+
+
+class SerpResultStore:
+    """Persists cached SerpApi responses in the `serpapi_results` table."""
+
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+
+    def load(self, query_text):
+        """Return (result_json, stored_at_epoch) for the newest row, or None."""
+        rows = self.db_pool.execute("""
+        SELECT result_json, EXTRACT(EPOCH FROM created_at)
+        FROM serpapi_results
+        WHERE report_id IS NULL AND md5(query_text) = md5(%s)
+        ORDER BY created_at DESC
+        LIMIT 1;
+        """, (query_text,), fetch=True)
+        if not rows:
+            return None
+        result, stored_at = rows[0]
+        return result, float(stored_at)
+
+    def save(self, query_text, result):
+        """Replace the cached row for query_text."""
+        self.db_pool.execute("""
+        WITH removed AS (
+            DELETE FROM serpapi_results
+            WHERE report_id IS NULL AND md5(query_text) = md5(%s)
+        )
+        INSERT INTO serpapi_results (query_text, result_json)
+        VALUES (%s, %s::jsonb);
+        """, (query_text, query_text, json.dumps(result)))
+
+
+class SearchCache:
+    """
+    Two-tier read-through cache for SerpApi responses: an in-process LRU in front
+    of an optional persistent store. Expired entries are served stale while a
+    single background refresh runs (stale-while-revalidate).
+    """
+
+    def __init__(self, max_entries=1024, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.counters = {
+            "memory_hits": 0,
+            "store_hits": 0,
+            "stale_served": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "credits_saved": 0,
+        }
+
+    def _count(self, *names):
+        with self._lock:
+            for name in names:
+                self.counters[name] += 1
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, "memory_hits"
+        if self.store is not None:
+            try:
+                loaded = self.store.load(key)
+            except Exception as e:
+                print(f"Error reading SerpApi cache store: {e}")
+                loaded = None
+            if loaded is not None:
+                self._remember(key, *loaded)
+                return loaded, "store_hits"
+        return None, None
+
+    def _remember(self, key, result, stored_at):
+        with self._lock:
+            self._entries[key] = (result, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, params, result):
+        key = normalize_params(params)
+        self._remember(key, result, time.time())
+        if self.store is not None:
+            try:
+                self.store.save(key, result)
+            except Exception as e:
+                print(f"Error writing SerpApi cache store: {e}")
+
+    def peek(self, params):
+        """Return any cached result for params regardless of age, or None."""
+        entry, _ = self._lookup(normalize_params(params))
+        return entry[0] if entry else None
+
+    def get_or_fetch(self, params, fetch, max_age=None):
+        """
+        Return the cached response for params, calling fetch() only on a miss.
+        fetch() must return the fresh response, or None on failure (never cached).
+        max_age (seconds) tightens the engine TTL for callers that need fresher data;
+        such callers never get a stale entry, the refetch happens inline.
+        """
+        key = normalize_params(params)
+        ttl = ttl_for(params) if max_age is None else min(ttl_for(params), max_age)
+        entry, tier = self._lookup(key)
+
+        if entry is not None:
+            result, stored_at = entry
+            age = time.time() - stored_at
+            if age <= ttl:
+                self._count(tier, "credits_saved")
+                return result
+            if max_age is None and age <= ttl * (1 + STALE_FACTOR):
+                self._count("stale_served", "credits_saved")
+                self._refresh_in_background(key, params, fetch)
+                return result
+
+        self._count("misses")
+        result = fetch()
+        if result is not None:
+            self.put(params, result)
+        return result
+
+    def _refresh_in_background(self, key, params, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                result = fetch()
+                if result is not None:
+                    self.put(params, result)
+                    self._count("refreshes")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def clear(self):
+        """Drop every in-memory entry and reset the counters. The persistent store is untouched."""
+        with self._lock:
+            self._entries.clear()
+            for name in self.counters:
+                self.counters[name] = 0
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self.counters)
+            snapshot["entries"] = len(self._entries)
+        lookups = snapshot["memory_hits"] + snapshot["store_hits"] + snapshot["stale_served"] + snapshot["misses"]
+        snapshot["hit_rate"] = round(snapshot["credits_saved"] / lookups, 4) if lookups else 0.0
+        snapshot["persistent"] = self.store is not None
+        return snapshot
+
+
+# Shared by every SerpApiService instance in the process
+default_cache = SearchCache()
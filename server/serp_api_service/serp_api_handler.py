@@ -2,24 +2,34 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from serp_api_service.budget import Priority, default_budget
+from serp_api_service.http_client import RETRY_STATUSES, TIMEOUT, breaker, get_session
+from serp_api_service.search_cache import default_cache
+
 # Load environment variables from .env file
 load_dotenv()
 
 class SerpApiService:
-    def __init__(self):
+    def __init__(self, priority=Priority.INTERACTIVE):
         self.api_key = os.getenv("SERPAPI_API_KEY")
-        self.base_url = "https://serpapi.com/search.json"
+        # Overridable so tests and local development can point at serpapi_standin.py
+        self.base_url = os.getenv("SERPAPI_BASE_URL", "https://serpapi.com/search.json")
+        self.cache = default_cache
+        self.breaker = breaker
+        self.budget = default_budget
+        self.priority = priority
 
-    def search(self, query=None, params=None):
+    def search(self, query=None, params=None, max_age=None):
         """
         Perform a search using SerpApi.
 
         Args:
             query (str, optional): Basic search query. Used if params not provided.
             params (dict, optional): Full params dictionary for advanced searches.
+            max_age (float, optional): Oldest cached response (seconds) to accept, if stricter than the engine TTL.
 
         Returns:
-            dict: JSON response from SerpApi, or None if an error occurs.
+            dict: JSON response from SerpApi (possibly served from cache), or None if an error occurs.
         """
         if not self.api_key:
             raise ValueError("SerpApi API key is missing. Please check your .env file.")
@@ -33,12 +43,67 @@ class SerpApiService:
                 "q": query,
             }
 
-        params["api_key"] = self.api_key
+        # When credits are running low, any cached answer (however old) beats spending one
+        if self.priority != Priority.EMERGENCY and self.budget.tight():
+            cached = self.cache.peek(params)
+            if cached is not None:
+                return cached
+
+        # Identical searches are answered from the shared cache instead of spending a credit
+        result = self.cache.get_or_fetch(params, lambda: self._fetch(params), max_age=max_age)
+        if result is None:
+            # Upstream is failing: an old cached answer beats an empty one
+            result = self.cache.peek(params)
+        return result
+
+    def search_many(self, params_list, max_age=None, timeout=None):
+        """
+        Same interface as CoalescedSerpApiService.search_many, one search after another.
+        timeout is accepted for compatibility and not enforced.
+        """
+        return [self.search(params=params, max_age=max_age) for params in params_list]
+
+    def _fetch(self, params):
+        """Make the live SerpApi request through the shared session and circuit breaker."""
+        # An open circuit is checked without spending credits; the budget is then taken before
+        # allow_request() so a denied call can't use up the breaker's single half-open trial
+        if not self.breaker.would_allow():
+            print("SerpApi circuit is open; skipping live request.")
+            return None
+
+        engine = params.get("engine", "google")
+        if not self.budget.try_acquire(engine, self.priority):
+            print(f"SerpApi credit budget exhausted for {engine} at {Priority.NAMES.get(self.priority)} priority; serving cache.")
+            return None
+
+        if not self.breaker.allow_request():
+            print("SerpApi circuit is open; skipping live request.")
+            self.budget.refund()
+            return None
+
+        request_params = dict(params, api_key=self.api_key)
 
         try:
-            response = requests.get(self.base_url, params=params)
+            response = get_session().get(self.base_url, params=request_params, timeout=TIMEOUT)
             response.raise_for_status()  # Raise exception for bad HTTP responses
-            return response.json()
+            result = response.json()
         except requests.RequestException as e:
             print(f"Error contacting SerpApi: {e}")
+            # Only throttling, server errors and network failures count against upstream health
+            status = getattr(e.response, "status_code", None)
+            # Failed searches are not billed
+            self.budget.refund()
+            if status is None or status in RETRY_STATUSES:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return None
+        except ValueError as e:
+            print(f"Invalid JSON from SerpApi: {e}")
+            # An unusable answer is treated like any other failed search and not charged
+            self.budget.refund()
+            self.breaker.record_failure()
             return None
+
+        self.breaker.record_success()
+        return result
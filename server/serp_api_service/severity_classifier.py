@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import deque
+
+# Highest first; when several terms match, the most severe one wins
+SEVERITY_LEVELS = ("Red", "Yellow", "Green")
+SEVERITY_RANK = {level: rank for rank, level in enumerate(reversed(SEVERITY_LEVELS))}
+
+DEFAULT_KEYWORDS = {
+    "fatal": "Red",
+    "shutdown": "Red",
+    "evacuation": "Red",
+    "fire": "Red",
+    "shooting": "Red",
+    "explosion": "Red",
+    "major crash": "Red",
+    "power outage": "Yellow",
+    "highway closed": "Yellow",
+    "road closure": "Yellow",
+    "severe weather": "Red",
+    "flooding": "Red",
+    "water main break": "Yellow",
+    "missing person": "Red",
+    "emergency services": "Red",
+    "traffic jam": "Green",
+    "minor accident": "Green",
+}
+
+
+class SeverityClassifier:
+    """
+    Finds every alert keyword in a piece of text in a single pass.
+
+    The keywords are compiled once into an Aho-Corasick automaton, so the cost of
+    a scan depends on the length of the text, not on the number of keywords.
+    Matching is case-insensitive and, by default, only whole words count
+    ("fire" does not match "firefly").
+    """
+
+    def __init__(self, keywords=None, word_boundaries=True):
+        self.keywords = dict(DEFAULT_KEYWORDS if keywords is None else keywords)
+        self.word_boundaries = word_boundaries
+        self._compile()
+
+    @classmethod
+    def from_db(cls, db_pool, word_boundaries=True):
+        """Build from the active rows of the `alert_keywords` table, falling back to the defaults."""
+        try:
+            rows = db_pool.execute("""
+            SELECT keyword, severity FROM alert_keywords WHERE is_active;
+            """, fetch=True)
+        except Exception as e:
+            print(f"Error loading alert keywords: {e}")
+            rows = None
+        keywords = {keyword: severity for keyword, severity in rows} if rows else None
+        return cls(keywords, word_boundaries)
+
+    def _compile(self):
+        for keyword, severity in self.keywords.items():
+            if severity not in SEVERITY_RANK:
+                raise ValueError(f"Unknown severity {severity!r} for keyword {keyword!r}")
+
+        # Trie: goto[state] maps a character to the next state; out[state] lists the
+        # (keyword, severity) pairs that end at that state
+        goto = [{}]
+        out = [[]]
+        for keyword, severity in self.keywords.items():
+            term = keyword.strip().lower()
+            if not term:
+                continue
+            state = 0
+            for char in term:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append((term, severity))
+
+        # Breadth-first pass for failure links; each state inherits its fallback's matches
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[nxt] = goto[fallback].get(char, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def _is_boundary(self, text, index):
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
+    def matches(self, text):
+        """Return every (keyword, severity, start, end) found in text, in order of position."""
+        if not text:
+            return []
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term, severity in out[state]:
+                start = i - len(term) + 1
+                if self.word_boundaries and not (
+                        self._is_boundary(text, start - 1) and self._is_boundary(text, i + 1)):
+                    continue
+                found.append((term, severity, start, i + 1))
+        found.sort(key=lambda match: (match[2], match[3]))
+        return found
+
+    def classify(self, *texts):
+        """
+        Return (severity, matched_keywords) for the most severe match across texts,
+        or (None, []) if nothing matched.
+        """
+        terms = []
+        best = None
+        for text in texts:
+            for term, severity, _, _ in self.matches(text):
+                if term not in terms:
+                    terms.append(term)
+                if best is None or SEVERITY_RANK[severity] > SEVERITY_RANK[best]:
+                    best = severity
+        return best, terms
+
+
+class ReloadingClassifier:
+    """
+    SeverityClassifier over the `alert_keywords` table, recompiled every
+    `reload_interval` seconds so keyword edits take effect without a restart.
+    One caller rebuilds while the others keep classifying with the previous
+    automaton. Same matches()/classify() interface as SeverityClassifier.
+    """
+
+    def __init__(self, db_pool, reload_interval=60, word_boundaries=True):
+        self.db_pool = db_pool
+        self.reload_interval = reload_interval
+        self.word_boundaries = word_boundaries
+        self._classifier = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def reload(self):
+        classifier = SeverityClassifier.from_db(self.db_pool, self.word_boundaries)
+        self._classifier = classifier
+        self._loaded_at = time.monotonic()
+        return classifier
+
+    def current(self):
+        if self._classifier is not None and time.monotonic() - self._loaded_at < self.reload_interval:
+            return self._classifier
+        if self._lock.acquire(blocking=self._classifier is None):
+            try:
+                if self._classifier is None or time.monotonic() - self._loaded_at >= self.reload_interval:
+                    self.reload()
+            finally:
+                self._lock.release()
+        return self._classifier
+
+    def matches(self, text):
+        return self.current().matches(text)
+
+    def classify(self, *texts):
+        return self.current().classify(*texts)
+
+
+# Built-in keywords, for code without a database; ReloadingClassifier follows the alert_keywords table
+default_classifier = SeverityClassifier()
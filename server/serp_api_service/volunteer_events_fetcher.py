@@ -6,7 +6,7 @@ class VolunteerEventsFetcher:
     def __init__(self):
         self.service = SerpApiService()
 
-    def fetch_volunteer_events(self, location="Austin, Texas"):
+    def fetch_volunteer_events(self, location="Austin, Texas", max_age=None):
         """
         Fetch upcoming volunteer, charity, and community service events in Austin.
         """
@@ -21,7 +21,7 @@ class VolunteerEventsFetcher:
             "htichips": "date:month"  # Pull events happening this month
         }
 
-        results = self.service.search(params=params)
+        results = self.service.search(params=params, max_age=max_age)
         if not results or 'events_results' not in results:
             print("No volunteer events found.")
             return []
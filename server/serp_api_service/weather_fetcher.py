@@ -1,24 +1,33 @@
-from serp_api_service.serp_api_handler import SerpApiService
+from serp_api_service.async_serp_api_handler import CoalescedSerpApiService
 
 class WeatherFetcher:
     def __init__(self):
-        self.service = SerpApiService()
+        self.service = CoalescedSerpApiService()
 
-    def fetch_weather_for_location(self, location="Austin, Texas"):
+    def fetch_weather_for_location(self, location="Austin, Texas", max_age=None):
         """
         Fetch current weather information for a specified location.
         """
-        print(f"\n[WeatherFetcher] Fetching weather for {location}...")
+        return self.fetch_weather_for_locations([location], max_age=max_age)[0]
 
-        params = {
+    def fetch_weather_for_locations(self, locations, max_age=None):
+        """
+        Fetch current weather for several locations with one concurrent batch of searches.
+        Returns one result (or None) per location, in order.
+        """
+        print(f"\n[WeatherFetcher] Fetching weather for {', '.join(locations)}...")
+
+        params_list = [{
             "engine": "google",
             "q": f"{location} weather",
             "hl": "en",
             "gl": "us",
             "num": 1  # Only need top result
-        }
+        } for location in locations]
+
+        return [self._shape(results) for results in self.service.search_many(params_list, max_age=max_age)]
 
-        results = self.service.search(params=params)
+    def _shape(self, results):
         if not results:
             return None
 
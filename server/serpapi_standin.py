@@ -0,0 +1,146 @@
+# Local record/replay stand-in for https://serpapi.com/search.json
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'serpapi')
+UPSTREAM_URL = "https://serpapi.com/search.json"
+
+
+class SerpApiStandIn(ThreadingHTTPServer):
+    """
+    Serves `<fixtures_dir>/<engine>.json` for GET /search.json?engine=<engine>.
+
+    `latency` (seconds, plus up to `latency_jitter` more) and `error_rate` (share
+    of requests answered with `error_status`) can be changed while running to
+    simulate a slow or flaky upstream. In record mode, requests are forwarded to
+    the real SerpApi and each engine's response is saved as its fixture.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), fixtures_dir=DEFAULT_FIXTURES_DIR,
+                 latency=0.0, latency_jitter=0.0, error_rate=0.0, error_status=503,
+                 record=False, api_key=None):
+        super().__init__(address, StandInHandler)
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.record = record
+        self.api_key = api_key
+        self.request_log = []
+        self._log_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search.json"
+
+    def fixture(self, engine):
+        path = os.path.join(self.fixtures_dir, f"{engine}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def log_request(self, params):
+        with self._log_lock:
+            self.request_log.append(params)
+
+    def start(self):
+        """Serve from a background thread; returns self for chaining."""
+        self._thread = threading.Thread(target=self.serve_forever, name="serpapi-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path != "/search.json":
+            return self._send(404, {"error": f"Unknown path {url.path}"})
+
+        params = dict(parse_qsl(url.query))
+        server.log_request({k: v for k, v in params.items() if k != "api_key"})
+        engine = params.get("engine", "google")
+
+        if server.latency or server.latency_jitter:
+            time.sleep(server.latency + random.uniform(0, server.latency_jitter))
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send(server.error_status, {"error": "Injected failure"})
+
+        if server.record:
+            return self._record(engine, params)
+
+        body = server.fixture(engine)
+        if body is None:
+            return self._send(400, {"error": f"No fixture recorded for engine {engine}"})
+        return self._send(200, body)
+
+    def _record(self, engine, params):
+        server = self.server
+        params["api_key"] = server.api_key or params.get("api_key")
+        response = requests.get(UPSTREAM_URL, params=params, timeout=(3.05, 30))
+        body = response.json()
+        if response.ok:
+            os.makedirs(server.fixtures_dir, exist_ok=True)
+            path = os.path.join(server.fixtures_dir, f"{engine}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(body, f, indent=2, ensure_ascii=False)
+                f.write('\n')
+            print(f"Recorded {engine} fixture to {path}")
+        return self._send(response.status_code, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep test and benchmark output quiet
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay (or record) SerpApi responses locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Up to this many extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--record", action="store_true",
+                        help="Forward to the real SerpApi (SERPAPI_API_KEY) and save responses as fixtures")
+    cli_args = parser.parse_args()
+
+    standin = SerpApiStandIn(
+        (cli_args.host, cli_args.port),
+        fixtures_dir=cli_args.fixtures,
+        latency=cli_args.latency,
+        latency_jitter=cli_args.latency_jitter,
+        error_rate=cli_args.error_rate,
+        error_status=cli_args.error_status,
+        record=cli_args.record,
+        api_key=os.getenv("SERPAPI_API_KEY"),
+    )
+    print(f"SerpApi stand-in listening on {standin.url} (point SERPAPI_BASE_URL here)")
+    standin.serve_forever()
@@ -0,0 +1,195 @@
+# In-memory fan-out of report events to matching subscriptions
+import queue
+import threading
+import time
+
+from psycopg2.extras import execute_values
+from shapely import STRtree, Point, wkb
+from shapely.prepared import prep
+
+
+class Subscription:
+    __slots__ = ("subscription_id", "user_id", "report_id", "category_id", "council_district", "area")
+
+    def __init__(self, subscription_id, user_id, report_id, category_id, council_district, area):
+        self.subscription_id = subscription_id
+        self.user_id = user_id
+        self.report_id = report_id
+        self.category_id = category_id
+        self.council_district = council_district
+        self.area = area
+
+    def matches(self, event, point):
+        # Every criterion a subscription sets must hold; unset ones match anything
+        if self.report_id is not None and self.report_id != event["report_id"]:
+            return False
+        if self.category_id is not None and self.category_id != event.get("category_id"):
+            return False
+        if self.council_district is not None and self.council_district != event.get("council_district"):
+            return False
+        if self.area is not None and (point is None or not self.area.covers(point)):
+            return False
+        return True
+
+
+class SubscriptionIndex:
+    """
+    Active subscriptions, each filed under its most selective criterion: a
+    report id, an area polygon (STRtree of prepared geometries), a council
+    district or a category. Matching a report touches only the subscriptions
+    filed under its own id, district, category or the polygons covering it.
+    """
+
+    def __init__(self, rows):
+        self.by_report = {}
+        self.by_district = {}
+        self.by_category = {}
+        area_subs, areas = [], []
+        for subscription_id, user_id, report_id, category_id, council_district, area_wkb in rows:
+            geom = wkb.loads(bytes(area_wkb)) if area_wkb is not None else None
+            sub = Subscription(
+                str(subscription_id), str(user_id),
+                str(report_id) if report_id else None,
+                category_id, council_district,
+                prep(geom) if geom is not None else None,
+            )
+            if sub.report_id is not None:
+                self.by_report.setdefault(sub.report_id, []).append(sub)
+            elif geom is not None:
+                area_subs.append(sub)
+                areas.append(geom)
+            elif council_district is not None:
+                self.by_district.setdefault(council_district, []).append(sub)
+            else:
+                self.by_category.setdefault(category_id, []).append(sub)
+        self.area_subs = area_subs
+        self.tree = STRtree(areas) if areas else None
+        self.size = len(area_subs) + sum(
+            len(subs) for index in (self.by_report, self.by_district, self.by_category) for subs in index.values()
+        )
+
+    def match(self, event):
+        point = None
+        if event.get("longitude") is not None and event.get("latitude") is not None:
+            point = Point(float(event["longitude"]), float(event["latitude"]))
+
+        candidates = list(self.by_report.get(event["report_id"], ()))
+        candidates += self.by_district.get(event.get("council_district"), ())
+        candidates += self.by_category.get(event.get("category_id"), ())
+        if self.tree is not None and point is not None:
+            candidates += (self.area_subs[i] for i in self.tree.query(point))
+        return [sub for sub in candidates if sub.matches(event, point)]
+
+
+class SubscriptionMatcher:
+    """
+    Matches report events (new reports, status changes) against active
+    subscriptions in memory and queues one notification per subscribed user.
+
+    Notifications are written by a background thread with one multi-row insert
+    per `batch_size` rows or `flush_interval` seconds, whichever comes first, so
+    a burst of reports costs a handful of inserts instead of a query per
+    subscriber. Subscriptions are reloaded every `refresh_interval` seconds.
+    """
+
+    def __init__(self, db_pool, refresh_interval=60, batch_size=1000, flush_interval=1.0):
+        self.db_pool = db_pool
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._index = None
+        self._loaded_at = None
+        self._refresh_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.counters = {"events": 0, "queued": 0, "written": 0, "failed": 0, "batches": 0}
+
+    def refresh(self):
+        """(Re)load active subscriptions from the database."""
+        rows = self.db_pool.execute("""
+        SELECT subscription_id, user_id, report_id, category_id, council_district,
+               ST_AsBinary(geographic_area::geometry)
+        FROM subscriptions
+        WHERE is_active AND user_id IS NOT NULL;
+        """, fetch=True) or []
+        index = SubscriptionIndex(rows)
+        self._index = index
+        self._loaded_at = time.monotonic()
+        return index
+
+    def _current_index(self):
+        if self._index is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return self._index
+        # One request rebuilds; the rest keep matching against the previous index meanwhile
+        if self._refresh_lock.acquire(blocking=self._index is None):
+            try:
+                if self._index is None or time.monotonic() - self._loaded_at >= self.refresh_interval:
+                    self.refresh()
+            finally:
+                self._refresh_lock.release()
+        return self._index
+
+    def match(self, event):
+        """Return the user ids subscribed to an event, without duplicates."""
+        users = []
+        for sub in self._current_index().match(event):
+            if sub.user_id not in users and sub.user_id != event.get("actor_user_id"):
+                users.append(sub.user_id)
+        return users
+
+    def publish(self, event):
+        """
+        Queue notifications for an event and return how many were queued.
+
+        event: {"report_id", "type", "message", "category_id", "council_district",
+        "longitude", "latitude", "actor_user_id"}; the acting user is never notified.
+        """
+        self.counters["events"] += 1
+        users = self.match(event)
+        for user_id in users:
+            self._queue.put((user_id, event["report_id"], event["type"], event["message"]))
+        self.counters["queued"] += len(users)
+        if users:
+            self._ensure_writer()
+        return len(users)
+
+    def _ensure_writer(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run_writer, name="subscription-notifier", daemon=True)
+                self._thread.start()
+
+    def _run_writer(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.flush(batch)
+
+    def flush(self, batch):
+        try:
+            with self.db_pool.connection() as conn:
+                with conn.cursor() as cur:
+                    execute_values(cur, """
+                    INSERT INTO notifications (user_id, report_id, type, message) VALUES %s
+                    """, batch, template="(%s::uuid, %s::uuid, %s, %s)", page_size=len(batch))
+            self.counters["written"] += len(batch)
+            self.counters["batches"] += 1
+        except Exception as e:
+            self.counters["failed"] += len(batch)
+            print(f"Error writing {len(batch)} subscription notifications: {e}")
+
+    def stats(self):
+        return {
+            **self.counters,
+            "pending": self._queue.qsize(),
+            "subscriptions": self._index.size if self._index is not None else None,
+        }
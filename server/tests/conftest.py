@@ -0,0 +1,42 @@
+import os
+
+# These must be in place before serp_api_service or app is imported
+os.environ.setdefault("SERPAPI_API_KEY", "test-key")
+os.environ["FEED_PREFETCH_ENABLED"] = "0"
+os.environ["STATISTICS_ROLLUP_ENABLED"] = "0"
+os.environ.setdefault("SERPAPI_RETRY_BACKOFF", "0.01")
+os.environ.setdefault("SERPAPI_RATE_PER_MINUTE", "1000000")
+os.environ.setdefault("SERPAPI_RATE_BURST", "1000000")
+os.environ.setdefault("SERPAPI_DAILY_CREDITS", "1000000")
+os.environ.setdefault("SERPAPI_MONTHLY_CREDITS", "1000000")
+
+import pytest
+
+from serpapi_standin import SerpApiStandIn
+from serp_api_service.budget import default_budget
+from serp_api_service.http_client import breaker
+from serp_api_service.local_info_fetcher import default_cell_cache
+from serp_api_service.search_cache import default_cache
+
+
+@pytest.fixture(scope="session")
+def standin():
+    server = SerpApiStandIn().start()
+    os.environ["SERPAPI_BASE_URL"] = server.url
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def fresh_serpapi_state(standin):
+    """Every test starts with a healthy, uncached, unthrottled upstream."""
+    standin.latency = 0.0
+    standin.latency_jitter = 0.0
+    standin.error_rate = 0.0
+    standin.request_log.clear()
+    default_cache.clear()
+    default_cell_cache.clear()
+    breaker.record_success()
+    default_budget.spent_today = 0
+    default_budget.spent_this_month = 0
+    yield standin
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from duplicate_index import ReportDuplicateIndex
+
+NOW = datetime(2025, 4, 26, 18, 0, tzinfo=timezone.utc)
+DOWNTOWN = (-97.7431, 30.2672)
+CRASH = "Three car crash blocking the northbound lanes of I-35 near 6th street"
+
+
+def test_same_incident_nearby_is_linked_to_original():
+    index = ReportDuplicateIndex()
+    index.add("r1", CRASH, *DOWNTOWN, NOW)
+
+    match = index.find_duplicate("Car crash blocking northbound lanes of I-35 near 6th street",
+                                 -97.7425, 30.2675, NOW + timedelta(minutes=20))
+
+    assert match is not None
+    assert match[0] == "r1"
+    assert match[1] >= 0.5
+
+
+def test_far_away_old_or_unrelated_reports_do_not_match():
+    index = ReportDuplicateIndex()
+    index.add("r1", CRASH, *DOWNTOWN, NOW)
+
+    assert index.find_duplicate(CRASH, -97.80, 30.35, NOW) is None
+    assert index.find_duplicate(CRASH, *DOWNTOWN, NOW + timedelta(hours=8)) is None
+    assert index.find_duplicate("Streetlight out on Congress Avenue", *DOWNTOWN, NOW) is None
+
+
+def test_duplicates_of_duplicates_point_at_the_root_report():
+    index = ReportDuplicateIndex()
+    index.add("r1", CRASH, *DOWNTOWN, NOW)
+    index.add("r2", CRASH, *DOWNTOWN, NOW + timedelta(minutes=5), original_report_id="r1")
+    index.add("r3", CRASH, *DOWNTOWN, NOW + timedelta(hours=13))
+
+    # r1 and r2 were evicted once r3 was added more than two windows later
+    assert index.find_duplicate(CRASH, *DOWNTOWN, NOW + timedelta(hours=13, minutes=1))[0] == "r3"
+    index = ReportDuplicateIndex()
+    index.add("r2", CRASH, *DOWNTOWN, NOW, original_report_id="r1")
+    assert index.find_duplicate(CRASH, *DOWNTOWN, NOW)[0] == "r1"
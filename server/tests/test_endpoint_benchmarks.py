@@ -0,0 +1,99 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+ENDPOINTS = [
+    "/api/v1/serpapi/news",
+    "/api/v1/serpapi/news?q=Austin%20flooding",
+    "/api/v1/serpapi/events",
+    "/api/v1/serpapi/volunteer-events",
+]
+
+
+@pytest.fixture(scope="module")
+def flask_app(standin):
+    # Imported late so the app's SerpApi clients pick up the stand-in URL
+    import app as app_module
+    app_module.serpapi_cache.store = None
+    app_module.serpapi_budget_manager.ledger = None
+    return app_module.app
+
+
+def run_benchmark(flask_app, path, total=200, concurrency=8):
+    """Issue `total` GETs from `concurrency` threads. Returns statuses and a latency summary."""
+    def one_request(_):
+        client = flask_app.test_client()
+        started = time.perf_counter()
+        response = client.get(path)
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_request, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    cuts = statistics.quantiles(latencies, n=100)
+    summary = {
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+    print(f"\n{path}: {summary}")
+    return [status for status, _ in results], summary
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_endpoint_under_slow_upstream(flask_app, standin, path):
+    # A slow upstream is paid for once; everything after is served from cache or coalesced
+    standin.latency = 0.2
+    statuses, summary = run_benchmark(flask_app, path)
+
+    assert set(statuses) == {200}
+    assert len(standin.request_log) == 1
+    assert summary["p50_ms"] < 100
+    assert summary["max_ms"] < 2000
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_endpoint_warm_cache_throughput(flask_app, standin, path):
+    flask_app.test_client().get(path)
+    standin.request_log.clear()
+
+    statuses, summary = run_benchmark(flask_app, path, total=500)
+
+    assert set(statuses) == {200}
+    assert standin.request_log == []
+    assert summary["p99_ms"] < 250
+
+
+def test_distinct_queries_respect_upstream_latency(flask_app, standin):
+    standin.latency = 0.05
+    standin.latency_jitter = 0.05
+    paths = [f"/api/v1/serpapi/news?q=query-{i}" for i in range(40)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(lambda p: flask_app.test_client().get(p).status_code, paths))
+    elapsed = time.perf_counter() - started
+    print(f"\n40 distinct news queries: {round(40 / elapsed, 1)} req/s")
+
+    assert set(statuses) == {200}
+    assert len(standin.request_log) == 40
+    # Bounded concurrency still overlaps upstream waits instead of serialising them
+    assert elapsed < 40 * 0.05
+
+
+def test_flaky_upstream_never_errors_for_cached_feed(flask_app, standin):
+    flask_app.test_client().get("/api/v1/serpapi/events")
+    standin.error_rate = 1.0
+
+    statuses, _ = run_benchmark(flask_app, "/api/v1/serpapi/events", total=100)
+
+    assert set(statuses) == {200}
@@ -0,0 +1,262 @@
+import time
+
+import pytest
+
+from feed_scheduler import FeedScheduler
+from serp_api_service.alert_system import CommunityAlertSystem
+from serp_api_service.budget import CreditBudget, Priority
+from serp_api_service.context_verification import ContextualVerificationService
+from serp_api_service.duplicate_detection import DuplicateDetectionService
+from serp_api_service.events_fetcher import EventsFetcher
+from serp_api_service.http_client import CircuitBreaker
+from serp_api_service.local_info_fetcher import LocalInfoFetcher
+from serp_api_service.search_cache import SearchCache
+from serp_api_service.news_fetcher import NewsFetcher
+from serp_api_service.volunteer_events_fetcher import VolunteerEventsFetcher
+from serp_api_service.weather_fetcher import WeatherFetcher
+
+
+def test_general_news(standin):
+    news = NewsFetcher().fetch_general_news("Austin traffic")
+
+    assert [a["title"] for a in news] == [
+        "City council approves new flood warning sirens",
+        "Austin traffic: I-35 overnight closures begin",
+        "Zilker Park trail reopens after repairs",
+    ]
+    assert set(news[0]) == {"title", "link", "snippet", "thumbnail"}
+    assert standin.request_log == [
+        {"engine": "google_news", "q": "Austin traffic", "location": "Austin, Texas", "num": "10"}
+    ]
+
+
+def test_neighborhood_news(standin):
+    news = NewsFetcher().fetch_neighborhood_news("Zilker")
+
+    assert len(news) == 3
+    assert standin.request_log[0]["q"] == "Zilker Austin news"
+    assert standin.request_log[0]["num"] == "15"
+
+
+def test_events(standin):
+    events = EventsFetcher().fetch_events_for_location()
+
+    assert len(events) == 3
+    assert events[0] == {
+        "title": "Community Cleanup at Lady Bird Lake",
+        "date": "Sat, Oct 25, 9 AM – 12 PM",
+        "address": "Lady Bird Lake Boardwalk, Austin, TX",
+        "description": "Join neighbors to clean up the shoreline.",
+        "link": "https://example.com/events/cleanup",
+        "thumbnail": "https://example.com/img/cleanup.jpg",
+    }
+    assert events[2]["thumbnail"] == ""
+    assert standin.request_log[0]["htichips"] == "date:week"
+
+
+def test_volunteer_events(standin):
+    events = VolunteerEventsFetcher().fetch_volunteer_events()
+
+    assert [e["title"] for e in events][1] == "Austin Food Bank Volunteer Shift"
+    assert standin.request_log[0]["q"] == "Volunteer opportunities in Austin"
+    assert standin.request_log[0]["htichips"] == "date:month"
+
+
+def test_weather(standin):
+    weather = WeatherFetcher().fetch_weather_for_location()
+
+    assert weather == {
+        "temperature": "84",
+        "unit": "°F",
+        "description": "Partly cloudy",
+        "precipitation": "10%",
+        "humidity": "62%",
+        "wind": "9 mph",
+    }
+
+
+@pytest.mark.benchmark
+def test_weather_for_several_locations_is_fetched_concurrently(standin):
+    standin.latency = 0.2
+
+    started = time.perf_counter()
+    weather = WeatherFetcher().fetch_weather_for_locations(["Austin, Texas", "Round Rock, Texas", "Pflugerville, Texas"])
+    elapsed = time.perf_counter() - started
+
+    assert len(standin.request_log) == 3
+    assert [w["temperature"] for w in weather] == ["84", "84", "84"]
+    assert elapsed < 0.5
+
+
+def test_nearest_safe_places_merges_and_sorts(standin):
+    places = LocalInfoFetcher().find_nearest_safe_places(30.2672, -97.7431)
+
+    # Every category replays the same fixture, so the four searches collapse to four places
+    assert sorted(p["q"] for p in standin.request_log) == [
+        "Disaster relief centers", "Emergency shelters", "Fire stations", "Police stations"
+    ]
+    assert [p["name"] for p in places] == [
+        "Austin Fire Station 1",
+        "APD Headquarters",
+        "Austin Shelter for Women and Children",
+        "Red Cross of Central Texas",
+    ]
+    assert places[0]["distance_miles"] == 0.22
+    assert places[-1]["distance_miles"] is None
+    assert places[1]["link"] == "https://example.com/apd"
+    assert places[0]["link"] == "https://www.google.com/maps/place/?q=place_id:ChIJfire0000001"
+
+
+def test_nearby_users_share_a_cell_search(standin):
+    fetcher = LocalInfoFetcher()
+    fetcher.find_nearest_safe_places(30.2672, -97.7431)
+    searches = len(standin.request_log)
+
+    places = fetcher.find_nearest_safe_places(30.2665, -97.7440)
+
+    assert len(standin.request_log) == searches
+    # Same candidates, re-ranked from the second user's own position
+    assert places[0]["name"] == "Austin Fire Station 1"
+    assert places[0]["distance_miles"] != 0.22
+
+
+def test_community_alerts(standin):
+    alert_system = CommunityAlertSystem()
+    sent = []
+    alert_system.send_alert = lambda title, link, severity: sent.append((title, severity))
+
+    alert_system.search_and_detect_incidents()
+
+    assert sent == [
+        ("Fatal crash closes I-35 lanes near downtown Austin", "Red"),
+        ("Austin Energy reports power outage in East Austin", "Yellow"),
+        ("Traffic jam on MoPac after minor accident", "Green"),
+    ]
+
+
+def test_context_verification(standin):
+    context = ContextualVerificationService().fetch_context_for_report("Car accident near Downtown Austin")
+
+    assert len(context["news"]) == 2
+    assert len(context["web_results"]) == 4
+    assert context["related_concerns"][0]["question"] == "Is I-35 closed in Austin today?"
+
+
+def test_duplicate_detection(standin):
+    duplicates = DuplicateDetectionService().search_similar_reports("Crash I-35 Downtown Austin")
+
+    assert [d["link"] for d in duplicates] == ["https://example.com/news/i35-fatal-crash"]
+
+
+def test_identical_searches_hit_upstream_once(standin):
+    fetcher = NewsFetcher()
+    first = fetcher.fetch_general_news("Austin")
+    second = fetcher.fetch_general_news("Austin")
+
+    assert first == second
+    assert len(standin.request_log) == 1
+
+
+def test_upstream_failure_degrades_to_empty(standin, monkeypatch):
+    standin.error_rate = 1.0
+    fetcher = EventsFetcher()
+    monkeypatch.setattr(fetcher.service, "breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    assert fetcher.fetch_events_for_location() == []
+    assert fetcher.fetch_events_for_location(query="Concerts in Austin") == []
+    calls_before_open = len(standin.request_log)
+    # Circuit is now open: no further upstream calls
+    assert fetcher.fetch_events_for_location(query="Markets in Austin") == []
+    assert len(standin.request_log) == calls_before_open
+
+
+def test_budget_denial_does_not_use_up_the_half_open_trial(standin, monkeypatch):
+    fetcher = EventsFetcher()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setattr(fetcher.service, "breaker", breaker)
+    monkeypatch.setattr(fetcher.service, "budget", CreditBudget(daily_limit=0))
+
+    assert fetcher.fetch_events_for_location() == []
+    assert standin.request_log == []
+
+    monkeypatch.setattr(fetcher.service, "budget", CreditBudget())
+    assert fetcher.fetch_events_for_location() != []
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_max_age_never_serves_a_stale_entry(monkeypatch):
+    cache = SearchCache()
+    params = {"engine": "google_news", "q": "Austin"}
+    cache.put(params, {"v": "old"})
+    stored = time.time()
+    monkeypatch.setattr(time, "time", lambda: stored + 90)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {"v": "new"}
+
+    assert cache.get_or_fetch(params, fetch, max_age=60) == {"v": "new"}
+    assert len(fetches) == 1
+    assert cache.stats()["stale_served"] == 0
+
+
+class MemoryLedger:
+    """Stands in for the Postgres ledger that every worker shares."""
+
+    def __init__(self):
+        self.days = {}
+
+    def load(self, day, month_start):
+        return self.days.get(day, 0), sum(n for d, n in self.days.items() if month_start <= d <= day)
+
+    def spend(self, day, month_start, daily_cap, monthly_cap):
+        spent_today, spent_this_month = self.load(day, month_start)
+        if spent_today + 1 > daily_cap or spent_this_month + 1 > monthly_cap:
+            return None
+        self.days[day] = spent_today + 1
+        return spent_today + 1, spent_this_month + 1
+
+    def refund(self, day):
+        self.days[day] = max(0, self.days.get(day, 0) - 1)
+
+
+def test_credit_ceiling_is_shared_across_workers_and_restarts():
+    ledger = MemoryLedger()
+    workers = [CreditBudget(daily_limit=4, ledger=ledger) for _ in range(2)]
+
+    granted = [w.try_acquire("google", Priority.EMERGENCY) for w in workers for _ in range(3)]
+
+    assert granted.count(True) == 4
+    restarted = CreditBudget(daily_limit=4, ledger=ledger)
+    assert restarted.stats()["spent_today"] == 4
+    assert not restarted.try_acquire("google", Priority.EMERGENCY)
+
+
+def test_open_circuit_skips_the_credit_ledger(standin, monkeypatch):
+    fetcher = EventsFetcher()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    ledger = MemoryLedger()
+    monkeypatch.setattr(ledger, "spend", lambda *args: pytest.fail("spent credits behind an open circuit"))
+    monkeypatch.setattr(fetcher.service, "breaker", breaker)
+    monkeypatch.setattr(fetcher.service, "budget", CreditBudget(ledger=ledger))
+
+    assert fetcher.fetch_events_for_location() == []
+    assert standin.request_log == []
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_scheduled_refresh_refetches_within_the_engine_ttl(standin, monkeypatch):
+    scheduler = FeedScheduler()
+    fetcher = NewsFetcher()
+    scheduler.register("news", lambda max_age: fetcher.fetch_general_news("Austin", max_age=max_age), interval=300)
+
+    assert scheduler.refresh("news")
+    now = time.time()
+    # Well inside google_news' cache TTL, but a full tick later
+    monkeypatch.setattr(time, "time", lambda: now + 300)
+    assert scheduler.refresh("news")
+
+    assert len(standin.request_log) == 2
@@ -0,0 +1,43 @@
+from incident_watch import IncidentWatcher, SeenSet, incident_keys
+from serp_api_service.alert_system import CommunityAlertSystem
+
+
+def make_watcher(monkeypatch, **kwargs):
+    watcher = IncidentWatcher(None, alert_system=CommunityAlertSystem(), seen=SeenSet(capacity=50), **kwargs)
+    written = []
+    monkeypatch.setattr(watcher, "_write_batch", lambda fresh: written.append([i["title"] for i, _ in fresh]))
+    return watcher, written
+
+
+def test_incidents_are_alerted_once(standin, monkeypatch):
+    watcher, written = make_watcher(monkeypatch)
+
+    assert watcher.poll_once() == 3
+    assert watcher.poll_once() == 0
+    assert written == [[
+        "Fatal crash closes I-35 lanes near downtown Austin",
+        "Austin Energy reports power outage in East Austin",
+        "Traffic jam on MoPac after minor accident",
+    ]]
+    assert watcher.counters["suppressed"] == 3
+
+
+def test_interval_tightens_on_red_and_backs_off_when_quiet(standin, monkeypatch):
+    watcher, _ = make_watcher(monkeypatch, min_interval=60, max_interval=200, backoff_factor=2)
+    watcher.interval = 200
+
+    watcher.poll_once()
+    assert watcher.interval == 60
+    watcher.poll_once()
+    watcher.poll_once()
+    assert watcher.interval == 200
+
+
+def test_seen_set_is_bounded_and_matches_retitled_links():
+    seen = SeenSet(capacity=2)
+    seen.add_many(["a", "b", "c"])
+
+    assert "a" not in seen and "c" in seen
+    first = incident_keys({"title": "Fatal crash on I-35!", "link": "https://example.com/a"})
+    again = incident_keys({"title": "fatal  crash on i-35", "link": "https://example.com/b"})
+    assert first[1] == again[1]
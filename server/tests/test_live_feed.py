@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from live_feed import LiveSubscriber, ReportEventHub
+
+DOWNTOWN_BBOX = (-97.76, 30.25, -97.73, 30.28)
+
+
+def created(report_id, lng=-97.7431, lat=30.2672, **fields):
+    return {"event": "report_created", "report_id": report_id, "longitude": lng, "latitude": lat, **fields}
+
+
+def frames(subscriber, count):
+    stream = subscriber.stream(heartbeat=0.01)
+    assert next(stream) == "retry: 5000\n\n"
+    return [next(stream) for _ in range(count)]
+
+
+def test_only_events_in_viewport_and_filters_are_delivered():
+    hub = ReportEventHub(None)
+    subscriber = hub.subscribe(LiveSubscriber(DOWNTOWN_BBOX, {"category_id": "3", "status": None}))
+
+    hub.dispatch(created("r1", category_id=3))
+    hub.dispatch(created("r2", category_id=4))
+    hub.dispatch(created("r3", lng=-97.9, category_id=3))
+
+    first, second = frames(subscriber, 2)
+    assert first.startswith("event: report_created\n")
+    assert json.loads(first.split("data: ", 1)[1])["report_id"] == "r1"
+    assert second == ": keepalive\n\n"
+
+
+def test_drop_policy_keeps_newest_and_reports_the_gap():
+    subscriber = LiveSubscriber(policy="drop", maxsize=2)
+    for i in range(5):
+        subscriber.offer(("report_created", created(f"r{i}")))
+
+    lagged, first, second = frames(subscriber, 3)
+    assert lagged == 'event: lagged\ndata: {"dropped": 3}\n\n'
+    assert '"r3"' in first and '"r4"' in second
+
+
+def test_disconnect_policy_ends_stream_with_resync():
+    subscriber = LiveSubscriber(policy="disconnect", maxsize=1)
+    subscriber.offer(("report_created", created("r1")))
+    subscriber.offer(("report_created", created("r2")))
+
+    stream = subscriber.stream(heartbeat=0.01)
+    assert list(stream)[1:] == ['event: resync\ndata: {"reason": "client too slow"}\n\n']
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        LiveSubscriber(policy="block")
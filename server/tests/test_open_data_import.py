@@ -0,0 +1,134 @@
+import json
+from datetime import datetime, timezone
+
+import open_data_import
+from open_data_import import OpenDataImporter, iter_json, iter_socrata, normalize
+
+CRIME_HEADER = ("incident_report_number,crime_type,ucr_code,occ_date_time,rep_date_time,clearance_status,"
+                "clearance_date,address,council_district,latitude,longitude,category_description\n")
+
+
+class WatermarkPool:
+    def __init__(self):
+        self.watermarks = {}
+
+    def execute(self, query, args=None, fetch=False):
+        if query.lstrip().startswith("SELECT"):
+            value = self.watermarks.get(args[0])
+            return [(value,)] if value is not None else []
+        self.watermarks[args[0]] = max(args[1], self.watermarks.get(args[0], args[1]))
+
+
+def _importer(monkeypatch, loaded):
+    importer = OpenDataImporter(WatermarkPool(), batch_size=2)
+    monkeypatch.setattr(importer, "load_batch", lambda dataset, batch: loaded.append(batch) or len(batch))
+    return importer
+
+
+def test_json_dumps_stream_in_small_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(open_data_import, "READ_CHUNK", 7)
+    rows = [{"traffic_report_id": str(i), "issue_reported": "Crash [urgent]"} for i in range(5)]
+    array = tmp_path / "traffic.json"
+    array.write_text(json.dumps(rows, indent=2))
+    ndjson = tmp_path / "traffic.ndjson"
+    ndjson.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+
+    assert list(iter_json(str(array))) == rows
+    assert list(iter_json(str(ndjson))) == rows
+
+
+def test_rerun_only_loads_rows_changed_since_the_watermark(tmp_path, monkeypatch):
+    dump = tmp_path / "crime.csv"
+    dump.write_text(CRIME_HEADER + (
+        "2024001,THEFT,600,01/05/2024 01:45:00 PM,01/05/2024 03:00:00 PM,N,,100 CONGRESS AVE,9,30.2672,-97.7431,Theft\n"
+        "2024002,BURGLARY,500,01/06/2024 08:00:00 AM,01/06/2024 09:00:00 AM,C,01/08/2024 10:00:00 AM,,3,,,Burglary\n"
+        "2024003,ASSAULT,900,01/07/2024 11:00:00 PM,01/07/2024 11:30:00 PM,N,,,1,30.3,-97.7,Assault\n"
+    ))
+    loaded = []
+    importer = _importer(monkeypatch, loaded)
+
+    first = importer.run("crime_reports", str(dump))
+
+    assert first["read"] == 3
+    assert [len(batch) for batch in loaded] == [2, 1]
+    records = {record["source_id"]: record for batch in loaded for record in batch}
+    assert records["2024001"]["geometry"] == json.dumps({"type": "Point", "coordinates": [-97.7431, 30.2672]})
+    assert records["2024002"]["geometry"] is None
+    assert records["2024002"]["council_district"] == 3
+    # Clearing a report counts as an update; times are Austin local
+    assert records["2024002"]["updated_at"] == datetime(2024, 1, 8, 16, 0, tzinfo=timezone.utc)
+    assert first["watermark"] == datetime(2024, 1, 8, 16, 0, tzinfo=timezone.utc)
+
+    # 2024003 gets cleared after the first run; the others are unchanged
+    dump.write_text(dump.read_text().replace("N,,,1,", "C,01/09/2024 09:00:00 AM,,1,"))
+    loaded.clear()
+    second = importer.run("crime_reports", str(dump))
+
+    assert second["read"] == 2  # the watermark row itself is re-read, everything older is skipped
+    assert {record["source_id"] for batch in loaded for record in batch} == {"2024002", "2024003"}
+    assert second["watermark"] == datetime(2024, 1, 9, 15, 0, tzinfo=timezone.utc)
+
+
+class FakeResponse:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.params = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.params.append(dict(params))
+        return FakeResponse(self.pages.pop(0))
+
+
+def test_socrata_pages_by_updated_at_keyset():
+    def row(i, updated):
+        return {":id": f"row-{i}", ":updated_at": updated, "sr_number": f"SR{i}"}
+
+    session = FakeSession([
+        [row(1, "2024-01-01T00:00:00.000Z"), row(2, "2024-01-02T00:00:00.000Z")],
+        [row(3, "2024-01-03T00:00:00.000Z")],
+    ])
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    rows = list(iter_socrata("i26j-ai4z", since, page_size=2, base_url="http://portal.test", session=session))
+
+    assert [r["sr_number"] for r in rows] == ["SR1", "SR2", "SR3"]
+    assert session.params[0]["$where"] == ":updated_at >= '2024-01-01T00:00:00.000'"
+    assert session.params[1]["$where"] == (":updated_at > '2024-01-02T00:00:00.000' OR "
+                                           "(:updated_at = '2024-01-02T00:00:00.000' AND :id > 'row-2')")
+    record = normalize("service_requests", rows[2])
+    assert record["updated_at"] == datetime(2024, 1, 3, tzinfo=timezone.utc)
+    assert ":id" not in json.loads(record["properties"])
+
+
+def test_malformed_geometry_skips_only_its_row(tmp_path, monkeypatch):
+    def segment(i, geom):
+        return {"segment_id": str(i), "full_street_name": f"Street {i}", "road_class": "local", "the_geom": geom}
+
+    line = {"type": "LineString", "coordinates": [[-97.74, 30.26], [-97.73, 30.27]]}
+    dump = tmp_path / "segments.json"
+    dump.write_text(json.dumps([
+        segment(1, line),
+        segment(2, "LINESTRING (-97.74 30.26, "),
+        segment(3, {"type": "Point", "coordinates": [-97.74, 300]}),
+        segment(4, "LINESTRING (-97.75 30.25, -97.76 30.24)"),
+    ]))
+    loaded = []
+    importer = _importer(monkeypatch, loaded)
+
+    stats = importer.run("street_segments", str(dump))
+
+    assert stats["skipped"] == 2
+    records = {record["source_id"]: record for batch in loaded for record in batch}
+    assert sorted(records) == ["1", "4"]
+    assert records["1"]["geometry"] == "LINESTRING (-97.74 30.26, -97.73 30.27)"
@@ -0,0 +1,102 @@
+import pytest
+
+from duplicate_index import ReportDuplicateIndex
+from report_ingest import BatchIngestor, parse_batch, validate_batch
+
+USER = "5f0c2a4e-8a1b-4f6e-9a53-2d6f1f0c9b11"
+
+
+def report(**overrides):
+    record = {"user_id": USER, "category_id": 3, "description": "Pothole on Lamar",
+              "severity": 2, "latitude": 30.27, "longitude": -97.74}
+    record.update(overrides)
+    return record
+
+
+def test_parse_accepts_json_arrays_and_ndjson():
+    assert parse_batch(b'[{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+    assert parse_batch(b'{"a": 1}\n\nnot json\n{"a": 2}\n', "application/x-ndjson") == [{"a": 1}, None, {"a": 2}]
+    with pytest.raises(ValueError):
+        parse_batch(b'[{"a": 1},')
+
+
+def test_validation_reports_the_first_problem_per_row():
+    records = [
+        report(),
+        report(latitude="north"),
+        report(severity=7),
+        report(severity=2.5),
+        report(user_id="someone"),
+        report(description="   "),
+        {"description": "only this"},
+        None,
+        report(category_id="4", severity="3"),
+    ]
+
+    valid, errors = validate_batch(records)
+
+    assert valid == [0, 8]
+    assert errors == {
+        1: "latitude must be a number between -90 and 90",
+        2: "severity must be an integer from 1 to 5",
+        3: "severity must be an integer from 1 to 5",
+        4: "user_id must be a UUID",
+        5: "description must be a non-empty string",
+        6: "Missing fields: user_id, category_id, severity, latitude, longitude",
+        7: "Not a JSON object",
+    }
+
+
+def test_batch_rows_get_distinct_tracking_numbers_that_fit_the_column():
+    ingestor = BatchIngestor(None)
+
+    numbers = [ingestor._stage_row(i, report(), "20240105134500")["tracking_number"] for i in range(2000)]
+
+    assert len(set(numbers)) == len(numbers)
+    assert max(len(n) for n in numbers) <= 32
+
+
+def test_near_duplicates_within_a_batch_are_linked():
+    crash = "Three car crash blocking the northbound lanes of I-35 near 6th street"
+    ingestor = BatchIngestor(None, duplicate_index=ReportDuplicateIndex())
+    batch = ReportDuplicateIndex()
+
+    first = ingestor._stage_row(0, report(description=crash), "20240105134500", batch)
+    second = ingestor._stage_row(1, report(description=crash + " again", longitude=-97.7402), "20240105134500", batch)
+    other = ingestor._stage_row(2, report(description="Streetlight out on Congress Avenue"), "20240105134500", batch)
+
+    assert first["original_report_id"] is None
+    assert second["is_duplicate"] and second["original_report_id"] == first["report_id"]
+    assert other["original_report_id"] is None
+
+
+class BrokenIndex(ReportDuplicateIndex):
+    def add(self, *args, **kwargs):
+        raise RuntimeError("index unavailable")
+
+
+class RecordingMatcher:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, event):
+        self.published.append(event)
+
+
+def test_index_failures_after_insert_still_notify_subscribers():
+    matcher = RecordingMatcher()
+    ingestor = BatchIngestor(None, duplicate_index=BrokenIndex(), subscription_matcher=matcher)
+    row = ingestor._stage_row(0, report(), "20240105134500")
+
+    ingestor._after_insert(row, None)
+
+    assert [event["report_id"] for event in matcher.published] == [row["report_id"]]
+
+
+def test_classifier_errors_leave_the_row_unclassified():
+    def broken_classifier():
+        raise RuntimeError("alert_keywords unavailable")
+
+    ingestor = BatchIngestor(None, classifier=broken_classifier)
+
+    assert ingestor._stage_row(0, report(), "20240105134500")["metadata"] is None
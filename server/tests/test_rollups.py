@@ -0,0 +1,9 @@
+from rollups import StatisticsRollup
+
+
+def test_disabled_rollup_never_starts_from_a_request():
+    rollup = StatisticsRollup(None, enabled=False)
+
+    rollup.refresh_if_stale()
+
+    assert rollup._thread is None
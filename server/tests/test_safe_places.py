@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from safe_places import HARVEST_CATEGORIES, INFRASTRUCTURE_FEATURES, SafePlacesCatalog, harvest_centers
+
+
+def test_harvest_upserts_searched_and_static_places(standin, monkeypatch):
+    catalog = SafePlacesCatalog(None)
+    upserted = []
+    monkeypatch.setattr(catalog, "upsert", lambda rows: upserted.extend(rows) or len(rows))
+    monkeypatch.setattr(catalog, "deactivate_stale", lambda: None)
+
+    catalog.harvest(centers=[(30.2672, -97.7431)])
+
+    assert sorted(p["q"] for p in standin.request_log) == sorted(HARVEST_CATEGORIES)
+    searched = [row for row in upserted if row[0] == "serpapi"]
+    # Each category replays the same fixture; places without coordinates are skipped
+    assert {row[2] for row in searched} == {
+        "Austin Fire Station 1", "APD Headquarters", "Austin Shelter for Women and Children"
+    }
+    assert {row[3] for row in searched} == {"shelter"}
+    assert len([row for row in upserted if row[0] == "static"]) == len(INFRASTRUCTURE_FEATURES)
+
+
+def test_harvest_centers_cover_the_bbox():
+    centers = harvest_centers((-98.0, 30.0, -97.0, 31.0), (2, 2))
+
+    assert centers == [(30.25, -97.75), (30.25, -97.25), (30.75, -97.75), (30.75, -97.25)]
+
+
+class PagedCursor:
+    """Stands in for a psycopg2 cursor: one execute per execute_values page."""
+
+    connection = SimpleNamespace(encoding="UTF8")
+
+    def __init__(self):
+        self.pages = 0
+        self.rowcount = -1
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, template, args):
+        return b"(row)"
+
+    def execute(self, sql):
+        self.pages += 1
+        self._rows = [(1,)] * sql.count(b"(row)")
+        self.rowcount = len(self._rows)
+
+    def fetchall(self):
+        return self._rows
+
+
+class PagedPool:
+    def __init__(self):
+        self.paged = PagedCursor()
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return self.paged
+
+
+def test_upsert_counts_rows_across_every_page():
+    pool = PagedPool()
+    row = ("serpapi", "id", "Shelter", "shelter", "1 Main St", None, None, -97.74, 30.27)
+
+    assert SafePlacesCatalog(pool).upsert([row] * 2500) == 2500
+    assert pool.paged.pages == 3
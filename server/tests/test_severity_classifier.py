@@ -0,0 +1,45 @@
+from serp_api_service.severity_classifier import ReloadingClassifier, SeverityClassifier
+
+
+def test_most_severe_keyword_wins_regardless_of_order():
+    classifier = SeverityClassifier({"traffic jam": "Green", "power outage": "Yellow", "fatal": "Red"})
+
+    assert classifier.classify("Traffic jam after fatal crash on MoPac") == ("Red", ["traffic jam", "fatal"])
+    assert classifier.classify("Power outage", "Traffic jam downtown") == ("Yellow", ["power outage", "traffic jam"])
+    assert classifier.classify("Zilker trail reopens") == (None, [])
+
+
+def test_only_whole_words_match_by_default():
+    classifier = SeverityClassifier({"fire": "Red"})
+
+    assert classifier.matches("Firefly festival") == []
+    assert classifier.matches("Brush FIRE near 290.") == [("fire", "Red", 6, 10)]
+    assert SeverityClassifier({"fire": "Red"}, word_boundaries=False).matches("Wildfire")[0][2:] == (4, 8)
+
+
+def test_overlapping_keywords_are_all_reported():
+    classifier = SeverityClassifier({"crash": "Yellow", "major crash": "Red", "crash site": "Yellow"})
+
+    assert [m[0] for m in classifier.matches("Major crash site cleared")] == ["major crash", "crash", "crash site"]
+
+
+class KeywordPool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, args=None, fetch=False):
+        return list(self.rows)
+
+
+def test_reloading_classifier_picks_up_edited_keywords(monkeypatch):
+    pool = KeywordPool([("sinkhole", "Red")])
+    classifier = ReloadingClassifier(pool, reload_interval=60)
+    assert classifier.classify("Sinkhole on Lamar") == ("Red", ["sinkhole"])
+
+    pool.rows = [("sinkhole", "Yellow"), ("gas leak", "Red")]
+    assert classifier.classify("Sinkhole on Lamar") == ("Red", ["sinkhole"])
+
+    loaded_at = classifier._loaded_at
+    monkeypatch.setattr("time.monotonic", lambda: loaded_at + 61)
+    assert classifier.classify("Sinkhole on Lamar") == ("Yellow", ["sinkhole"])
+    assert classifier.classify("Gas leak reported")[0] == "Red"
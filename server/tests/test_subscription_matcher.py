@@ -0,0 +1,35 @@
+from shapely import Polygon, to_wkb
+
+from subscription_matcher import SubscriptionIndex
+
+DOWNTOWN = Polygon([(-97.76, 30.25), (-97.73, 30.25), (-97.73, 30.28), (-97.76, 30.28)])
+
+
+def make_index():
+    return SubscriptionIndex([
+        ("s1", "u1", None, 3, None, None),                   # category 3 anywhere
+        ("s2", "u2", None, None, 9, None),                   # district 9
+        ("s3", "u3", None, 3, 9, None),                      # category 3 in district 9
+        ("s4", "u4", None, None, None, to_wkb(DOWNTOWN)),    # downtown polygon
+        ("s5", "u5", "r1", None, None, None),                # one report
+        ("s6", "u6", None, 5, None, to_wkb(DOWNTOWN)),       # category 5 downtown
+    ])
+
+
+def match_ids(index, **event):
+    return sorted(sub.subscription_id for sub in index.match(event))
+
+
+def test_every_criterion_of_a_subscription_must_hold():
+    index = make_index()
+
+    assert match_ids(index, report_id="r1", category_id=3, council_district=9,
+                     longitude=-97.7431, latitude=30.2672) == ["s1", "s2", "s3", "s4", "s5"]
+    assert match_ids(index, report_id="r2", category_id=5, council_district=1,
+                     longitude=-97.7431, latitude=30.2672) == ["s4", "s6"]
+    assert match_ids(index, report_id="r2", category_id=5, council_district=1,
+                     longitude=-97.80, latitude=30.40) == []
+
+
+def test_index_counts_each_subscription_once():
+    assert make_index().size == 6
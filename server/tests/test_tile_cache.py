@@ -0,0 +1,17 @@
+import os
+import time
+
+from tile_cache import TileCache
+
+
+def test_purge_drops_expired_tiles_then_the_oldest_over_the_size_cap(tmp_path):
+    cache = TileCache(cache_dir=str(tmp_path), ttl=60, max_disk_bytes=250, purge_interval=float("inf"))
+    now = time.time()
+    for age, fhash in [(120, "expired"), (30, "older"), (10, "newer"), (0, "newest")]:
+        cache.put(("reports", fhash, 1, 0, 0), b"x" * 100)
+        path = cache._path(("reports", fhash, 1, 0, 0))
+        os.utime(path, (now - age, now - age))
+
+    assert cache.purge() == 2
+    assert sorted(os.listdir(tmp_path / "reports")) == ["newer", "newest"]
+    assert cache.stats["purged_files"] >= 2
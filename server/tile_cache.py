@@ -0,0 +1,164 @@
+# Two-tier (memory + disk) cache for rendered vector tiles
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tile_cache')
+
+
+def filter_hash(filters):
+    """Stable short hash of the filter params a tile was rendered with."""
+    normalized = {k: str(v) for k, v in filters.items() if v not in (None, '')}
+    raw = json.dumps(normalized, sort_keys=True).encode()
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+class TileCache:
+    """
+    LRU of recently served tiles in memory, backed by files on disk at
+    <cache_dir>/<layer>/<filter_hash>/<z>/<x>/<y>.mvt. Both tiers expire entries
+    after `ttl` seconds so newly submitted reports show up without manual purges.
+    Every `purge_interval` seconds a background pass deletes expired files and then
+    the oldest ones until the disk tier fits in `max_disk_bytes`.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=300, max_memory_tiles=2048,
+                 max_disk_bytes=512 * 1024 * 1024, purge_interval=600):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_memory_tiles = max_memory_tiles
+        self.max_disk_bytes = max_disk_bytes
+        self.purge_interval = purge_interval
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._purging = False
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "purged_files": 0}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            cache_dir=os.environ.get("TILE_CACHE_DIR", DEFAULT_CACHE_DIR),
+            ttl=float(os.environ.get("TILE_CACHE_TTL", 300)),
+            max_memory_tiles=int(os.environ.get("TILE_CACHE_MEMORY_TILES", 2048)),
+            max_disk_bytes=int(os.environ.get("TILE_CACHE_MAX_DISK_MB", 512)) * 1024 * 1024,
+            purge_interval=float(os.environ.get("TILE_CACHE_PURGE_INTERVAL", 600)),
+        )
+
+    def _path(self, key):
+        layer, fhash, z, x, y = key
+        return os.path.join(self.cache_dir, layer, fhash, str(z), str(x), f"{y}.mvt")
+
+    def get(self, key):
+        """Return cached tile bytes for key, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, data = entry
+                if now - stored_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return data
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if now - stored_at <= self.ttl:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self._remember(key, data, stored_at)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return data
+        except OSError:
+            pass
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, data):
+        self._remember(key, data, time.time())
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so concurrent readers never see a partial tile
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing tile cache file {path}: {e}")
+        self._maybe_purge()
+
+    def _maybe_purge(self):
+        with self._lock:
+            if self._purging or time.time() - self._last_purge < self.purge_interval:
+                return
+            self._purging = True
+        threading.Thread(target=self._purge_in_background, daemon=True).start()
+
+    def _purge_in_background(self):
+        try:
+            self.purge()
+        finally:
+            with self._lock:
+                self._purging = False
+
+    def purge(self):
+        """
+        Delete expired tile files, then the least recently written ones until the
+        disk tier is under max_disk_bytes, and prune directories left empty.
+        Returns the number of files removed.
+        """
+        now = time.time()
+        with self._lock:
+            self._last_purge = now
+        kept = []
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                    if now - st.st_mtime > self.ttl:
+                        os.remove(path)
+                        removed += 1
+                    else:
+                        kept.append((st.st_mtime, st.st_size, path))
+                except OSError:
+                    pass
+
+        total = sum(size for _, size, _ in kept)
+        for _, size, path in sorted(kept):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            total -= size
+
+        for root, _, _ in os.walk(self.cache_dir, topdown=False):
+            if root != self.cache_dir:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass  # not empty
+
+        with self._lock:
+            self.stats["purged_files"] += removed
+        return removed
+
+    def _remember(self, key, data, stored_at):
+        with self._lock:
+            self._memory[key] = (stored_at, data)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_tiles:
+                self._memory.popitem(last=False)